@@ -8,7 +8,7 @@ import warnings
 from dataclasses import asdict, dataclass
 from io import TextIOWrapper
 from pathlib import Path
-from typing import TextIO, TypeVar
+from typing import Literal, TextIO, TypeVar
 
 import uvicorn
 from pydantic import TypeAdapter
@@ -21,12 +21,15 @@ from voicevox_engine.core.core_initializer import MOCK_VER, initialize_cores
 from voicevox_engine.engine_manifest import load_manifest
 from voicevox_engine.library.library_manager import LibraryManager
 from voicevox_engine.logging import LOGGING_CONFIG, logger
+from voicevox_engine.metas.Metas import StyleId
 from voicevox_engine.preset.preset_manager import PresetManager
 from voicevox_engine.setting.model import CorsPolicyMode
 from voicevox_engine.setting.setting_manager import USER_SETTING_PATH, SettingHandler
+from voicevox_engine.tts_pipeline.onnx_session_config import OnnxSessionConfig
 from voicevox_engine.tts_pipeline.style_bert_vits2_tts_engine import (
     StyleBertVITS2TTSEngine,
 )
+from voicevox_engine.tts_pipeline.synthesis_cache import SynthesisCache
 from voicevox_engine.tts_pipeline.tts_engine import TTSEngineManager
 from voicevox_engine.user_dict.user_dict_manager import UserDictionary
 from voicevox_engine.utility.path_utility import (
@@ -147,6 +150,30 @@ class CLIArgs:
     port: int
     use_gpu: bool
     load_all_models: bool
+    preload_models: list[str]
+    preload_styles: list[int]
+    disable_optimized_onnx_model_cache: bool
+    cpu_num_threads: int | None
+    onnx_inter_op_num_threads: int | None
+    onnx_execution_mode: Literal["sequential", "parallel"] | None
+    onnx_graph_optimization_level: Literal["disable", "basic", "extended", "all"] | None
+    onnx_disable_cpu_mem_arena: bool
+    onnx_disable_intra_op_spinning: bool
+    onnx_intra_op_thread_affinities: str | None
+    onnx_quantization: Literal["none", "int8"] | None
+    max_loaded_models: int | None
+    max_model_memory: int | None
+    bert_feature_cache_size: int
+    accent_phrase_cache_size: int
+    synthesis_cache_size: int
+    synthesis_cache_disk_size: int
+    synthesis_cache_ttl: float | None
+    max_concurrent_inferences: int
+    long_text_chunk_moras: int
+    long_text_max_workers: int
+    max_inference_queue_size: int
+    enable_cancellable_synthesis: bool
+    init_processes: int
     output_log_utf8: bool
     cors_policy_mode: CorsPolicyMode | None
     allow_origins: list[str] | None
@@ -159,9 +186,6 @@ class CLIArgs:
     voicelib_dirs: list[Path] | None = None  # 常に None
     runtime_dirs: list[Path] | None = None  # 常に None
     enable_mock: bool = True  # 常にモック版 VOICEVOX CORE を利用する
-    enable_cancellable_synthesis: bool = False  # 常に False
-    init_processes: int = 2  # 常に 2
-    cpu_num_threads: int | None = 4  # 常に 4
 
 
 _cli_args_adapter = TypeAdapter(CLIArgs)
@@ -213,35 +237,235 @@ def read_cli_arguments(envs: Envs) -> CLIArgs:
     #     action="store_true",
     #     help="VOICEVOX COREを使わずモックで音声合成を行います。",
     # )
-    # parser.add_argument(
-    #     "--enable_cancellable_synthesis",
-    #     action="store_true",
-    #     help="音声合成を途中でキャンセルできるようになります。",
-    # )
-    # parser.add_argument(
-    #     "--init_processes",
-    #     type=int,
-    #     default=2,
-    #     help="cancellable_synthesis機能の初期化時に生成するプロセス数です。",
-    # )
+    parser.add_argument(
+        "--enable_cancellable_synthesis",
+        action="store_true",
+        help=(
+            "音声合成を途中でキャンセルできる /cancellable_synthesis を有効化します。"
+            "音声合成はワーカープロセスで行われ、クライアントとの接続が切断されると推論の途中でも中断されます。"
+        ),
+    )
+    parser.add_argument(
+        "--init_processes",
+        type=int,
+        default=2,
+        help=(
+            "cancellable_synthesis 機能の初期化時に生成するワーカープロセス数です。"
+            "各ワーカープロセスが BERT モデルと音声合成モデルを個別に読み込むため、プロセス数に比例してメモリを消費します。"
+        ),
+    )
     parser.add_argument(
         "--load_all_models",
         action="store_true",
         help="起動時に全ての音声合成モデルを読み込みます。",
     )
+    parser.add_argument(
+        "--preload_models",
+        nargs="*",
+        default=[],
+        help=(
+            "起動時に読み込み、全てのスタイルでダミーの音声合成を行ってウォームアップする音声合成モデルの UUID です。"
+            "スペースで区切ることで複数指定できます。ウォームアップが完了するまで /ready は 503 を返します。"
+        ),
+    )
+    parser.add_argument(
+        "--preload_styles",
+        type=int,
+        nargs="*",
+        default=[],
+        help=(
+            "起動時に音声合成モデルを読み込み、ダミーの音声合成を行ってウォームアップするスタイル ID です。"
+            "スペースで区切ることで複数指定できます。ウォームアップが完了するまで /ready は 503 を返します。"
+        ),
+    )
+    parser.add_argument(
+        "--disable_optimized_onnx_model_cache",
+        action="store_true",
+        help=(
+            "ONNX Runtime で最適化済みの BERT モデル・音声合成モデルのキャッシュを無効化します。"
+            "キャッシュが有効な場合、2 回目以降の起動では最適化済みのモデルを読み込むため、起動とモデルのロードが速くなります。"
+        ),
+    )
+    parser.add_argument(
+        "--max_loaded_models",
+        type=int,
+        default=None,
+        help=(
+            "同時にメモリ上に保持する音声合成モデルの最大数です。"
+            "上限を超えた場合、最も長く使われていないモデルからアンロードされます。指定しない場合は無制限です。"
+        ),
+    )
+    parser.add_argument(
+        "--max_model_memory",
+        type=int,
+        default=None,
+        help=(
+            "音声合成モデルに割り当てるメモリの上限 (MB) です。モデルのメモリ使用量は AIVMX ファイルのサイズで見積もります。"
+            "上限を超えた場合、最も長く使われていないモデルからアンロードされます。指定しない場合は無制限です。"
+        ),
+    )
+    parser.add_argument(
+        "--bert_feature_cache_size",
+        type=int,
+        default=128,
+        help=(
+            "BERT 特徴量のキャッシュに割り当てるメモリの上限 (MB) です。"
+            "同じ文をパラメータだけ変えて音声合成し直す際に、BERT の推論を省略できます。0 を指定するとキャッシュを無効化します。"
+        ),
+    )
+    parser.add_argument(
+        "--accent_phrase_cache_size",
+        type=int,
+        default=1024,
+        help=(
+            "テキストの言語解析結果のキャッシュに保持するテキストの数の上限です。"
+            "同じ文を繰り返し音声合成する際に、テキスト解析を省略できます。0 を指定するとキャッシュを無効化します。"
+        ),
+    )
+    parser.add_argument(
+        "--synthesis_cache_size",
+        type=int,
+        default=0,
+        help=(
+            "音声合成結果のキャッシュに割り当てるメモリの上限 (MB) です。"
+            "同じクエリ・スタイル・モデルでの /synthesis の呼び出しに、音声合成を行わずキャッシュから応答します。0 を指定するとキャッシュを無効化します。"
+        ),
+    )
+    parser.add_argument(
+        "--synthesis_cache_disk_size",
+        type=int,
+        default=0,
+        help=(
+            "ディスク上に保存する音声合成結果のキャッシュの上限 (MB) です。"
+            "エンジンを再起動してもキャッシュを再利用できます。--synthesis_cache_size と併せて指定してください。0 を指定するとディスク上には保存しません。"
+        ),
+    )
+    parser.add_argument(
+        "--synthesis_cache_ttl",
+        type=float,
+        default=None,
+        help="音声合成結果のキャッシュの有効期限 (秒) です。指定しない場合は無期限です。",
+    )
+    parser.add_argument(
+        "--max_concurrent_inferences",
+        type=int,
+        default=2,
+        help=(
+            "同時に実行する音声合成モデルの推論の数です。"
+            "上限を超えたリクエストは、1 件ずつの音声合成を複数件まとめての音声合成より優先して順番待ちになります。"
+        ),
+    )
+    parser.add_argument(
+        "--long_text_chunk_moras",
+        type=int,
+        default=0,
+        help=(
+            "長いテキストを分割して音声合成する際の、1 回の推論で読み上げるモーラ数の上限です。"
+            "読み上げるモーラ数がこの値を超える場合、文末や読点の位置で分割して推論し、短いクロスフェードで連結します。"
+            "長いテキストでもメモリ使用量と推論時間が一定の範囲に収まりますが、分割位置の前後で抑揚がわずかに変わります。"
+            "デフォルトは 0 で、分割せずに一度に推論します。"
+        ),
+    )
+    parser.add_argument(
+        "--long_text_max_workers",
+        type=int,
+        default=1,
+        help=(
+            "長いテキストを分割して音声合成する際に、並行して推論する数です。"
+            "増やすと長いテキストの音声合成が速くなりますが、メモリ使用量が増え、同時に実行できる推論の枠を多く使います。"
+        ),
+    )
+    parser.add_argument(
+        "--max_inference_queue_size",
+        type=int,
+        default=64,
+        help=(
+            "推論の順番待ちができるリクエスト数の上限です。"
+            "上限に達した場合、新たな音声合成リクエストには 503 Service Unavailable を返します。0 を指定すると無制限になります。"
+        ),
+    )
 
     # 引数へcpu_num_threadsの指定がなければ、環境変数をロールします。
     # 環境変数にもない場合は、Noneのままとします。
     # VV_CPU_NUM_THREADSが空文字列でなく数値でもない場合、エラー終了します。
-    # parser.add_argument(
-    #     "--cpu_num_threads",
-    #     type=int,
-    #     default=envs.cpu_num_threads,
-    #     help=(
-    #         "音声合成を行うスレッド数です。指定しない場合、代わりに環境変数 VV_CPU_NUM_THREADS の値が使われます。"
-    #         "VV_CPU_NUM_THREADS が空文字列でなく数値でもない場合はエラー終了します。"
-    #     ),
-    # )
+    parser.add_argument(
+        "--cpu_num_threads",
+        type=int,
+        default=envs.cpu_num_threads or None,
+        help=(
+            "音声合成を行うスレッド数 (ONNX Runtime の intra_op_num_threads) です。指定しない場合、代わりに環境変数 VV_CPU_NUM_THREADS の値が使われます。"
+            "VV_CPU_NUM_THREADS が空文字列でなく数値でもない場合はエラー終了します。"
+            "このオプションは --setting_file で指定される設定ファイルよりも優先されます。"
+        ),
+    )
+    parser.add_argument(
+        "--onnx_inter_op_num_threads",
+        type=int,
+        default=None,
+        help=(
+            "ONNX Runtime で独立した演算子同士を並列に実行するスレッド数です。--onnx_execution_mode が parallel の場合のみ使われます。"
+            "このオプションは --setting_file で指定される設定ファイルよりも優先されます。"
+        ),
+    )
+    parser.add_argument(
+        "--onnx_execution_mode",
+        type=str,
+        choices=["sequential", "parallel"],
+        default=None,
+        help=(
+            "ONNX Runtime の実行モードです。sequential は演算子を 1 つずつ、parallel は独立した演算子同士を並列に実行します。"
+            "このオプションは --setting_file で指定される設定ファイルよりも優先されます。"
+        ),
+    )
+    parser.add_argument(
+        "--onnx_graph_optimization_level",
+        type=str,
+        choices=["disable", "basic", "extended", "all"],
+        default=None,
+        help=(
+            "ONNX Runtime のセッションの作成時に行うグラフ最適化のレベルです。"
+            "このオプションは --setting_file で指定される設定ファイルよりも優先されます。"
+        ),
+    )
+    parser.add_argument(
+        "--onnx_disable_cpu_mem_arena",
+        action="store_true",
+        help=(
+            "ONNX Runtime の CPU のメモリアリーナを無効化します。推論ごとのメモリの確保・解放が増えますが、ピーク時のメモリ使用量を抑えられます。"
+        ),
+    )
+    parser.add_argument(
+        "--onnx_disable_intra_op_spinning",
+        action="store_true",
+        help=(
+            "ONNX Runtime のスレッドを待機中にスピンさせないようにします。"
+            "推論の合間の CPU 使用率が下がり、多数のセッションやプロセスで CPU コアを奪い合いにくくなります。"
+        ),
+    )
+    parser.add_argument(
+        "--onnx_intra_op_thread_affinities",
+        type=str,
+        default=None,
+        help=(
+            "ONNX Runtime のスレッドごとに割り当てる論理プロセッサです (例: 1,2;3,4) 。"
+            "NUMA ノードごとにスレッドを固定する場合などに指定します。"
+            "1 つ目のスレッドは呼び出し元のスレッドのため、--cpu_num_threads から 1 を引いた数をセミコロン区切りで指定します。"
+            "このオプションは --setting_file で指定される設定ファイルよりも優先されます。"
+        ),
+    )
+
+    parser.add_argument(
+        "--onnx_quantization",
+        type=str,
+        choices=["none", "int8"],
+        default=None,
+        help=(
+            "BERT モデル・音声合成モデルの重みの量子化です。int8 を指定すると、INT8 に動的量子化したモデルを初回の読み込み時に生成・保存して利用します。"
+            "CPU での推論が速くなりメモリ使用量も減りますが、わずかに品質が下がります。GPU で推論する場合は無視されます。"
+            "モデルごとの指定は --setting_file で指定される設定ファイルの onnx_session_overrides で行えます。"
+            "このオプションは --setting_file で指定される設定ファイルよりも優先されます。"
+        ),
+    )
 
     parser.add_argument(
         "--output_log_utf8",
@@ -337,38 +561,90 @@ def main() -> None:
         voicelib_dirs=args.voicelib_dirs,
         voicevox_dir=args.voicevox_dir,
         runtime_dirs=args.runtime_dirs,
-        cpu_num_threads=args.cpu_num_threads,
+        # モック版 VOICEVOX CORE はスレッド数を参照しないため、VOICEVOX ENGINE の既定値を渡す
+        cpu_num_threads=4,
         enable_mock=args.enable_mock,
         load_all_models=args.load_all_models,
     )
     # tts_engines = make_tts_engines_from_cores(core_manager)
     # assert len(tts_engines.versions()) != 0, "音声合成エンジンがありません。"
 
+    setting_loader = SettingHandler(args.setting_file)
+    settings = setting_loader.load()
+
+    # ONNX Runtime のセッションの設定は、設定ファイルの値をコマンドライン引数で指定された項目だけ上書きする
+    onnx_session_config = settings.onnx_session.merge(
+        OnnxSessionConfig(
+            intra_op_num_threads=args.cpu_num_threads,
+            inter_op_num_threads=args.onnx_inter_op_num_threads,
+            execution_mode=args.onnx_execution_mode,
+            graph_optimization_level=args.onnx_graph_optimization_level,
+            enable_cpu_mem_arena=False if args.onnx_disable_cpu_mem_arena else None,
+            intra_op_allow_spinning=(
+                False if args.onnx_disable_intra_op_spinning else None
+            ),
+            intra_op_thread_affinities=args.onnx_intra_op_thread_affinities,
+            quantization=args.onnx_quantization,
+        )
+    )
+
     # AivmManager を初期化
     aivm_manager = AivmManager(get_save_dir() / "Models")
 
     # StyleBertVITS2TTSEngine を通常の TTSEngine の代わりに利用
     tts_engines = TTSEngineManager()
     tts_engines.register_engine(
-        StyleBertVITS2TTSEngine(aivm_manager, args.use_gpu, args.load_all_models),
+        StyleBertVITS2TTSEngine(
+            aivm_manager,
+            args.use_gpu,
+            args.load_all_models,
+            max_loaded_models=args.max_loaded_models,
+            max_model_memory_bytes=(
+                args.max_model_memory * 1024 * 1024
+                if args.max_model_memory is not None
+                else None
+            ),
+            bert_feature_cache_bytes=args.bert_feature_cache_size * 1024 * 1024,
+            accent_phrase_cache_size=args.accent_phrase_cache_size,
+            max_concurrent_inferences=args.max_concurrent_inferences,
+            max_inference_queue_size=(
+                args.max_inference_queue_size
+                if args.max_inference_queue_size > 0
+                else None
+            ),
+            preload_models=args.preload_models,
+            preload_style_ids=[StyleId(style_id) for style_id in args.preload_styles],
+            enable_optimized_onnx_model_cache=not args.disable_optimized_onnx_model_cache,
+            onnx_session_config=onnx_session_config,
+            onnx_session_overrides=settings.onnx_session_overrides,
+            long_text_chunk_moras=args.long_text_chunk_moras,
+            long_text_max_workers=args.long_text_max_workers,
+        ),
         MOCK_VER,
     )
 
+    # 音声合成結果のキャッシュを初期化
+    synthesis_cache: SynthesisCache | None = None
+    if args.synthesis_cache_size > 0:
+        synthesis_cache = SynthesisCache(
+            args.synthesis_cache_size * 1024 * 1024,
+            disk_cache_dir=get_save_dir() / "SynthesisCaches",
+            max_disk_bytes=args.synthesis_cache_disk_size * 1024 * 1024,
+            ttl=args.synthesis_cache_ttl,
+        )
+
     cancellable_engine: CancellableEngine | None = None
     if args.enable_cancellable_synthesis:
         cancellable_engine = CancellableEngine(
             init_processes=args.init_processes,
             use_gpu=args.use_gpu,
-            voicelib_dirs=args.voicelib_dirs,
-            voicevox_dir=args.voicevox_dir,
-            runtime_dirs=args.runtime_dirs,
-            cpu_num_threads=args.cpu_num_threads,
-            enable_mock=args.enable_mock,
+            installed_aivm_dir=aivm_manager.installed_aivm_dir,
+            max_loaded_models=args.max_loaded_models,
+            enable_optimized_onnx_model_cache=not args.disable_optimized_onnx_model_cache,
+            onnx_session_config=onnx_session_config,
+            onnx_session_overrides=settings.onnx_session_overrides,
         )
 
-    setting_loader = SettingHandler(args.setting_file)
-    settings = setting_loader.load()
-
     # 複数方式で指定可能な場合、優先度は上から「引数」「環境変数」「設定ファイル」「デフォルト値」
 
     cors_policy_mode = select_first_not_none(
@@ -433,6 +709,7 @@ def main() -> None:
         cors_policy_mode,
         allow_origin,
         disable_mutable_api=disable_mutable_api,
+        synthesis_cache=synthesis_cache,
     )
 
     # AivisSpeech Engine サーバーを起動
@@ -0,0 +1,136 @@
+"""INT8 に量子化したモデルでの音声合成にかかる時間と品質の測定"""
+
+import argparse
+import multiprocessing
+from test.benchmark.speed.utility import benchmark_time
+
+import numpy as np
+from numpy.typing import NDArray
+
+from voicevox_engine.aivm_manager import AivmManager
+from voicevox_engine.metas.Metas import StyleId
+from voicevox_engine.model import AudioQuery
+from voicevox_engine.tts_pipeline.onnx_session_config import (
+    BERT_MODEL_KEY,
+    OnnxSessionConfig,
+)
+from voicevox_engine.tts_pipeline.style_bert_vits2_tts_engine import (
+    StyleBertVITS2TTSEngine,
+)
+from voicevox_engine.utility.path_utility import get_save_dir
+
+# 量子化の対象 (none: 量子化しない, bert: BERT モデルのみ, all: BERT モデルと音声合成モデル)
+VARIANTS = ["none", "bert", "all"]
+
+TEXTS = [
+    "こんにちは。今日はいい天気ですね。",
+    "音声合成エンジンの推論速度と品質を、量子化の有無で比較します。",
+    "吾輩は猫である。名前はまだ無い。どこで生れたかとんと見当がつかぬ。",
+]
+
+
+def _synthesize_texts(
+    variant: str, style_id: StyleId, n_repeat: int
+) -> tuple[float, list[NDArray[np.float32]]]:
+    """
+    指定された量子化の対象でエンジンを初期化し、全てのテキストの音声合成にかかる平均時間と合成結果を返す。
+    BERT モデルや onnxruntime.InferenceSession の差し替えはプロセス内でグローバルなため、別プロセスで実行する。
+    """
+
+    onnx_session_config = OnnxSessionConfig()
+    onnx_session_overrides: dict[str, OnnxSessionConfig] = {}
+    if variant == "bert":
+        onnx_session_overrides[BERT_MODEL_KEY] = OnnxSessionConfig(quantization="int8")
+    elif variant == "all":
+        onnx_session_config = OnnxSessionConfig(quantization="int8")
+
+    engine = StyleBertVITS2TTSEngine(
+        AivmManager(get_save_dir() / "Models"),
+        use_gpu=False,
+        bert_feature_cache_bytes=0,
+        accent_phrase_cache_size=0,
+        onnx_session_config=onnx_session_config,
+        onnx_session_overrides=onnx_session_overrides,
+    )
+    queries = [
+        AudioQuery(
+            accent_phrases=engine.create_accent_phrases(text, style_id),
+            speedScale=1.0,
+            intonationScale=1.0,
+            tempoDynamicsScale=1.0,
+            pitchScale=0.0,
+            volumeScale=1.0,
+            prePhonemeLength=0.1,
+            postPhonemeLength=0.1,
+            pauseLength=None,
+            pauseLengthScale=1.0,
+            outputSamplingRate=engine.default_sampling_rate,
+            outputStereo=False,
+            kana=text,
+        )
+        for text in TEXTS
+    ]
+
+    # モデルのロードとウォームアップを兼ねて 1 回合成し、その結果を品質の比較に使う
+    waves = [engine.synthesize_wave(query, style_id) for query in queries]
+
+    def execute() -> None:
+        """計測対象となる処理を実行する"""
+        for query in queries:
+            engine.synthesize_wave(query, style_id)
+
+    average_time = benchmark_time(execute, n_repeat=n_repeat, sec_sleep=0.0)
+    return average_time, waves
+
+
+def _log_spectral_distance(
+    reference: NDArray[np.float32], target: NDArray[np.float32]
+) -> float:
+    """2 つの音声波形の対数振幅スペクトルの距離 (dB) を返す。長さが異なる場合は短い方に揃える。"""
+
+    length = min(len(reference), len(target))
+    frame_length, hop_length = 2048, 512
+    window = np.hanning(frame_length)
+
+    def spectrum(wave: NDArray[np.float32]) -> NDArray[np.float64]:
+        frames = np.lib.stride_tricks.sliding_window_view(wave[:length], frame_length)
+        power = np.abs(np.fft.rfft(frames[::hop_length] * window)) ** 2
+        return 10 * np.log10(power + 1e-10)
+
+    return float(np.mean(np.sqrt(np.mean((spectrum(reference) - spectrum(target)) ** 2, axis=1))))  # fmt: skip
+
+
+if __name__ == "__main__":
+    # 実行コマンドは `python -m test.benchmark.speed.quantization --style_id <スタイル ID>` である。
+    # 初回は量子化済みモデルの生成に時間がかかるため、2 回目以降の結果を参照すること。
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--style_id", type=int, required=True)
+    parser.add_argument("--n_repeat", type=int, default=5)
+    args = parser.parse_args()
+    style_id = StyleId(args.style_id)
+
+    results: dict[str, tuple[float, list[NDArray[np.float32]]]] = {}
+    with multiprocessing.get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+        for variant in VARIANTS:
+            results[variant] = pool.apply(
+                _synthesize_texts, (variant, style_id, args.n_repeat)
+            )
+
+    reference_time, reference_waves = results["none"]
+    for variant in VARIANTS:
+        average_time, waves = results[variant]
+        distances = [
+            _log_spectral_distance(reference, wave)
+            for reference, wave in zip(reference_waves, waves)
+        ]
+        length_ratios = [
+            len(wave) / len(reference)
+            for reference, wave in zip(reference_waves, waves)
+        ]
+        print(
+            f"quantization={variant}: {average_time:.4f} sec "
+            f"(x{reference_time / average_time:.2f}), "
+            f"log spectral distance: {np.mean(distances):.2f} dB, "
+            f"length ratio: {np.mean(length_ratios):.3f}"
+        )
@@ -0,0 +1,107 @@
+"""音声合成用のクエリの前処理にかかる時間の測定"""
+
+import argparse
+import copy
+from test.benchmark.speed.utility import benchmark_time
+
+from voicevox_engine.model import AudioQuery
+from voicevox_engine.tts_pipeline.model import AccentPhrase, Mora
+from voicevox_engine.tts_pipeline.tts_engine import (
+    _apply_interrogative_upspeak,
+    _query_to_decoder_feature,
+)
+
+
+def _generate_long_query(n_accent_phrase: int) -> AudioQuery:
+    """1 アクセント句あたり 10 モーラの、長いテキストを想定した音声合成用のクエリを生成する。"""
+    accent_phrases = [
+        AccentPhrase(
+            moras=[
+                Mora(
+                    text="テ",
+                    consonant="t",
+                    consonant_length=0.05,
+                    vowel="e",
+                    vowel_length=0.1,
+                    pitch=5.5,
+                )
+                for _ in range(10)
+            ],
+            accent=3,
+            pause_mora=Mora(text="、", vowel="pau", vowel_length=0.2, pitch=0.0),
+            is_interrogative=True,
+        )
+        for _ in range(n_accent_phrase)
+    ]
+    return AudioQuery(
+        accent_phrases=accent_phrases,
+        speedScale=1.0,
+        intonationScale=1.0,
+        tempoDynamicsScale=1.0,
+        pitchScale=0.0,
+        volumeScale=1.0,
+        prePhonemeLength=0.1,
+        postPhonemeLength=0.1,
+        pauseLength=None,
+        pauseLengthScale=1.0,
+        outputSamplingRate=44100,
+        outputStereo=False,
+        kana="テスト",
+    )
+
+
+def benchmark_query_deepcopy(n_accent_phrase: int) -> float:
+    """
+    以前の音声合成処理の冒頭で毎回行っていた、音声合成用のクエリの `copy.deepcopy()` にかかる時間を測定する。
+    現在の音声合成処理ではクエリを書き換えないため、この時間がそのまま削減されている。
+    """
+
+    query = _generate_long_query(n_accent_phrase)
+
+    def execute() -> None:
+        """計測対象となる処理を実行する"""
+        copy.deepcopy(query)
+
+    average_time = benchmark_time(execute, n_repeat=10, sec_sleep=0.0)
+    return average_time
+
+
+def benchmark_query_to_decoder_feature(n_accent_phrase: int, deepcopy: bool) -> float:
+    """
+    `TTSEngine.synthesize_wave()` の推論前の前処理 (疑問形モーラの付与と音素・音高への変換) にかかる時間を測定する。
+    `deepcopy=True` の場合は、以前の実装と同様に先にクエリ全体を `copy.deepcopy()` する。
+    """
+
+    query = _generate_long_query(n_accent_phrase)
+
+    def execute() -> None:
+        """計測対象となる処理を実行する"""
+        target = copy.deepcopy(query) if deepcopy else query
+        target = target.model_copy(
+            update={
+                "accent_phrases": _apply_interrogative_upspeak(
+                    target.accent_phrases, True
+                )
+            }
+        )
+        _query_to_decoder_feature(target)
+
+    average_time = benchmark_time(execute, n_repeat=10, sec_sleep=0.0)
+    return average_time
+
+
+if __name__ == "__main__":
+    # 実行コマンドは `python -m test.benchmark.speed.synthesis_query` である。
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_accent_phrase", type=int, default=500)
+    args = parser.parse_args()
+    n_accent_phrase: int = args.n_accent_phrase
+
+    result_deepcopy = benchmark_query_deepcopy(n_accent_phrase)
+    print(f"`copy.deepcopy(query)`: {result_deepcopy:.4f} sec")
+
+    result_legacy = benchmark_query_to_decoder_feature(n_accent_phrase, True)
+    result_current = benchmark_query_to_decoder_feature(n_accent_phrase, False)
+    print(f"前処理 (deepcopy あり): {result_legacy:.4f} sec")
+    print(f"前処理 (deepcopy なし): {result_current:.4f} sec")
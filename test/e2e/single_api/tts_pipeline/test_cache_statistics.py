@@ -0,0 +1,11 @@
+"""
+/cache_statistics API のテスト
+"""
+
+from fastapi.testclient import TestClient
+
+
+def test_get_cache_statistics_200(client: TestClient) -> None:
+    response = client.get("/cache_statistics")
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
@@ -0,0 +1,11 @@
+"""
+/inference_statistics API のテスト
+"""
+
+from fastapi.testclient import TestClient
+
+
+def test_get_inference_statistics_200(client: TestClient) -> None:
+    response = client.get("/inference_statistics")
+    assert response.status_code == 200
+    assert response.json() is None or "max_concurrency" in response.json()
@@ -0,0 +1,13 @@
+"""
+/ready API のテスト
+"""
+
+from fastapi.testclient import TestClient
+
+
+def test_get_ready_200(client: TestClient) -> None:
+    """ウォームアップ対象のモデルがなければ、準備完了として 200 を返す"""
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+    assert isinstance(response.json()["models"], dict)
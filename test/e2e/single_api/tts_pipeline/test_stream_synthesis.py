@@ -0,0 +1,63 @@
+"""
+/stream_synthesis API のテスト
+"""
+
+from test.e2e.single_api.utils import gen_mora
+
+from fastapi.testclient import TestClient
+
+
+def _gen_query() -> dict:
+    return {
+        "accent_phrases": [
+            {
+                "moras": [
+                    gen_mora("テ", "t", 2.3, "e", 0.8, 3.3),
+                    gen_mora("ス", "s", 2.1, "U", 0.3, 0.0),
+                    gen_mora("ト", "t", 2.3, "o", 1.8, 4.1),
+                ],
+                "accent": 1,
+                "pause_mora": None,
+                "is_interrogative": False,
+            }
+        ],
+        "speedScale": 1.0,
+        "pitchScale": 1.0,
+        "intonationScale": 1.0,
+        "volumeScale": 1.0,
+        "prePhonemeLength": 0.1,
+        "postPhonemeLength": 0.1,
+        "pauseLength": None,
+        "pauseLengthScale": 1.0,
+        "outputSamplingRate": 24000,
+        "outputStereo": False,
+        "kana": "テ'_スト",
+    }
+
+
+def test_post_stream_synthesis_wav_200(client: TestClient) -> None:
+    response = client.post(
+        "/stream_synthesis", params={"speaker": 0}, json=_gen_query()
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/wav"
+
+    content = response.read()
+    assert content[:4] == b"RIFF"
+    assert content[8:12] == b"WAVE"
+    assert len(content) > 44
+
+
+def test_post_stream_synthesis_pcm_200(client: TestClient) -> None:
+    response = client.post(
+        "/stream_synthesis",
+        params={"speaker": 0, "output_format": "pcm"},
+        json=_gen_query(),
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/pcm"
+
+    # 16bit リニア PCM なので、バイト数は 2 の倍数になる
+    content = response.read()
+    assert len(content) > 0
+    assert len(content) % 2 == 0
@@ -2,9 +2,11 @@
 /synthesis API のテスト
 """
 
+import io
 from test.e2e.single_api.utils import gen_mora
 from test.utility import hash_wave_floats_from_wav_bytes
 
+import soundfile
 from fastapi.testclient import TestClient
 from syrupy.assertion import SnapshotAssertion
 
@@ -75,3 +77,56 @@ def test_post_synthesis_old_audio_query_200(
     # 音声波形が一致する
     assert response.headers["content-type"] == "audio/wav"
     assert snapshot == hash_wave_floats_from_wav_bytes(response.read())
+
+
+def _gen_test_query() -> dict[str, object]:
+    return {
+        "accent_phrases": [
+            {
+                "moras": [
+                    gen_mora("テ", "t", 2.3, "e", 0.8, 3.3),
+                    gen_mora("ス", "s", 2.1, "U", 0.3, 0.0),
+                    gen_mora("ト", "t", 2.3, "o", 1.8, 4.1),
+                ],
+                "accent": 1,
+                "pause_mora": None,
+                "is_interrogative": False,
+            }
+        ],
+        "speedScale": 1.0,
+        "pitchScale": 1.0,
+        "intonationScale": 1.0,
+        "volumeScale": 1.0,
+        "prePhonemeLength": 0.1,
+        "postPhonemeLength": 0.1,
+        "pauseLength": None,
+        "pauseLengthScale": 1.0,
+        "outputSamplingRate": 24000,
+        "outputStereo": False,
+        "kana": "テ'_スト",
+    }
+
+
+def test_post_synthesis_flac_200(client: TestClient) -> None:
+    """出力形式に flac を指定すると FLAC で返す"""
+    response = client.post(
+        "/synthesis",
+        params={"speaker": 0, "output_format": "flac"},
+        json=_gen_test_query(),
+    )
+    assert response.status_code == 200
+
+    assert response.headers["content-type"] == "audio/flac"
+    info = soundfile.info(io.BytesIO(response.read()))
+    assert info.format == "FLAC"
+    assert info.samplerate == 24000
+
+
+def test_post_synthesis_unsupported_sample_format_422(client: TestClient) -> None:
+    """非可逆圧縮の出力形式で float32 を指定すると 422 を返す"""
+    response = client.post(
+        "/synthesis",
+        params={"speaker": 0, "output_format": "mp3", "sample_format": "float32"},
+        json=_gen_test_query(),
+    )
+    assert response.status_code == 422
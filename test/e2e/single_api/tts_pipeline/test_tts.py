@@ -0,0 +1,63 @@
+"""
+/tts API のテスト
+"""
+
+from fastapi.testclient import TestClient
+
+
+def test_post_tts_200(client: TestClient) -> None:
+    """/audio_query と /synthesis を順に呼び出した場合と同じ音声データを返す"""
+    query_response = client.post(
+        "/audio_query", params={"text": "テストです", "speaker": 0}
+    )
+    assert query_response.status_code == 200
+    synthesis_response = client.post(
+        "/synthesis", params={"speaker": 0}, json=query_response.json()
+    )
+    assert synthesis_response.status_code == 200
+
+    response = client.post("/tts", params={"text": "テストです", "speaker": 0})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/wav"
+    assert response.read() == synthesis_response.read()
+
+
+def test_post_tts_preset_200(client: TestClient) -> None:
+    """プリセットの値を初期値とし、個別に指定したパラメータを優先して音声合成する"""
+    # Setup
+    # NOTE: 事前準備用のプリセット API が壊れた場合、このテストが偽陽性で failed になる可能性がある
+    preset = {
+        "id": 8888,
+        "name": "test_preset",
+        "speaker_uuid": "123-456-789-234",
+        "style_id": 0,
+        "speedScale": 1.1,
+        "pitchScale": 0.1,
+        "intonationScale": 1.2,
+        "volumeScale": 1.3,
+        "prePhonemeLength": 0.2,
+        "postPhonemeLength": 0.3,
+        "pauseLength": None,
+        "pauseLengthScale": 1.4,
+    }
+    client.post("/add_preset", params={}, json=preset)
+    query_response = client.post(
+        "/audio_query_from_preset", params={"text": "テストです", "preset_id": 8888}
+    )
+    query = query_response.json()
+    query["speedScale"] = 1.5
+    synthesis_response = client.post("/synthesis", params={"speaker": 0}, json=query)
+    assert synthesis_response.status_code == 200
+
+    # Test
+    response = client.post(
+        "/tts", params={"text": "テストです", "preset_id": 8888, "speed_scale": 1.5}
+    )
+    assert response.status_code == 200
+    assert response.read() == synthesis_response.read()
+
+
+def test_post_tts_without_speaker_422(client: TestClient) -> None:
+    """スタイル ID とプリセット ID のどちらも指定されていなければ 422 を返す"""
+    response = client.post("/tts", params={"text": "テストです"})
+    assert response.status_code == 422
@@ -0,0 +1,23 @@
+"""
+/user_dict_version API のテスト
+"""
+
+from fastapi.testclient import TestClient
+
+
+def test_get_user_dict_version_200(client: TestClient) -> None:
+    response = client.get("/user_dict_version")
+    assert response.status_code == 200
+    assert response.json() == {"version": 0, "applied_version": 0}
+
+    operations = [
+        {
+            "action": "add",
+            "surface": "test",
+            "pronunciation": "テスト",
+            "accent_type": 1,
+        }
+    ]
+    client.post("/user_dict_words", json=operations)
+    # ユーザー辞書の変更は、適用を待たずにすぐにバージョンへ反映される
+    assert client.get("/user_dict_version").json()["version"] == 1
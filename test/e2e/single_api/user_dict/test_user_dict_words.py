@@ -0,0 +1,82 @@
+"""
+/user_dict_words API のテスト
+"""
+
+from fastapi.testclient import TestClient
+
+_EXISTING_WORD_UUID = "a89596ad-caa8-4f4e-8eb3-3d2261c798fd"
+
+
+def test_post_user_dict_words_200(client: TestClient) -> None:
+    operations = [
+        {
+            "action": "add",
+            "surface": "test",
+            "pronunciation": "テスト",
+            "accent_type": 1,
+        },
+        {
+            "action": "rewrite",
+            "word_uuid": _EXISTING_WORD_UUID,
+            "surface": "test",
+            "pronunciation": "テストサン",
+            "accent_type": 1,
+        },
+        {"action": "delete", "word_uuid": "c89596ad-caa8-4f4e-8eb3-3d2261c798fd"},
+    ]
+    response = client.post("/user_dict_words", json=operations)
+    assert response.status_code == 200
+    response_json = response.json()
+    assert response_json["committed"] is True
+    assert [result["success"] for result in response_json["results"]] == [True] * 3
+
+    # すべての操作がユーザー辞書に反映されている
+    new_word_uuid = response_json["results"][0]["word_uuid"]
+    user_dict = client.get("/user_dict").json()
+    assert set(user_dict) == {new_word_uuid, _EXISTING_WORD_UUID}
+    assert user_dict[_EXISTING_WORD_UUID]["pronunciation"] == "テストサン"
+
+
+def test_post_user_dict_words_atomic_rollback(client: TestClient) -> None:
+    operations = [
+        {
+            "action": "add",
+            "surface": "test",
+            "pronunciation": "テスト",
+            "accent_type": 1,
+        },
+        {"action": "delete", "word_uuid": "00000000-0000-4000-8000-000000000000"},
+    ]
+    response = client.post("/user_dict_words", json=operations)
+    assert response.status_code == 200
+    response_json = response.json()
+    assert response_json["committed"] is False
+    assert [result["success"] for result in response_json["results"]] == [False] * 2
+
+    # 1 件でも失敗した場合は、成功した操作も含めてユーザー辞書に反映されない
+    assert len(client.get("/user_dict").json()) == 2
+
+
+def test_post_user_dict_words_non_atomic(client: TestClient) -> None:
+    operations = [
+        {
+            "action": "add",
+            "surface": "test",
+            "pronunciation": "テスト",
+            "accent_type": 1,
+        },
+        {
+            "action": "add",
+            "surface": "test",
+            "pronunciation": "てすと",
+            "accent_type": 1,
+        },
+    ]
+    response = client.post(
+        "/user_dict_words", json=operations, params={"atomic": False}
+    )
+    assert response.status_code == 200
+    response_json = response.json()
+    assert response_json["committed"] is True
+    assert [result["success"] for result in response_json["results"]] == [True, False]
+    assert len(client.get("/user_dict").json()) == 3
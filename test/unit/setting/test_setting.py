@@ -2,6 +2,7 @@ from pathlib import Path
 
 from voicevox_engine.setting.model import CorsPolicyMode
 from voicevox_engine.setting.setting_manager import Setting, SettingHandler
+from voicevox_engine.tts_pipeline.onnx_session_config import OnnxSessionConfig
 
 
 def test_setting_handler_load_not_exist_file() -> None:
@@ -71,3 +72,25 @@ def test_setting_handler_save(tmp_path: Path) -> None:
     setting = setting_loader.load()  # NOTE: `.load()` の正常動作を前提とする
     # Test
     assert true_setting == setting
+
+
+def test_setting_handler_load_onnx_session() -> None:
+    """`SettingHandler` で ONNX Runtime のセッションの設定とモデルごとの上書き設定を読み込める。"""
+    # Inputs
+    setting_path = Path("test/unit/setting/setting-test-load-4.yaml")
+    setting_loader = SettingHandler(setting_path)
+    # Expects
+    true_setting = Setting(
+        cors_policy_mode=CorsPolicyMode.localapps,
+        allow_origin=None,
+        onnx_session=OnnxSessionConfig(
+            intra_op_num_threads=8,
+            execution_mode="sequential",
+            enable_cpu_mem_arena=False,
+        ),
+        onnx_session_overrides={"bert": OnnxSessionConfig(intra_op_num_threads=16)},
+    )
+    # Outputs
+    setting = setting_loader.load()
+    # Test
+    assert true_setting == setting
@@ -0,0 +1,103 @@
+"""AivmManager のテスト"""
+
+import io
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import aivmlib
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from onnx import TensorProto, helper
+
+from voicevox_engine.aivm_manager import AivmManager
+
+
+def _write_aivmx(file_path: Path, style_names: list[str]) -> str:
+    """指定されたスタイルを持つ最小限の AIVMX ファイルを書き込み、音声合成モデルの UUID を返す"""
+    graph = helper.make_graph(
+        [helper.make_node("Identity", ["x"], ["y"])],
+        "test",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [1])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [1])],
+    )
+    hyper_parameters = {
+        "model_name": file_path.stem,
+        "data": {
+            "spk2id": {file_path.stem: 0},
+            "style2id": {name: index for index, name in enumerate(style_names)},
+        },
+    }
+    style_vectors = io.BytesIO()
+    np.save(style_vectors, np.zeros((len(style_names), 256), dtype=np.float32))
+    style_vectors.seek(0)
+    aivm_metadata = aivmlib.generate_aivm_metadata(
+        aivmlib.ModelArchitecture.StyleBertVITS2JPExtra,
+        io.BytesIO(json.dumps(hyper_parameters).encode()),
+        style_vectors,
+    )
+    file_path.write_bytes(
+        aivmlib.write_aivmx_metadata(
+            io.BytesIO(helper.make_model(graph).SerializeToString()), aivm_metadata
+        )
+    )
+    return str(aivm_metadata.manifest.uuid)
+
+
+def test_get_style_index_entry(tmp_path: Path) -> None:
+    """スタイル ID から AIVM マニフェスト・話者・スタイル・ハイパーパラメータ上のスタイル名を取得できる"""
+    aivm_uuid = _write_aivmx(tmp_path / "model.aivmx", ["Calm", "Happy"])
+    aivm_manager = AivmManager(tmp_path, metadata_cache_dir=tmp_path / "caches")
+
+    speaker = aivm_manager.get_speakers()[0]
+    for style in speaker.styles:
+        entry = aivm_manager.get_style_index_entry(style.id)
+        assert str(entry.aivm_manifest.uuid) == aivm_uuid
+        assert str(entry.aivm_manifest_speaker.uuid) == speaker.speaker_uuid
+        assert entry.aivm_manifest_style.name == style.name
+        assert entry.local_style_name == style.name
+
+    with pytest.raises(HTTPException):
+        aivm_manager.get_style_index_entry(-1)
+
+
+def test_get_style_index_entry_after_uninstall(tmp_path: Path) -> None:
+    """アンインストールした音声合成モデルのスタイルは索引から削除される"""
+    _write_aivmx(tmp_path / "model1.aivmx", ["Calm"])
+    aivm_uuid = _write_aivmx(tmp_path / "model2.aivmx", ["Calm"])
+    aivm_manager = AivmManager(tmp_path, metadata_cache_dir=tmp_path / "caches")
+    style_id = aivm_manager.get_aivm_info(aivm_uuid).speakers[0].speaker.styles[0].id
+
+    aivm_manager.uninstall_aivm(aivm_uuid)
+
+    with pytest.raises(HTTPException):
+        aivm_manager.get_style_index_entry(style_id)
+
+
+def test_metadata_cache(tmp_path: Path) -> None:
+    """2 回目以降の起動では、AIVMX ファイルを開かずにキャッシュから AIVM メタデータを読み込む"""
+    aivm_uuid = _write_aivmx(tmp_path / "model.aivmx", ["Calm"])
+    AivmManager(tmp_path, metadata_cache_dir=tmp_path / "caches")
+
+    with patch("aivmlib.read_aivmx_metadata") as read_aivmx_metadata:
+        aivm_manager = AivmManager(tmp_path, metadata_cache_dir=tmp_path / "caches")
+        aivm_metadata = aivm_manager.get_aivm_metadata(aivm_uuid)
+        read_aivmx_metadata.assert_not_called()
+
+    assert str(aivm_metadata.manifest.uuid) == aivm_uuid
+    assert aivm_metadata.hyper_parameters.data.style2id == {"Calm": 0}
+    assert aivm_metadata.style_vectors is not None
+
+
+def test_metadata_cache_invalidated(tmp_path: Path) -> None:
+    """AIVMX ファイルが更新された場合は、キャッシュを使わずに読み込み直す"""
+    file_path = tmp_path / "model.aivmx"
+    _write_aivmx(file_path, ["Calm"])
+    AivmManager(tmp_path, metadata_cache_dir=tmp_path / "caches")
+
+    aivm_uuid = _write_aivmx(file_path, ["Calm", "Happy"])
+    aivm_manager = AivmManager(tmp_path, metadata_cache_dir=tmp_path / "caches")
+
+    aivm_metadata = aivm_manager.get_aivm_metadata(aivm_uuid)
+    assert aivm_metadata.hyper_parameters.data.style2id == {"Calm": 0, "Happy": 1}
@@ -0,0 +1,131 @@
+"""キャンセル可能な音声合成のテスト"""
+
+import contextvars
+import multiprocessing
+import pickle
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from voicevox_engine.cancellable_engine import (
+    CancellableEngine,
+    recv_result,
+    send_result,
+)
+from voicevox_engine.model import AudioQuery
+from voicevox_engine.tts_pipeline.cancellation import (
+    CancellationToken,
+    SynthesisCancelledError,
+    current_cancellation_token,
+)
+from voicevox_engine.tts_pipeline.onnx_session_config import (
+    BERT_MODEL_KEY,
+    OnnxSessionConfig,
+)
+
+
+def test_send_and_recv_result() -> None:
+    """音声波形は out-of-band バッファで送受信され、書き込み可能な NDArray として復元される"""
+    con1, con2 = multiprocessing.Pipe(True)
+    wave = np.linspace(-1.0, 1.0, 48000, dtype=np.float32)
+
+    send_result(con2, ("ok", wave))
+    status, received = recv_result(con1)
+
+    assert status == "ok"
+    assert received.dtype == np.float32
+    assert received.flags.writeable
+    np.testing.assert_array_equal(received, wave)
+
+    send_result(con2, ("http_error", 404, "not found"))
+    assert recv_result(con1) == ("http_error", 404, "not found")
+
+
+def test_synthesis_cancelled_while_waiting_for_worker(tmp_path: Path) -> None:
+    """ワーカープロセスの空きを待っている間にキャンセルされた場合は、ワーカープロセスを終了させずに戻す"""
+    # Inputs
+    engine = CancellableEngine(init_processes=0, use_gpu=False, installed_aivm_dir=tmp_path)  # fmt: skip
+    proc = MagicMock()
+    proc.is_alive.return_value = True
+    con = MagicMock()
+    token = CancellationToken()
+    context = contextvars.copy_context()
+    context.run(current_cancellation_token.set, token)
+    errors: list[BaseException] = []
+
+    def synthesize() -> None:
+        try:
+            context.run(engine._synthesis_impl, MagicMock(spec=AudioQuery), 0)
+        except BaseException as e:
+            errors.append(e)
+
+    # Outputs
+    thread = threading.Thread(target=synthesize)
+    thread.start()
+    time.sleep(0.1)  # ワーカープロセスの空きを待たせる
+    token.cancel()
+    engine.procs_and_cons.put((proc, con))
+    thread.join(timeout=5)
+
+    # Tests
+    assert len(errors) == 1 and isinstance(errors[0], SynthesisCancelledError)
+    con.send.assert_not_called()
+    proc.terminate.assert_not_called()
+    assert engine.procs_and_cons.get_nowait() == (proc, con)
+    assert engine.running_jobs == {}
+    with pytest.raises(SynthesisCancelledError):
+        context.run(engine._synthesis_impl, MagicMock(spec=AudioQuery), 0)
+
+
+def test_synthesis_recycles_worker_on_broken_result(tmp_path: Path) -> None:
+    """結果の受信の途中で失敗した場合は、パイプの状態が不明なためワーカープロセスを再利用しない"""
+    # Inputs
+    engine = CancellableEngine(init_processes=0, use_gpu=False, installed_aivm_dir=tmp_path)  # fmt: skip
+    proc = MagicMock()
+    proc.is_alive.return_value = True
+    con = MagicMock()
+    con.recv_bytes.return_value = b"broken"
+    engine.procs_and_cons.put((proc, con))
+    new_proc, new_con = MagicMock(), MagicMock()
+    engine.start_new_proc = MagicMock(return_value=(new_proc, new_con))  # type: ignore[method-assign]
+
+    # Outputs
+    with pytest.raises(Exception):
+        engine._synthesis_impl(MagicMock(spec=AudioQuery), 0)
+
+    # Tests
+    proc.terminate.assert_called_once()
+    con.close.assert_called_once()
+    assert engine.procs_and_cons.get_nowait() == (new_proc, new_con)
+
+
+def test_start_new_proc_passes_onnx_session_config(tmp_path: Path) -> None:
+    """ワーカープロセスにも ONNX Runtime のセッションの設定が、spawn で受け渡せる形で渡される"""
+    # Inputs
+    onnx_session_config = OnnxSessionConfig(intra_op_num_threads=2, quantization="int8")
+    onnx_session_overrides = {BERT_MODEL_KEY: OnnxSessionConfig(intra_op_num_threads=1)}
+    engine = CancellableEngine(
+        init_processes=0,
+        use_gpu=False,
+        installed_aivm_dir=tmp_path,
+        enable_optimized_onnx_model_cache=False,
+        onnx_session_config=onnx_session_config,
+        onnx_session_overrides=onnx_session_overrides,
+    )
+    engine._mp_context = MagicMock()
+    engine._mp_context.Pipe.return_value = (MagicMock(), MagicMock())
+
+    # Outputs
+    engine.start_new_proc()
+    kwargs = engine._mp_context.Process.call_args.kwargs["kwargs"]
+
+    # Tests
+    assert kwargs["enable_optimized_onnx_model_cache"] is False
+    assert kwargs["onnx_session_config"] == onnx_session_config
+    assert kwargs["onnx_session_overrides"] == onnx_session_overrides
+    restored = pickle.loads(pickle.dumps(kwargs["onnx_session_overrides"]))
+    assert restored == onnx_session_overrides
@@ -0,0 +1,93 @@
+"""LRU キャッシュのテスト"""
+
+from unittest.mock import patch
+
+from voicevox_engine.utility.lru_cache import CacheStatistics, LRUCache
+
+
+def test_lru_cache_get() -> None:
+    """追加したエントリを取得でき、ヒット・ミスが記録される"""
+    cache: LRUCache[str, int] = LRUCache()
+    cache.put("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.statistics() == CacheStatistics(
+        hits=1, misses=1, evictions=0, expirations=0, entries=1, total_bytes=0
+    )
+
+
+def test_lru_cache_max_entries() -> None:
+    """エントリ数の上限を超えると、最も長く参照されていないエントリが破棄される"""
+    evicted: list[str] = []
+    cache: LRUCache[str, int] = LRUCache(
+        max_entries=2, on_evict=lambda key, _: evicted.append(key)
+    )
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.keys() == ["a", "c"]
+    assert evicted == ["b"]
+    assert cache.statistics().evictions == 1
+
+
+def test_lru_cache_max_bytes() -> None:
+    """合計バイト数の上限を超えると、上限に収まるまで古いエントリが破棄される"""
+    cache: LRUCache[str, bytes] = LRUCache(max_bytes=10, get_size=len)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.put("c", b"12345678")
+
+    assert cache.keys() == ["c"]
+    assert cache.statistics().total_bytes == 8
+
+
+def test_lru_cache_keep_oversized_entry() -> None:
+    """単体で上限を超えるエントリも、追加直後は保持される"""
+    cache: LRUCache[str, int] = LRUCache(max_bytes=10)
+    cache.put("a", 1, size=5)
+    cache.put("b", 2, size=100)
+
+    assert cache.keys() == ["b"]
+    assert "b" in cache
+
+
+def test_lru_cache_put_overwrite() -> None:
+    """同じキーで追加すると値とバイト数が置き換えられる"""
+    cache: LRUCache[str, int] = LRUCache()
+    cache.put("a", 1, size=5)
+    cache.put("a", 2, size=3)
+
+    assert cache.peek("a") == 2
+    assert len(cache) == 1
+    assert cache.statistics().total_bytes == 3
+
+
+def test_lru_cache_pop() -> None:
+    """削除したエントリは破棄回数に数えられない"""
+    cache: LRUCache[str, int] = LRUCache()
+    cache.put("a", 1, size=5)
+
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    assert cache.statistics() == CacheStatistics(
+        hits=0, misses=0, evictions=0, expirations=0, entries=0, total_bytes=0
+    )
+
+
+def test_lru_cache_ttl() -> None:
+    """有効期限を過ぎたエントリは取得できず、期限切れとして記録される"""
+    cache: LRUCache[str, int] = LRUCache(ttl=60)
+    with patch("time.monotonic", return_value=1000.0):
+        cache.put("a", 1)
+    with patch("time.monotonic", return_value=1059.0):
+        assert cache.get("a") == 1
+    with patch("time.monotonic", return_value=1060.0):
+        assert "a" not in cache
+        assert cache.get("a") is None
+
+    statistics = cache.statistics()
+    assert (statistics.hits, statistics.misses, statistics.expirations) == (1, 1, 1)
+    assert statistics.entries == 0
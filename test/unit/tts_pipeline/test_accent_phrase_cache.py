@@ -0,0 +1,69 @@
+"""テキストの言語解析結果のキャッシュのテスト"""
+
+from voicevox_engine.tts_pipeline.accent_phrase_cache import AccentPhraseCache
+from voicevox_engine.tts_pipeline.model import AccentPhrase, Mora
+
+
+def _gen_accent_phrases(text: str) -> list[AccentPhrase]:
+    moras = [
+        Mora(
+            text=char,
+            consonant=None,
+            consonant_length=None,
+            vowel="a",
+            vowel_length=0.1,
+            pitch=5.0,
+        )
+        for char in text
+    ]
+    return [AccentPhrase(moras=moras, accent=1, pause_mora=None)]
+
+
+def test_accent_phrase_cache() -> None:
+    """同じテキストのアクセント句系列は 2 回目以降キャッシュから返され、返り値を書き換えてもキャッシュは壊れない"""
+    # Inputs
+    calls: list[str] = []
+
+    def analyze(text: str) -> list[AccentPhrase]:
+        calls.append(text)
+        return _gen_accent_phrases(text)
+
+    accent_phrase_cache = AccentPhraseCache(16, lambda: 0)
+
+    # Outputs
+    result1 = accent_phrase_cache.get_accent_phrases("アイ", analyze)
+    result1[0].moras[0].pitch = 0.0  # 返り値を書き換えてもキャッシュは壊れない
+    result1[0].accent = 2
+    result2 = accent_phrase_cache.get_accent_phrases("アイ", analyze)
+    result3 = accent_phrase_cache.get_accent_phrases("アイウ", analyze)
+
+    # Tests
+    assert calls == ["アイ", "アイウ"]
+    assert result2 == _gen_accent_phrases("アイ")
+    assert result3 == _gen_accent_phrases("アイウ")
+    statistics = accent_phrase_cache.statistics()
+    assert (statistics.hits, statistics.misses) == (1, 2)
+
+
+def test_accent_phrase_cache_dict_generation() -> None:
+    """ユーザー辞書の世代番号が変わると、同じテキストでも解析し直す"""
+    # Inputs
+    generation = 0
+    calls: list[str] = []
+
+    def analyze(text: str) -> list[tuple[str, int]]:
+        calls.append(text)
+        return [(char, generation) for char in text]
+
+    accent_phrase_cache = AccentPhraseCache(16, lambda: generation)
+
+    # Outputs
+    result1 = accent_phrase_cache.get_kata_tone_list("アイ", analyze)
+    result2 = accent_phrase_cache.get_kata_tone_list("アイ", analyze)
+    generation = 1
+    result3 = accent_phrase_cache.get_kata_tone_list("アイ", analyze)
+
+    # Tests
+    assert calls == ["アイ", "アイ"]
+    assert result1 == result2 == [("ア", 0), ("イ", 0)]
+    assert result3 == [("ア", 1), ("イ", 1)]
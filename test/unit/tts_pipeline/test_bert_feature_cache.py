@@ -0,0 +1,88 @@
+"""BERT 特徴量のキャッシュのテスト"""
+
+import sys
+import types
+from typing import Any
+
+import numpy as np
+import pytest
+from numpy.typing import NDArray
+
+from voicevox_engine.tts_pipeline.bert_feature_cache import BertFeatureCache
+from voicevox_engine.tts_pipeline.cancellation import install_cancellation_points
+
+
+def test_bert_feature_cache() -> None:
+    """同じテキスト・word2ph の BERT 特徴量は 2 回目以降キャッシュから返される"""
+    # Inputs
+    calls: list[str] = []
+
+    def extract_bert_feature(text: str, word2ph: list[int], *args: Any) -> NDArray[Any]:
+        calls.append(text)
+        return np.ones((4, sum(word2ph)), dtype=np.float32)
+
+    bert_feature_cache = BertFeatureCache(max_bytes=1024 * 1024)
+    cached_extract_bert_feature = bert_feature_cache.wrap(extract_bert_feature)
+
+    # Outputs
+    result1 = cached_extract_bert_feature("テスト", [1, 2, 2, 1], "JP")
+    result1[:] = 0  # 返り値を書き換えてもキャッシュは壊れない
+    result2 = cached_extract_bert_feature("テスト", [1, 2, 2, 1], "JP")
+    result3 = cached_extract_bert_feature("テスト", [1, 2, 1, 2], "JP")
+
+    # Tests
+    assert calls == ["テスト", "テスト"]
+    np.testing.assert_array_equal(result2, np.ones((4, 6), dtype=np.float32))
+    assert result3.shape == (4, 6)
+    statistics = bert_feature_cache.statistics()
+    assert (statistics.hits, statistics.misses) == (1, 2)
+
+
+def test_bert_feature_cache_max_bytes() -> None:
+    """キャッシュする BERT 特徴量の合計バイト数は上限を超えない"""
+    # Inputs
+    bert_feature_cache = BertFeatureCache(max_bytes=100)
+    cached_extract_bert_feature = bert_feature_cache.wrap(
+        lambda text, word2ph: np.ones(len(text), dtype=np.float32)
+    )
+
+    # Outputs
+    for text in [
+        "あいうえお",
+        "かきくけこ",
+        "さしすせそ",
+        "たちつてと",
+        "なにぬねの",
+        "はひふへほ",
+    ]:
+        cached_extract_bert_feature(text, [1])
+
+    # Tests
+    statistics = bert_feature_cache.statistics()
+    assert statistics.total_bytes <= 100
+    assert statistics.evictions == 1
+
+
+def test_bert_feature_cache_reinstall(monkeypatch: pytest.MonkeyPatch) -> None:
+    """キャンセルポイントを差し込んだ後に差し替え直しても、キャッシュやキャンセルポイントは二重にならない"""
+    # Inputs
+    module = types.ModuleType("fake_infer_onnx")
+
+    def extract_bert_feature(text: str, word2ph: list[int]) -> NDArray[Any]:
+        return np.ones(len(text), dtype=np.float32)
+
+    module.extract_bert_feature = extract_bert_feature  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    monkeypatch.setattr(BertFeatureCache, "TARGET_MODULE_NAME", module.__name__)
+    monkeypatch.setattr(BertFeatureCache, "TARGET_FUNCTION_NAME", "extract_bert_feature")  # fmt: skip
+
+    # Outputs
+    for _ in range(2):
+        assert BertFeatureCache(max_bytes=1024).install()
+        assert install_cancellation_points(module.__name__, "extract_bert_feature")
+    installed = module.extract_bert_feature  # type: ignore[attr-defined]
+
+    # Tests
+    assert getattr(installed, "_with_cancellation_points", False) is True
+    assert getattr(installed.__wrapped__, "_with_bert_feature_cache", False) is True
+    assert installed.__wrapped__.__wrapped__ is extract_bert_feature
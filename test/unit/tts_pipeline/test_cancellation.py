@@ -0,0 +1,158 @@
+"""音声合成のキャンセルのテスト"""
+
+import asyncio
+import contextvars
+import sys
+import time
+import types
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from fastapi import Request
+
+from voicevox_engine.tts_pipeline.cancellation import (
+    CancellationToken,
+    SynthesisCancelledError,
+    current_cancellation_token,
+    install_cancellation_points,
+    iterate_cancellable_in_threadpool,
+    raise_if_cancelled,
+    run_cancellable_in_threadpool,
+)
+
+
+def test_cancellation_token_callbacks() -> None:
+    """キャンセルすると登録済みのコールバックが 1 回だけ呼ばれ、キャンセル後に登録したコールバックはその場で呼ばれる"""
+    token = CancellationToken()
+    calls: list[str] = []
+    token.add_callback(lambda: calls.append("registered"))
+    removed = lambda: calls.append("removed")  # noqa: E731
+    token.add_callback(removed)
+    token.remove_callback(removed)
+
+    token.cancel()
+    token.cancel()
+    token.add_callback(lambda: calls.append("late"))
+
+    assert token.is_cancelled
+    assert calls == ["registered", "late"]
+    with pytest.raises(SynthesisCancelledError):
+        token.raise_if_cancelled()
+
+
+def test_raise_if_cancelled_without_token() -> None:
+    """キャンセル要求のトークンが設定されていなければ、キャンセルポイントは何もしない"""
+    assert current_cancellation_token.get() is None
+    raise_if_cancelled()
+
+
+def _make_request(messages: list[dict[str, Any]]) -> Request:
+    """指定した ASGI メッセージを順に受け取り、以降は受信を待ち続けるリクエストを作る"""
+    queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    for message in messages:
+        queue.put_nowait(message)
+
+    async def receive() -> dict[str, Any]:
+        return await queue.get()
+
+    return Request({"type": "http", "method": "POST", "headers": []}, receive)
+
+
+def test_run_cancellable_in_threadpool_cancelled_on_disconnect() -> None:
+    """実行中に http.disconnect を受け取ると、実行中の関数から参照できるトークンがキャンセルされる"""
+
+    async def run() -> None:
+        request = _make_request([{"type": "http.disconnect"}])
+
+        def synthesize() -> None:
+            token = current_cancellation_token.get()
+            assert token is not None
+            for _ in range(500):
+                raise_if_cancelled()
+                time.sleep(0.01)
+
+        with pytest.raises(SynthesisCancelledError):
+            await run_cancellable_in_threadpool(request, synthesize)
+
+    asyncio.run(run())
+
+
+def test_run_cancellable_in_threadpool_returns_result() -> None:
+    """接続が切断されなければ、関数の戻り値をそのまま返す"""
+
+    async def run() -> str:
+        request = _make_request([])
+        return await run_cancellable_in_threadpool(request, lambda: "done")
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_iterate_cancellable_in_threadpool_cancelled_on_close() -> None:
+    """途中で打ち切られると、要素の生成中に参照できるトークンがキャンセルされ、残りの要素は生成されない"""
+    token = CancellationToken()
+    generated: list[int] = []
+
+    def generate() -> Iterator[int]:
+        for index in range(3):
+            assert current_cancellation_token.get() is token
+            raise_if_cancelled()
+            generated.append(index)
+            yield index
+
+    async def run() -> list[int]:
+        items: list[int] = []
+        iterator = iterate_cancellable_in_threadpool(generate(), token)
+        async for item in iterator:
+            items.append(item)
+            # ストリーミングレスポンスの送信中にクライアントとの接続が切断された状況を再現する
+            break
+        await iterator.aclose()  # type: ignore[attr-defined]
+        return items
+
+    assert asyncio.run(run()) == [0]
+    assert token.is_cancelled
+    assert generated == [0]
+
+
+def test_iterate_cancellable_in_threadpool_returns_all_items() -> None:
+    """打ち切られなければ、全ての要素をそのまま返す"""
+
+    async def run() -> list[int]:
+        token = CancellationToken()
+        return [item async for item in iterate_cancellable_in_threadpool(iter([1, 2, 3]), token)]  # fmt: skip
+
+    assert asyncio.run(run()) == [1, 2, 3]
+
+
+def test_install_cancellation_points(monkeypatch: pytest.MonkeyPatch) -> None:
+    """BERT 特徴量のキャッシュを使わない場合も、差し替えた関数の呼び出し前後でキャンセルを検知できる"""
+    # Inputs
+    module = types.ModuleType("fake_infer_onnx")
+    calls: list[str] = []
+
+    def extract_bert_feature(text: str) -> str:
+        calls.append(text)
+        current_cancellation_token.get().cancel()  # type: ignore[union-attr]
+        return text
+
+    module.extract_bert_feature = extract_bert_feature  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+
+    # Outputs
+    assert install_cancellation_points(module.__name__, "extract_bert_feature")
+    assert install_cancellation_points(module.__name__, "extract_bert_feature")
+    installed = module.extract_bert_feature  # type: ignore[attr-defined]
+
+    # Tests
+    assert installed.__wrapped__ is extract_bert_feature
+    context = contextvars.copy_context()
+    context.run(current_cancellation_token.set, CancellationToken())
+    # 呼び出し中にキャンセルされると、呼び出し後のキャンセルポイントで打ち切られる
+    with pytest.raises(SynthesisCancelledError):
+        context.run(installed, "テスト")
+    # キャンセル済みなら、呼び出し前のキャンセルポイントで打ち切られる
+    with pytest.raises(SynthesisCancelledError):
+        context.run(installed, "テスト")
+    assert calls == ["テスト"]
+    assert not install_cancellation_points("fake_missing_module", "extract_bert_feature")  # fmt: skip
@@ -0,0 +1,143 @@
+"""推論スケジューラのテスト"""
+
+import threading
+import time
+
+import pytest
+
+from voicevox_engine.tts_pipeline.cancellation import (
+    CancellationToken,
+    SynthesisCancelledError,
+    current_cancellation_token,
+)
+from voicevox_engine.tts_pipeline.inference_scheduler import (
+    InferencePriority,
+    InferenceQueueFullError,
+    InferenceScheduler,
+)
+
+
+def _wait_until_queued(scheduler: InferenceScheduler, queued: int) -> None:
+    """待ち行列の長さが指定した値になるまで待つ"""
+    for _ in range(500):
+        if scheduler.statistics().queued == queued:
+            return
+        time.sleep(0.01)
+    raise TimeoutError
+
+
+def _acquire_in_thread(
+    scheduler: InferenceScheduler, priority: InferencePriority, order: list[str]
+) -> threading.Thread:
+    """別スレッドで実行枠を確保し、確保できた順に優先度の名前を記録する"""
+
+    def acquire() -> None:
+        with scheduler.acquire(priority):
+            order.append(priority.name)
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    return thread
+
+
+def test_inference_scheduler_priority() -> None:
+    """実行枠が空くと、到着順に関わらず優先度の高い推論から実行される"""
+    scheduler = InferenceScheduler(max_concurrency=1, max_queue_size=None)
+    order: list[str] = []
+
+    with scheduler.acquire():
+        batch = _acquire_in_thread(scheduler, InferencePriority.BATCH, order)
+        _wait_until_queued(scheduler, 1)
+        interactive = _acquire_in_thread(scheduler, InferencePriority.INTERACTIVE, order)  # fmt: skip
+        _wait_until_queued(scheduler, 2)
+    batch.join()
+    interactive.join()
+
+    assert order == ["INTERACTIVE", "BATCH"]
+    statistics = scheduler.statistics()
+    assert (statistics.running, statistics.queued, statistics.completed) == (0, 0, 3)
+
+
+def test_inference_scheduler_queue_full() -> None:
+    """待ち行列が上限に達すると新たな推論を拒否するが、上限を適用しない推論は待たせる"""
+    scheduler = InferenceScheduler(max_concurrency=1, max_queue_size=1)
+    order: list[str] = []
+
+    with scheduler.acquire():
+        waiting = _acquire_in_thread(scheduler, InferencePriority.INTERACTIVE, order)
+        _wait_until_queued(scheduler, 1)
+        with pytest.raises(InferenceQueueFullError):
+            with scheduler.acquire():
+                pass
+
+        def acquire_without_limit() -> None:
+            with scheduler.acquire(enforce_queue_limit=False):
+                order.append("UNLIMITED")
+
+        unlimited = threading.Thread(target=acquire_without_limit)
+        unlimited.start()
+        _wait_until_queued(scheduler, 2)
+    waiting.join()
+    unlimited.join()
+
+    assert order == ["INTERACTIVE", "UNLIMITED"]
+    assert scheduler.statistics().rejected == 1
+
+
+def test_inference_scheduler_max_concurrency() -> None:
+    """同時に実行される推論の数は上限を超えない"""
+    scheduler = InferenceScheduler(max_concurrency=2, max_queue_size=None)
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def infer() -> None:
+        nonlocal running, max_running
+        with scheduler.acquire():
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+
+    threads = [threading.Thread(target=infer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max_running == 2
+    assert scheduler.statistics().completed == 8
+
+
+def test_inference_scheduler_cancel_while_queued() -> None:
+    """実行枠を待っている間にキャンセルされると、待ち行列から抜けて後続の推論が繰り上がる"""
+    scheduler = InferenceScheduler(max_concurrency=1, max_queue_size=None)
+    token = CancellationToken()
+    errors: list[Exception] = []
+    order: list[str] = []
+
+    def acquire_cancellable() -> None:
+        current_cancellation_token.set(token)
+        try:
+            with scheduler.acquire():
+                order.append("CANCELLED")
+        except SynthesisCancelledError as e:
+            errors.append(e)
+
+    with scheduler.acquire():
+        cancellable = threading.Thread(target=acquire_cancellable)
+        cancellable.start()
+        _wait_until_queued(scheduler, 1)
+        batch = _acquire_in_thread(scheduler, InferencePriority.BATCH, order)
+        _wait_until_queued(scheduler, 2)
+        token.cancel()
+        cancellable.join()
+        assert scheduler.statistics().queued == 1
+    batch.join()
+
+    assert len(errors) == 1
+    assert order == ["BATCH"]
+    statistics = scheduler.statistics()
+    assert (statistics.cancelled, statistics.completed) == (1, 2)
@@ -0,0 +1,54 @@
+"""長いテキストの分割合成のための、分割単位のまとめ上げと音声波形の連結のテスト"""
+
+import numpy as np
+
+from voicevox_engine.tts_pipeline.long_text_synthesis import (
+    concatenate_with_crossfade,
+    group_segments_into_chunks,
+    trim_silence,
+)
+
+
+def test_group_segments_into_chunks() -> None:
+    """合計の長さが上限を超えない範囲でまとめ、上限を超える分割単位は単独のまとまりにする"""
+    assert group_segments_into_chunks([3, 3, 3, 10, 2, 2], 6) == [
+        (0, 2),
+        (2, 3),
+        (3, 4),
+        (4, 6),
+    ]
+    assert group_segments_into_chunks([], 6) == []
+
+
+def test_trim_silence() -> None:
+    """指定された側の無音区間だけを、余白を残して切り詰める"""
+    wave = np.zeros(1000, dtype=np.float32)
+    wave[400:600] = 0.5
+
+    trimmed = trim_silence(wave, 1000, margin_seconds=0.01)
+    assert len(trimmed) == 220
+    assert len(trim_silence(wave, 1000, trim_head=False, margin_seconds=0.01)) == 610
+    # 全体が無音の場合はそのまま返す
+    silence = np.zeros(100, dtype=np.float32)
+    assert len(trim_silence(silence, 1000)) == 100
+
+
+def test_concatenate_with_crossfade() -> None:
+    """間に無音区間を挟み、継ぎ目を重ね合わせた分だけ短くなるように連結する"""
+    sample_rate = 1000
+    waves = [np.ones(100, dtype=np.float32), np.ones(200, dtype=np.float32)]
+
+    # 無音区間なし: 継ぎ目の 10 サンプルが重なり、フェードアウトとフェードインの和は 1 になる
+    result = concatenate_with_crossfade(waves, sample_rate, [0.0], 0.01)
+    assert len(result) == 290
+    np.testing.assert_allclose(result, np.ones(290), atol=1e-6)
+
+    # 無音区間あり: 前の音声波形は無音区間に向かってフェードアウトし、次の音声波形はそのまま始まる
+    result = concatenate_with_crossfade(waves, sample_rate, [0.05], 0.01)
+    assert len(result) == 100 + 50 + 200 - 10
+    assert result[89] == 1.0
+    assert result[99] == 0.0
+    np.testing.assert_array_equal(result[100:140], np.zeros(40))
+    np.testing.assert_array_equal(result[140:], np.ones(200))
+
+    assert len(concatenate_with_crossfade([], sample_rate, [])) == 0
@@ -0,0 +1,69 @@
+"""音声合成モデルのウォームアップのテスト"""
+
+from voicevox_engine.metas.Metas import StyleId
+from voicevox_engine.tts_pipeline.model_warmup import ModelWarmer
+
+
+def test_model_warmer() -> None:
+    """ウォームアップ対象のモデルをロードし、指定されたスタイル (未指定なら全てのスタイル) でダミーの推論を行う"""
+    # Inputs
+    loaded: list[str] = []
+    warmed_up: list[StyleId] = []
+    model_warmer = ModelWarmer(
+        {"model-a": None, "model-b": [StyleId(20)]},
+        load_model=loaded.append,
+        get_style_ids=lambda aivm_uuid: [StyleId(10), StyleId(11)],
+        warmup_style=warmed_up.append,
+    )
+    assert model_warmer.is_ready() is False
+
+    # Outputs
+    model_warmer.start()
+    model_warmer.join()
+    statuses = model_warmer.statuses()
+
+    # Tests
+    assert loaded == ["model-a", "model-b"]
+    assert warmed_up == [StyleId(10), StyleId(11), StyleId(20)]
+    assert statuses["model-a"].state == "ready"
+    assert statuses["model-a"].warmed_up_style_ids == [StyleId(10), StyleId(11)]
+    assert statuses["model-b"].warmed_up_style_ids == [StyleId(20)]
+    assert model_warmer.is_ready() is True
+
+    # アンロードされたモデルは次の音声合成時に再ロードされるため、準備完了のまま扱う
+    model_warmer.mark_unloaded("model-a")
+    assert model_warmer.statuses()["model-a"].state == "unloaded"
+    assert model_warmer.is_ready() is True
+
+
+def test_model_warmer_failure() -> None:
+    """ウォームアップに失敗したモデルがあれば準備完了にならず、インストール後に再度ウォームアップできる"""
+    # Inputs
+    installed: set[str] = set()
+
+    def load_model(aivm_uuid: str) -> None:
+        if aivm_uuid not in installed:
+            raise ValueError(f"{aivm_uuid} is not installed")
+
+    model_warmer = ModelWarmer(
+        {"model-a": [StyleId(0)]},
+        load_model=load_model,
+        get_style_ids=lambda aivm_uuid: [],
+        warmup_style=lambda style_id: None,
+    )
+
+    # Outputs
+    model_warmer.start()
+    model_warmer.join()
+    failed_status = model_warmer.statuses()["model-a"]
+    installed.add("model-a")
+    model_warmer.warmup("model-a")
+    model_warmer.warmup("model-x")  # ウォームアップ対象でなければ何もしない
+    model_warmer.join()
+
+    # Tests
+    assert failed_status.state == "failed"
+    assert failed_status.error == "model-a is not installed"
+    assert model_warmer.statuses()["model-a"].state == "ready"
+    assert "model-x" not in model_warmer.statuses()
+    assert model_warmer.is_ready() is True
@@ -0,0 +1,162 @@
+"""ONNX Runtime のセッションの設定のテスト"""
+
+import os
+from pathlib import Path
+from typing import Any
+
+import onnx
+import onnxruntime
+import pytest
+from onnx import TensorProto, helper
+
+from voicevox_engine.tts_pipeline.onnx_session_config import (
+    BERT_MODEL_KEY,
+    OnnxSessionConfig,
+    OnnxSessionConfigurator,
+)
+from voicevox_engine.tts_pipeline.quantized_onnx_model_cache import (
+    QuantizedOnnxModelCache,
+)
+
+
+def _save_model(path: Path) -> None:
+    """入力をそのまま返す ONNX モデルを保存する"""
+    graph = helper.make_graph(
+        [helper.make_node("Identity", ["x"], ["y"])],
+        "test",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [2])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [2])],
+    )
+    model = helper.make_model(
+        graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=8
+    )
+    onnx.save(model, str(path))
+
+
+def test_onnx_session_config_merge() -> None:
+    """上書き設定で指定されている項目だけが上書きされる"""
+    config = OnnxSessionConfig(intra_op_num_threads=4, execution_mode="sequential")
+    merged = config.merge(
+        OnnxSessionConfig(intra_op_num_threads=8, enable_cpu_mem_arena=False)
+    )
+    assert merged == OnnxSessionConfig(
+        intra_op_num_threads=8,
+        execution_mode="sequential",
+        enable_cpu_mem_arena=False,
+    )
+
+
+def test_onnx_session_config_apply() -> None:
+    """指定されている項目だけがセッションのオプションに反映される"""
+    sess_options = onnxruntime.SessionOptions()
+    default_inter_op_num_threads = sess_options.inter_op_num_threads
+    OnnxSessionConfig(
+        intra_op_num_threads=3,
+        execution_mode="parallel",
+        graph_optimization_level="basic",
+        enable_cpu_mem_arena=False,
+        intra_op_allow_spinning=False,
+    ).apply(sess_options)
+
+    assert sess_options.intra_op_num_threads == 3
+    assert sess_options.inter_op_num_threads == default_inter_op_num_threads
+    assert sess_options.execution_mode == onnxruntime.ExecutionMode.ORT_PARALLEL
+    assert (
+        sess_options.graph_optimization_level
+        == onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC
+    )
+    assert sess_options.enable_cpu_mem_arena is False
+    assert (
+        sess_options.get_session_config_entry("session.intra_op.allow_spinning") == "0"
+    )
+
+
+def test_onnx_session_configurator_install(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """差し替えた onnxruntime.InferenceSession で、読み込み中のモデルの上書き設定が反映される"""
+    # Inputs
+    monkeypatch.setattr(onnxruntime, "InferenceSession", onnxruntime.InferenceSession)
+    model_path = tmp_path / "model.onnx"
+    _save_model(model_path)
+    configurator = OnnxSessionConfigurator(
+        OnnxSessionConfig(intra_op_num_threads=2, enable_cpu_mem_arena=False),
+        {BERT_MODEL_KEY: OnnxSessionConfig(intra_op_num_threads=3)},
+    )
+    configurator.install()
+    providers = ["CPUExecutionProvider"]
+
+    # Outputs
+    with configurator.target(BERT_MODEL_KEY):
+        bert_session = onnxruntime.InferenceSession(str(model_path), providers=providers)  # fmt: skip
+    with configurator.target("a59cb814-0083-4369-8542-f51a29e72af7"):
+        tts_session = onnxruntime.InferenceSession(str(model_path), providers=providers)  # fmt: skip
+
+    # Test
+    bert_options = bert_session.get_session_options()
+    assert bert_options.intra_op_num_threads == 3
+    assert bert_options.enable_cpu_mem_arena is False
+    tts_options = tts_session.get_session_options()
+    assert tts_options.intra_op_num_threads == 2
+    assert tts_options.enable_cpu_mem_arena is False
+
+
+def test_onnx_session_configurator_quantization(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """量子化が指定されたモデルだけ、CPU で推論する場合に量子化済みモデルからセッションを作成する"""
+    # Inputs
+    model_path = tmp_path / "model.onnx"
+    _save_model(model_path)
+    quantized_path = tmp_path / "model.int8.onnx"
+    _save_model(quantized_path)
+    requested_paths: list[str] = []
+
+    class FakeQuantizedOnnxModelCache(QuantizedOnnxModelCache):
+        def get_quantized_model_path(self, model_path: str | os.PathLike[str]) -> Path:
+            requested_paths.append(str(model_path))
+            return quantized_path
+
+    configurator = OnnxSessionConfigurator(
+        OnnxSessionConfig(),
+        {BERT_MODEL_KEY: OnnxSessionConfig(quantization="int8")},
+        quantized_onnx_model_cache=FakeQuantizedOnnxModelCache(tmp_path / "cache"),
+    )
+    created_paths: list[str] = []
+
+    def inference_session_class(path_or_bytes: str, *args: Any, **kwargs: Any) -> Any:
+        created_paths.append(path_or_bytes)
+
+    # Outputs
+    with configurator.target(BERT_MODEL_KEY):
+        configurator.create_session(inference_session_class, str(model_path), providers=["CPUExecutionProvider"])  # fmt: skip
+        configurator.create_session(inference_session_class, str(model_path), providers=["CUDAExecutionProvider", "CPUExecutionProvider"])  # fmt: skip
+    with configurator.target("a59cb814-0083-4369-8542-f51a29e72af7"):
+        configurator.create_session(inference_session_class, str(model_path), providers=["CPUExecutionProvider"])  # fmt: skip
+
+    # Test
+    assert requested_paths == [str(model_path)]
+    assert created_paths == [str(quantized_path), str(model_path), str(model_path)]
+
+
+def test_onnx_session_configurator_fingerprint() -> None:
+    """BERT モデルか対象のモデルの設定が変わった場合のみ、フィンガープリントが変わる"""
+    aivm_uuid = "a59cb814-0083-4369-8542-f51a29e72af7"
+    other_uuid = "e9339137-2ae3-4d41-9394-fb757a7e61e6"
+    fingerprint = OnnxSessionConfigurator(OnnxSessionConfig()).fingerprint(aivm_uuid)
+
+    assert fingerprint == OnnxSessionConfigurator(OnnxSessionConfig()).fingerprint(
+        aivm_uuid
+    )
+    assert fingerprint == OnnxSessionConfigurator(
+        OnnxSessionConfig(), {other_uuid: OnnxSessionConfig(quantization="int8")}
+    ).fingerprint(aivm_uuid)
+    assert fingerprint != OnnxSessionConfigurator(
+        OnnxSessionConfig(), {aivm_uuid: OnnxSessionConfig(quantization="int8")}
+    ).fingerprint(aivm_uuid)
+    assert fingerprint != OnnxSessionConfigurator(
+        OnnxSessionConfig(), {BERT_MODEL_KEY: OnnxSessionConfig(quantization="int8")}
+    ).fingerprint(aivm_uuid)
+    assert fingerprint != OnnxSessionConfigurator(
+        OnnxSessionConfig(graph_optimization_level="basic")
+    ).fingerprint(aivm_uuid)
@@ -0,0 +1,117 @@
+"""最適化済みの ONNX モデルのディスクキャッシュのテスト"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import onnx
+import onnxruntime
+import pytest
+from onnx import TensorProto, helper
+
+from voicevox_engine.tts_pipeline.onnx_session_config import (
+    OnnxSessionConfig,
+    OnnxSessionConfigurator,
+)
+from voicevox_engine.tts_pipeline.optimized_onnx_model_cache import (
+    OptimizedOnnxModelCache,
+)
+
+
+def _save_model(path: Path, scale: float) -> None:
+    """入力に定数を 2 回掛ける (グラフ最適化で 1 回にまとめられる) ONNX モデルを保存する"""
+    scale_tensor = helper.make_tensor("scale", TensorProto.FLOAT, [1], [scale])
+    graph = helper.make_graph(
+        [
+            helper.make_node("Mul", ["x", "scale"], ["y"]),
+            helper.make_node("Mul", ["y", "scale"], ["z"]),
+        ],
+        "test",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [2])],
+        [helper.make_tensor_value_info("z", TensorProto.FLOAT, [2])],
+        initializer=[scale_tensor],
+    )
+    model = helper.make_model(
+        graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=8
+    )
+    onnx.save(model, str(path))
+
+
+def _run(session: onnxruntime.InferenceSession) -> list[float]:
+    return session.run(None, {"x": np.array([1.0, 2.0], dtype=np.float32)})[0].tolist()
+
+
+def test_optimized_onnx_model_cache(tmp_path: Path) -> None:
+    """2 回目以降は最適化済みモデルからセッションを作成し、元のモデルが更新されたら最適化し直す"""
+    # Inputs
+    model_path = tmp_path / "model.onnx"
+    _save_model(model_path, 2.0)
+    cache = OptimizedOnnxModelCache(tmp_path / "cache")
+    providers = ["CPUExecutionProvider"]
+
+    # Outputs
+    session1 = cache.create_session(onnxruntime.InferenceSession, model_path, providers=providers)  # fmt: skip
+    session2 = cache.create_session(onnxruntime.InferenceSession, model_path, providers=providers)  # fmt: skip
+    stats_before_update = (cache.hits, cache.misses)
+    _save_model(model_path, 3.0)
+    session3 = cache.create_session(onnxruntime.InferenceSession, model_path, providers=providers)  # fmt: skip
+
+    # Tests
+    assert _run(session1) == _run(session2) == [4.0, 8.0]
+    assert stats_before_update == (1, 1)
+    assert _run(session3) == [9.0, 18.0]
+    assert (cache.hits, cache.misses) == (1, 2)
+    # 更新前のモデルの最適化済みモデルは削除される
+    assert len(list((tmp_path / "cache").glob(f"*{cache.SUFFIX}"))) == 1
+
+
+def test_optimized_onnx_model_cache_session_factory(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """差し替えた onnxruntime.InferenceSession のセッションの作成関数として、最適化済みモデルのキャッシュが使われる"""
+    # Inputs
+    monkeypatch.setattr(onnxruntime, "InferenceSession", onnxruntime.InferenceSession)
+    model_path = tmp_path / "model.onnx"
+    _save_model(model_path, 2.0)
+    cache = OptimizedOnnxModelCache(tmp_path / "cache")
+    OnnxSessionConfigurator(
+        OnnxSessionConfig(), session_factory=cache.create_session
+    ).install()
+    providers = ["CPUExecutionProvider"]
+
+    # Outputs
+    session1 = onnxruntime.InferenceSession(str(model_path), providers=providers)
+    session2 = onnxruntime.InferenceSession(str(model_path), providers=providers)
+
+    # Tests
+    assert isinstance(session2, onnxruntime.InferenceSession)
+    assert _run(session1) == _run(session2) == [4.0, 8.0]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_optimized_onnx_model_cache_prune(tmp_path: Path) -> None:
+    """元のモデルが削除・更新された最適化済みモデルだけが削除される"""
+    # Inputs
+    cache_dir = tmp_path / "cache"
+    cache = OptimizedOnnxModelCache(cache_dir)
+    providers = ["CPUExecutionProvider"]
+    model_paths = [tmp_path / f"model{index}.onnx" for index in range(3)]
+    for model_path in model_paths:
+        _save_model(model_path, 2.0)
+        cache.create_session(onnxruntime.InferenceSession, model_path, providers=providers)  # fmt: skip
+
+    # Outputs
+    cache.prune()
+    count_before_changes = len(list(cache_dir.glob(f"*{cache.SUFFIX}")))
+    model_paths[1].unlink()  # アンインストール
+    _save_model(model_paths[2], 3.0)  # 更新後に一度も読み込まれていない
+    os.utime(model_paths[2], ns=(0, 0))
+    cache.prune()
+
+    # Tests
+    assert count_before_changes == 3
+    assert len(list(cache_dir.glob(f"*{cache.SUFFIX}"))) == 1
+    assert len(list(cache_dir.glob(f"*{cache.SOURCE_SUFFIX}"))) == 1
+    # 残った最適化済みモデルは引き続き再利用される
+    cache.create_session(onnxruntime.InferenceSession, model_paths[0], providers=providers)  # fmt: skip
+    assert (cache.hits, cache.misses) == (1, 3)
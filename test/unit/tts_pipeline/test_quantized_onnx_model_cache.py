@@ -0,0 +1,65 @@
+"""INT8 に動的量子化した ONNX モデルのディスクキャッシュのテスト"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import onnx
+import onnxruntime
+from onnx import TensorProto, helper, numpy_helper
+
+from voicevox_engine.tts_pipeline.quantized_onnx_model_cache import (
+    QuantizedOnnxModelCache,
+)
+
+
+def _save_model(path: Path, seed: int) -> None:
+    """入力に重み行列を掛ける ONNX モデルを保存する"""
+    weight = np.random.default_rng(seed).standard_normal((64, 64)).astype(np.float32)
+    graph = helper.make_graph(
+        [helper.make_node("MatMul", ["x", "weight"], ["y"])],
+        "test",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 64])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 64])],
+        initializer=[numpy_helper.from_array(weight, "weight")],
+    )
+    model = helper.make_model(
+        graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=8
+    )
+    onnx.save(model, str(path))
+
+
+def _run(model_path: Path) -> np.ndarray:
+    session = onnxruntime.InferenceSession(
+        str(model_path), providers=["CPUExecutionProvider"]
+    )
+    x = np.linspace(-1.0, 1.0, 64, dtype=np.float32).reshape(1, 64)
+    return session.run(None, {"x": x})[0]
+
+
+def test_quantized_onnx_model_cache(tmp_path: Path) -> None:
+    """初回だけ量子化して保存し、元のモデルが更新されたら量子化し直す"""
+    # Inputs
+    model_path = tmp_path / "model.onnx"
+    _save_model(model_path, 0)
+    cache = QuantizedOnnxModelCache(tmp_path / "cache")
+
+    # Outputs
+    quantized_path1 = cache.get_quantized_model_path(model_path)
+    mtime1 = quantized_path1.stat().st_mtime_ns
+    quantized_path2 = cache.get_quantized_model_path(model_path)
+
+    # Test
+    assert quantized_path1 == quantized_path2
+    assert quantized_path2.stat().st_mtime_ns == mtime1
+    op_types = {node.op_type for node in onnx.load(str(quantized_path1)).graph.node}
+    assert "MatMulInteger" in op_types
+    expected = _run(model_path)
+    np.testing.assert_allclose(_run(quantized_path1), expected, atol=0.5)
+
+    # 元のモデルが更新されたら量子化し直し、古い量子化済みモデルは削除する
+    _save_model(model_path, 1)
+    os.utime(model_path, ns=(0, 0))
+    quantized_path3 = cache.get_quantized_model_path(model_path)
+    assert quantized_path3 != quantized_path1
+    assert list((tmp_path / "cache").iterdir()) == [quantized_path3]
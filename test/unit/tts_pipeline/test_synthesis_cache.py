@@ -0,0 +1,114 @@
+"""音声合成結果のキャッシュのテスト"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+from voicevox_engine.model import AudioQuery
+from voicevox_engine.tts_pipeline.model import AccentPhrase
+from voicevox_engine.tts_pipeline.synthesis_cache import SynthesisCache
+
+from .tts_utils import gen_mora
+
+
+def _gen_query(speed_scale: float = 1.0) -> AudioQuery:
+    return AudioQuery(
+        accent_phrases=[
+            AccentPhrase(
+                moras=[gen_mora("テ", "t", 0.1, "e", 0.1, 5.0)],
+                accent=1,
+                pause_mora=None,
+            )
+        ],
+        speedScale=speed_scale,
+        pitchScale=0.0,
+        intonationScale=1.0,
+        volumeScale=1.0,
+        prePhonemeLength=0.1,
+        postPhonemeLength=0.1,
+        outputSamplingRate=44100,
+        outputStereo=False,
+        kana="テ",
+    )
+
+
+def test_make_key() -> None:
+    """クエリ・スタイル ID・モデルのバージョン・オプションのいずれかが異なればキーも異なる"""
+    key = SynthesisCache.make_key(_gen_query(), 1, "v1", upspeak=True)
+
+    assert key == SynthesisCache.make_key(_gen_query(), 1, "v1", upspeak=True)
+    assert key != SynthesisCache.make_key(_gen_query(1.5), 1, "v1", upspeak=True)
+    assert key != SynthesisCache.make_key(_gen_query(), 2, "v1", upspeak=True)
+    assert key != SynthesisCache.make_key(_gen_query(), 1, "v2", upspeak=True)
+    assert key != SynthesisCache.make_key(_gen_query(), 1, "v1", upspeak=False)
+
+
+def test_synthesis_cache_memory() -> None:
+    """ディスク上のキャッシュを使わない場合も、メモリ上のキャッシュから取得できる"""
+    cache = SynthesisCache(max_memory_bytes=1024)
+    cache.put("a", b"wave")
+
+    assert cache.get("a") == b"wave"
+    assert cache.get("b") is None
+    assert set(cache.statistics().keys()) == {"synthesis"}
+
+
+def test_synthesis_cache_disk(tmp_path: Path) -> None:
+    """ディスク上のキャッシュは再起動後も取得でき、取得時にメモリ上のキャッシュに載せ直される"""
+    SynthesisCache(1024, tmp_path, max_disk_bytes=1024).put("a", b"wave")
+
+    cache = SynthesisCache(1024, tmp_path, max_disk_bytes=1024)
+    assert cache.get("a") == b"wave"
+    assert cache.get("a") == b"wave"
+
+    statistics = cache.statistics()
+    assert statistics["synthesis"].hits == 1
+    assert statistics["synthesis_disk"].hits == 1
+    assert statistics["synthesis_disk"].entries == 1
+
+
+def test_synthesis_cache_disk_max_bytes(tmp_path: Path) -> None:
+    """ディスク上のキャッシュが上限を超えると、最も長く参照されていないファイルから削除される"""
+    cache = SynthesisCache(0, tmp_path, max_disk_bytes=8)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.get("a")
+    cache.put("c", b"1234")
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.bin", "c.bin"]
+    assert cache.statistics()["synthesis_disk"].evictions == 1
+
+
+def test_synthesis_cache_disk_ttl(tmp_path: Path) -> None:
+    """有効期限を過ぎたディスク上のキャッシュは取得できず、ファイルも削除される"""
+    cache = SynthesisCache(0, tmp_path, max_disk_bytes=1024, ttl=60)
+    with patch("time.time", return_value=1000.0):
+        cache.put("a", b"wave")
+        cache.put("b", b"wave")  # メモリ上のキャッシュから "a" を追い出す
+    with patch("time.time", return_value=1060.0):
+        assert cache.get("a") is None
+
+    assert not (tmp_path / "a.bin").exists()
+    assert cache.statistics()["synthesis_disk"].expirations == 1
+
+
+def test_synthesis_cache_disk_ttl_promotion(tmp_path: Path) -> None:
+    """ディスク上のキャッシュからメモリ上に載せ直す際は、残りの有効期限を引き継ぐ"""
+    SynthesisCache(0, tmp_path, max_disk_bytes=1024, ttl=60).put("a", b"wave")
+    created_at = (tmp_path / "a.bin").stat().st_mtime
+
+    cache = SynthesisCache(1024, tmp_path, max_disk_bytes=1024, ttl=60)
+    with (
+        patch("time.time", return_value=created_at + 50.0),
+        patch("time.monotonic", return_value=0.0),
+    ):
+        assert cache.get("a") == b"wave"
+    # 残り 10 秒の有効期限を引き継いでいるため、メモリ上のキャッシュも 10 秒後に期限切れになる
+    with (
+        patch("time.time", return_value=created_at + 60.0),
+        patch("time.monotonic", return_value=10.0),
+    ):
+        assert cache.get("a") is None
+
+    statistics = cache.statistics()
+    assert statistics["synthesis"].expirations == 1
+    assert statistics["synthesis_disk"].expirations == 1
@@ -1,15 +1,23 @@
 """TTSEngine のテスト"""
 
+import contextvars
 from test.utility import pydantic_to_native_type, round_floats, summarize_big_ndarray
+from typing import Any
 from unittest.mock import MagicMock
 
 import numpy as np
 import pytest
+from numpy.typing import NDArray
 from syrupy.assertion import SnapshotAssertion
 
 from voicevox_engine.dev.core.mock import MockCoreWrapper
 from voicevox_engine.metas.Metas import StyleId
 from voicevox_engine.model import AudioQuery
+from voicevox_engine.tts_pipeline.cancellation import (
+    CancellationToken,
+    SynthesisCancelledError,
+    current_cancellation_token,
+)
 from voicevox_engine.tts_pipeline.model import (
     AccentPhrase,
     FrameAudioQuery,
@@ -284,6 +292,67 @@ def test_mocked_synthesize_wave_output(snapshot_json: SnapshotAssertion) -> None
     assert snapshot_json == summarize_big_ndarray(round_floats(result, round_value=2))
 
 
+def test_synthesize_wave_does_not_mutate_query() -> None:
+    """`TTSEngine.synthesize_wave()` は引数の音声合成用のクエリを書き換えず、同じクエリで何度呼んでも同じ音声波形を返す"""
+    # Inputs
+    tts_engine = TTSEngine(MockCoreWrapper())
+    query = _gen_hello_hiho_query()
+    query.speedScale = 0.5
+    query.pitchScale = 0.1
+    query.accent_phrases[-1].is_interrogative = True
+    # Expects
+    true_query = query.model_copy(deep=True)
+    # Outputs
+    result1 = tts_engine.synthesize_wave(query, StyleId(1))
+    result2 = tts_engine.synthesize_wave(query, StyleId(1))
+    # Tests
+    assert query == true_query
+    np.testing.assert_array_equal(result1, result2)
+
+
+def test_synthesize_waves() -> None:
+    """`TTSEngine.synthesize_waves()` はクエリごとに `synthesize_wave()` と同じ音声波形を同じ順序で返す"""
+    # Inputs
+    tts_engine = TTSEngine(MockCoreWrapper())
+    hello_hiho = _gen_hello_hiho_query()
+    slow_hello_hiho = _gen_hello_hiho_query()
+    slow_hello_hiho.speedScale = 0.5
+    # Outputs
+    results = tts_engine.synthesize_waves([hello_hiho, slow_hello_hiho], StyleId(1))
+    # Expects
+    true_results = [
+        tts_engine.synthesize_wave(hello_hiho, StyleId(1)),
+        tts_engine.synthesize_wave(slow_hello_hiho, StyleId(1)),
+    ]
+    # Tests
+    assert len(results) == 2
+    for result, true_result in zip(results, true_results):
+        np.testing.assert_array_equal(result, true_result)
+
+
+def test_synthesize_waves_cancelled() -> None:
+    """`TTSEngine.synthesize_waves()` は途中でキャンセルされると、残りのクエリを音声合成しない"""
+    # Inputs
+    tts_engine = TTSEngine(MockCoreWrapper())
+    queries = [_gen_hello_hiho_query() for _ in range(3)]
+    token = CancellationToken()
+    synthesized: list[AudioQuery] = []
+    synthesize_wave = tts_engine.synthesize_wave
+
+    def cancel_after_first_query(query: AudioQuery, *args: Any, **kwargs: Any) -> NDArray[np.float32]:  # fmt: skip
+        synthesized.append(query)
+        token.cancel()
+        return synthesize_wave(query, *args, **kwargs)
+
+    tts_engine.synthesize_wave = cancel_after_first_query  # type: ignore[method-assign]
+    context = contextvars.copy_context()
+    context.run(current_cancellation_token.set, token)
+    # Tests
+    with pytest.raises(SynthesisCancelledError):
+        context.run(tts_engine.synthesize_waves, queries, StyleId(1))
+    assert synthesized == queries[:1]
+
+
 def test_mocked_create_sing_volume_from_phoneme_and_f0_output(
     snapshot_json: SnapshotAssertion,
 ) -> None:
@@ -0,0 +1,144 @@
+"""音声波形のエンコードのテスト"""
+
+import io
+import zipfile
+
+import numpy as np
+import pytest
+import soundfile
+
+from voicevox_engine.tts_pipeline.wave_encoder import (
+    AudioFormat,
+    encode_wave,
+    generate_audio_zip_stream,
+    generate_streaming_wav_header,
+    wave_to_pcm16_bytes,
+    wave_to_wav_bytes,
+)
+
+
+def test_generate_streaming_wav_header() -> None:
+    """ストリーミング用 WAV ヘッダの後ろに PCM を連結したバイト列が WAV として読み込める"""
+    # Inputs
+    wave = np.array([0.0, 0.5, -0.5, 1.0], dtype=np.float32)
+
+    # Outputs
+    header = generate_streaming_wav_header(sampling_rate=24000, channels=1)
+    wav_bytes = header + wave_to_pcm16_bytes(wave)
+    result, sampling_rate = soundfile.read(io.BytesIO(wav_bytes), dtype="int16")
+
+    # Expects
+    assert len(header) == 44
+    assert sampling_rate == 24000
+    assert result.tolist() == [0, 16383, -16383, 32767]
+
+
+def test_wave_to_pcm16_bytes_clip() -> None:
+    """範囲外の値はクリップされる"""
+    # Inputs
+    wave = np.array([2.0, -2.0], dtype=np.float32)
+
+    # Outputs
+    result = np.frombuffer(wave_to_pcm16_bytes(wave), dtype="<i2")
+
+    # Expects
+    assert result.tolist() == [32767, -32767]
+
+
+def test_wave_to_pcm16_bytes_stereo() -> None:
+    """ステレオの音声波形はチャンネルごとにインターリーブされる"""
+    # Inputs
+    wave = np.array([[0.5, -0.5], [1.0, -1.0]], dtype=np.float32)
+
+    # Outputs
+    result = np.frombuffer(wave_to_pcm16_bytes(wave), dtype="<i2")
+
+    # Expects
+    assert result.tolist() == [16383, -16383, 32767, -32767]
+
+
+def test_wave_to_wav_bytes() -> None:
+    """メモリ上でエンコードした WAV ファイルが読み込める"""
+    # Inputs
+    wave = np.array([[0.0, 0.5], [-0.5, 1.0]], dtype=np.float32)
+
+    # Outputs
+    result, sampling_rate = soundfile.read(
+        io.BytesIO(wave_to_wav_bytes(wave, 44100)), dtype="float32"
+    )
+
+    # Expects
+    assert sampling_rate == 44100
+    assert result.shape == (2, 2)
+    assert np.allclose(result, wave, atol=1e-4)
+
+
+@pytest.mark.parametrize(
+    "audio_format,expected_format",
+    [("wav", "WAV"), ("flac", "FLAC"), ("ogg", "OGG"), ("mp3", "MP3")],
+)
+def test_encode_wave(audio_format: AudioFormat, expected_format: str) -> None:
+    """各出力形式でエンコードした音声ファイルが、元のサンプリングレート・チャンネル数のまま読み込める"""
+    # Inputs
+    wave = np.zeros((24000, 2), dtype=np.float32)
+
+    # Outputs
+    info = soundfile.info(io.BytesIO(encode_wave(wave, 24000, audio_format)))
+
+    # Expects
+    assert info.format == expected_format
+    assert info.samplerate == 24000
+    assert info.channels == 2
+
+
+def test_encode_wave_opus_resample() -> None:
+    """Opus が対応していないサンプリングレートの音声波形は 48kHz にリサンプリングされる"""
+    # Inputs
+    wave = np.zeros(44100, dtype=np.float32)
+
+    # Outputs
+    info = soundfile.info(io.BytesIO(encode_wave(wave, 44100, "ogg")))
+
+    # Expects
+    assert info.subtype == "OPUS"
+    assert info.samplerate == 48000
+
+
+def test_encode_wave_pcm() -> None:
+    """pcm はヘッダなしのリトルエンディアンのリニア PCM になり、float32 も指定できる"""
+    # Inputs
+    wave = np.array([0.0, 0.5, -0.25], dtype=np.float32)
+
+    # Outputs
+    pcm16 = np.frombuffer(encode_wave(wave, 24000, "pcm"), dtype="<i2")
+    pcm32 = np.frombuffer(encode_wave(wave, 24000, "pcm", "float32"), dtype="<f4")
+
+    # Expects
+    assert pcm16.tolist() == [0, 16384, -8192]
+    assert pcm32.tolist() == wave.tolist()
+
+
+def test_encode_wave_unsupported_sample_format() -> None:
+    """非可逆圧縮や FLAC で float32 を指定するとエラーになる"""
+    with pytest.raises(ValueError):
+        encode_wave(np.zeros(10, dtype=np.float32), 24000, "flac", "float32")
+
+
+def test_generate_audio_zip_stream() -> None:
+    """分割して返されたバイト列を連結すると、連番の WAV ファイルを格納した ZIP ファイルになる"""
+    # Inputs
+    waves = [np.zeros(10, dtype=np.float32), np.full(20, 0.5, dtype=np.float32)]
+
+    # Outputs
+    chunks = list(generate_audio_zip_stream(waves, 24000))
+
+    # Expects
+    assert len(chunks) == 3
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zip_file:
+        assert zip_file.namelist() == ["001.wav", "002.wav"]
+        for name, wave in zip(zip_file.namelist(), waves):
+            result, sampling_rate = soundfile.read(
+                io.BytesIO(zip_file.read(name)), dtype="float32"
+            )
+            assert sampling_rate == 24000
+            assert np.allclose(result, wave, atol=1e-4)
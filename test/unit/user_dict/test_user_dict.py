@@ -322,6 +322,8 @@ if sys.platform != "win32":
                 priority=10,
             )
         )
+        # 辞書はバックグラウンドでコンパイル・適用されるため、適用が完了するまで待つ
+        user_dict.flush()
         assert g2p(text=test_text, kana=True) == success_pronunciation
 
         # 疑似的にエンジンを再起動する
@@ -329,3 +331,98 @@ if sys.platform != "win32":
         user_dict.update_dict()
 
         assert g2p(text=test_text, kana=True) == success_pronunciation
+
+    def test_update_dict_reuses_compiled_default_dict(tmp_path: Path) -> None:
+        compiled_dict_path = tmp_path / "test_default_dict_cache.dic"
+        stale_default_dict_path = tmp_path / "test_default_dict_cache.default-stale.dic"
+        stale_default_dict_path.write_bytes(b"")
+        # 以前のバージョンが書き出していた、デフォルト辞書とユーザー辞書をまとめた辞書ファイル
+        compiled_dict_path.write_bytes(b"")
+        user_dict = UserDictionary(
+            user_dict_path=tmp_path / "test_default_dict_cache.json",
+            compiled_dict_path=compiled_dict_path,
+        )
+
+        # デフォルト辞書はハッシュ値をファイル名に含めてコンパイルされ、古いキャッシュは削除される
+        default_dict_paths = list(tmp_path.glob("test_default_dict_cache.default-*.dic"))  # fmt: skip
+        assert len(default_dict_paths) == 1
+        assert not stale_default_dict_path.exists()
+        assert not compiled_dict_path.exists()
+        mtime = default_dict_paths[0].stat().st_mtime_ns
+        # ユーザー辞書が空の場合、ユーザー辞書はコンパイルされない
+        assert list(tmp_path.glob("test_default_dict_cache-*.dic")) == []
+
+        # 単語を追加してもデフォルト辞書はコンパイルし直さず、ユーザー辞書の単語だけをコンパイルする
+        user_dict.apply_word(
+            WordProperty(surface="test", pronunciation="テスト", accent_type=1)
+        )
+        user_dict.flush()
+        assert default_dict_paths[0].stat().st_mtime_ns == mtime
+        assert user_dict.applied_version == user_dict.version == 1
+        assert [
+            path.name for path in tmp_path.glob("test_default_dict_cache-*.dic")
+        ] == ["test_default_dict_cache-1.dic"]
+        unset_user_dict()
+
+
+def test_transaction_commits_once(tmp_path: Path) -> None:
+    user_dict = UserDictionary(
+        user_dict_path=tmp_path / "test_transaction.json",
+        compiled_dict_path=tmp_path / "test_transaction.dic",
+    )
+    update_count = 0
+    update_dict = user_dict.update_dict
+
+    def count_update_dict() -> None:
+        nonlocal update_count
+        update_count += 1
+        update_dict()
+
+    user_dict.update_dict = count_update_dict  # type: ignore[method-assign]
+
+    # 複数の変更をまとめて適用しても、保存とコンパイルは 1 回だけ行われる
+    with user_dict.transaction() as transaction:
+        first_uuid = transaction.apply_word(
+            WordProperty(surface="test", pronunciation="テスト", accent_type=1)
+        )
+        second_uuid = transaction.apply_word(
+            WordProperty(surface="test2", pronunciation="テストツー", accent_type=1)
+        )
+        transaction.delete_word(first_uuid)
+    user_dict.flush()
+    assert update_count == 1
+    assert list(user_dict.read_dict()) == [second_uuid]
+
+    # ロールバックした場合や例外が発生した場合は保存されない
+    with user_dict.transaction() as transaction:
+        transaction.delete_word(second_uuid)
+        transaction.rollback()
+    with pytest.raises(UserDictInputError):
+        with user_dict.transaction() as transaction:
+            transaction.delete_word(second_uuid)
+            transaction.delete_word(second_uuid)
+    user_dict.flush()
+    assert update_count == 1
+    assert list(user_dict.read_dict()) == [second_uuid]
+
+
+def test_write_behind_and_external_edit(tmp_path: Path) -> None:
+    user_dict_path = tmp_path / "test_write_behind.json"
+    user_dict = UserDictionary(
+        user_dict_path=user_dict_path,
+        compiled_dict_path=tmp_path / "test_write_behind.dic",
+    )
+    word_uuid = user_dict.apply_word(
+        WordProperty(surface="test", pronunciation="テスト", accent_type=1)
+    )
+
+    # 変更はすぐにメモリ上の辞書に反映され、flush() の後にはファイルにも書き込まれている
+    assert list(user_dict.get_words()) == [word_uuid]
+    user_dict.flush()
+    assert list(json.loads(user_dict_path.read_text(encoding="utf-8"))) == [word_uuid]
+
+    # ファイルが外部から編集された場合は、次の読み出し時に読み込み直される
+    user_dict_path.write_text(
+        json.dumps(valid_dict_dict_json, ensure_ascii=False), encoding="utf-8"
+    )
+    assert list(user_dict.read_dict()) == list(valid_dict_dict_json)
@@ -2,6 +2,8 @@
 
 import glob
 import hashlib
+from collections.abc import Callable
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
 from typing import BinaryIO, Final
@@ -12,11 +14,13 @@ from aivmlib.schemas.aivm_manifest import (
     AivmManifest,
     AivmManifestSpeaker,
     AivmManifestSpeakerStyle,
+    AivmMetadata,
     ModelArchitecture,
 )
 from fastapi import HTTPException
 
 from voicevox_engine import __version__
+from voicevox_engine.aivm_metadata_cache import AivmMetadataCache
 from voicevox_engine.logging import logger
 from voicevox_engine.metas.Metas import (
     Speaker,
@@ -28,8 +32,25 @@ from voicevox_engine.metas.Metas import (
 )
 from voicevox_engine.metas.MetasStore import Character
 from voicevox_engine.model import AivmInfo, LibrarySpeaker
+from voicevox_engine.utility.path_utility import get_save_dir
 
-__all__ = ["AivmManager"]
+__all__ = ["AivmManager", "AivmStyleIndexEntry"]
+
+
+@dataclass(frozen=True)
+class AivmStyleIndexEntry:
+    """スタイル ID から音声合成に必要な情報を引くための索引のエントリ"""
+
+    # AIVM マニフェスト
+    aivm_manifest: AivmManifest
+    # AIVM マニフェスト内の話者
+    aivm_manifest_speaker: AivmManifestSpeaker
+    # AIVM マニフェスト内のスタイル
+    aivm_manifest_style: AivmManifestSpeakerStyle
+    # ハイパーパラメータ (data.style2id) 上のスタイル名 (対応するスタイルが存在しない場合は None)
+    local_style_name: str | None
+    # ハイパーパラメータ (data.style2id) 上のスタイル ID
+    hyper_parameters_style_id: int
 
 
 class AivmManager:
@@ -54,7 +75,12 @@ class AivmManager:
         "https://api.aivis-project.com/v1/aivm-models/a59cb814-0083-4369-8542-f51a29e72af7/download?model_type=AIVMX",
     ]
 
-    def __init__(self, installed_aivm_dir: Path):
+    # AIVM メタデータのキャッシュの保存先ディレクトリ
+    METADATA_CACHE_DIR: Final[Path] = get_save_dir() / "AivmMetadataCaches"
+
+    def __init__(
+        self, installed_aivm_dir: Path, metadata_cache_dir: Path | None = None
+    ):
         """
         AivmManager のコンストラクタ
 
@@ -62,15 +88,30 @@ class AivmManager:
         ----------
         installed_aivm_dir : Path
             AIVMX ファイルのインストール先ディレクトリ
+        metadata_cache_dir : Path | None
+            AIVM メタデータのキャッシュの保存先ディレクトリ (None なら METADATA_CACHE_DIR)
         """
 
         self.installed_aivm_dir = installed_aivm_dir
         self.installed_aivm_dir.mkdir(exist_ok=True)
         logger.info(f"Models directory: {self.installed_aivm_dir}")
 
+        # AIVMX ファイルから読み込んだ AIVM メタデータのキャッシュ
+        ## 起動のたびにすべての AIVMX ファイル (ONNX モデル全体) をデコードしないよう、ディスク上にも永続化される
+        self._metadata_cache = AivmMetadataCache(
+            metadata_cache_dir
+            if metadata_cache_dir is not None
+            else self.METADATA_CACHE_DIR
+        )
+
         # self.get_installed_aivm_infos() の実行結果のキャッシュ
         # すべてのインストール済み音声合成モデルの情報が保持される
         self._installed_aivm_infos: dict[str, AivmInfo] | None = None
+        # スタイル ID から AIVM マニフェスト・話者・スタイルなどを引くための索引
+        # self.get_installed_aivm_infos() の実行時に再生成される
+        self._style_index: dict[StyleId, AivmStyleIndexEntry] = {}
+        # 音声合成モデルのインストール・更新時に、AIVM の UUID を引数に呼ばれるリスナー
+        self._install_listeners: list[Callable[[str], None]] = []
 
         current_installed_aivm_infos = self.get_installed_aivm_infos()
         if len(current_installed_aivm_infos) == 0:
@@ -173,15 +214,38 @@ class AivmManager:
         """
 
         aivm_infos = self.get_installed_aivm_infos()
-        for aivm_info in aivm_infos.values():
-            if str(aivm_info.manifest.uuid) == aivm_uuid:
-                return aivm_info
+        if aivm_uuid in aivm_infos:
+            return aivm_infos[aivm_uuid]
 
         raise HTTPException(
             status_code=404,
             detail=f"音声合成モデル {aivm_uuid} はインストールされていません。",
         )
 
+    def get_aivm_metadata(self, aivm_uuid: str) -> AivmMetadata:
+        """
+        音声合成モデルの UUID から AIVM メタデータ (マニフェスト・ハイパーパラメータ・スタイルベクトル) を取得する
+        AIVMX ファイルが更新されていなければ、AIVMX ファイルを開かずにキャッシュから返す
+
+        Parameters
+        ----------
+        aivm_uuid : str
+            音声合成モデルの UUID (aivm_manifest.json に記載されているものと同一)
+
+        Returns
+        -------
+        aivm_metadata : AivmMetadata
+            AIVM メタデータ
+
+        Raises
+        ------
+        aivmlib.AivmValidationError
+            AIVM メタデータの読み込み・バリデーションに失敗した場合
+        """
+
+        aivm_info = self.get_aivm_info(aivm_uuid)
+        return self._metadata_cache.read(aivm_info.file_path)
+
     def get_aivm_manifest_from_style_id(
         self, style_id: StyleId
     ) -> tuple[AivmManifest, AivmManifestSpeaker, AivmManifestSpeakerStyle]:
@@ -203,29 +267,41 @@ class AivmManager:
             AIVM マニフェスト内のスタイル
         """
 
-        # fmt: off
-        aivm_infos = self.get_installed_aivm_infos()
-        for aivm_info in aivm_infos.values():
-            for aivm_info_speaker in aivm_info.speakers:
-                for aivm_info_speaker_style in aivm_info_speaker.speaker.styles:
-                    if aivm_info_speaker_style.id == style_id:
-                        # ここでスタイル ID が示す音声合成モデルに対応する AivmManifest を特定
-                        aivm_manifest = aivm_info.manifest
-                        for aivm_manifest_speaker in aivm_manifest.speakers:
-                            # ここでスタイル ID が示す話者に対応する AivmManifestSpeaker を特定
-                            if str(aivm_manifest_speaker.uuid) == aivm_info_speaker.speaker.speaker_uuid:
-                                for aivm_manifest_style in aivm_manifest_speaker.styles:
-                                    # ここでスタイル ID が示すスタイルに対応する AivmManifestSpeakerStyle を特定
-                                    local_style_id = self.style_id_to_local_style_id(style_id)
-                                    if aivm_manifest_style.local_id == local_style_id:
-                                        # すべて取得できたので値を返す
-                                        return aivm_manifest, aivm_manifest_speaker, aivm_manifest_style
-
-        raise HTTPException(
-            status_code=404,
-            detail=f"スタイル {style_id} は存在しません。",
+        style_index_entry = self.get_style_index_entry(style_id)
+        return (
+            style_index_entry.aivm_manifest,
+            style_index_entry.aivm_manifest_speaker,
+            style_index_entry.aivm_manifest_style,
         )
 
+    def get_style_index_entry(self, style_id: StyleId) -> AivmStyleIndexEntry:
+        """
+        スタイル ID に対応する AIVM マニフェスト・話者・スタイル・ハイパーパラメータ上のスタイル名を索引から取得する
+        索引はインストール済み音声合成モデルの情報の取得時に構築されるため、インストール済みのスタイル数に関わらず定数時間で取得できる
+
+        Parameters
+        ----------
+        style_id : StyleId
+            スタイル ID
+
+        Returns
+        -------
+        style_index_entry : AivmStyleIndexEntry
+            スタイル ID に対応する索引のエントリ
+        """
+
+        # 初回のみインストール済み音声合成モデルの情報を取得し、索引を構築する
+        if self._installed_aivm_infos is None:
+            self.get_installed_aivm_infos()
+
+        style_index_entry = self._style_index.get(style_id)
+        if style_index_entry is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"スタイル {style_id} は存在しません。",
+            )
+        return style_index_entry
+
     def get_installed_aivm_infos(self, force: bool = False) -> dict[str, AivmInfo]:
         """
         すべてのインストール済み音声合成モデルの情報を取得する
@@ -250,6 +326,7 @@ class AivmManager:
 
         # 各 AIVMX ファイルごとに
         aivm_infos: dict[str, AivmInfo] = {}
+        aivm_style2ids: dict[str, dict[str, int]] = {}
         for aivm_file_path in aivm_file_paths:
 
             # 最低限のパスのバリデーション
@@ -262,10 +339,10 @@ class AivmManager:
                 continue
 
             # AIVM メタデータの読み込み
+            ## ファイルが更新されていなければ、AIVMX ファイルを開かずにキャッシュから読み込まれる
             try:
-                with open(aivm_file_path, mode="rb") as f:
-                    aivm_metadata = aivmlib.read_aivmx_metadata(f)
-                    aivm_manifest = aivm_metadata.manifest
+                aivm_metadata = self._metadata_cache.read(aivm_file_path)
+                aivm_manifest = aivm_metadata.manifest
             except aivmlib.AivmValidationError as e:
                 logger.warning(f"{aivm_file_path}: Failed to read AIVM metadata. ({e})")
                 continue
@@ -414,12 +491,72 @@ class AivmManager:
 
             # 完成した AivmInfo を UUID をキーとして追加
             aivm_infos[aivm_uuid] = aivm_info
+            aivm_style2ids[aivm_uuid] = aivm_metadata.hyper_parameters.data.style2id
+
+        # もう存在しない AIVMX ファイルに対応する AIVM メタデータのキャッシュを削除
+        self._metadata_cache.prune([Path(aivm_file_path) for aivm_file_path in aivm_file_paths])  # fmt: skip
 
         # 音声合成モデル名でソートしてから返す
         # 実行結果はキャッシュとして保持する
-        self._installed_aivm_infos = dict(sorted(aivm_infos.items(), key=lambda x: x[1].manifest.name))  # fmt: skip
+        ## 索引は新しく構築し終えてから差し替え、構築中に他のスレッドから古い索引と新しい索引が混在して見えないようにする
+        sorted_aivm_infos = dict(sorted(aivm_infos.items(), key=lambda x: x[1].manifest.name))  # fmt: skip
+        self._style_index = self._build_style_index(sorted_aivm_infos, aivm_style2ids)
+        self._installed_aivm_infos = sorted_aivm_infos
         return self._installed_aivm_infos
 
+    @classmethod
+    def _build_style_index(
+        cls,
+        aivm_infos: dict[str, AivmInfo],
+        aivm_style2ids: dict[str, dict[str, int]],
+    ) -> dict[StyleId, AivmStyleIndexEntry]:
+        """
+        インストール済み音声合成モデルの情報から、スタイル ID をキーとする索引を構築する
+
+        Parameters
+        ----------
+        aivm_infos : dict[str, AivmInfo]
+            インストール済み音声合成モデルの情報 (キー: 音声合成モデルの UUID, 値: AivmInfo)
+        aivm_style2ids : dict[str, dict[str, int]]
+            音声合成モデルごとのハイパーパラメータの data.style2id (キー: 音声合成モデルの UUID)
+
+        Returns
+        -------
+        style_index : dict[StyleId, AivmStyleIndexEntry]
+            スタイル ID をキーとする索引
+        """
+
+        style_index: dict[StyleId, AivmStyleIndexEntry] = {}
+        for aivm_uuid, aivm_info in aivm_infos.items():
+            # 日本語をサポートしないなどの理由で除外された話者は索引に含めない
+            speaker_uuids = {aivm_info_speaker.speaker.speaker_uuid for aivm_info_speaker in aivm_info.speakers}  # fmt: skip
+            for aivm_manifest_speaker in aivm_info.manifest.speakers:
+                speaker_uuid = str(aivm_manifest_speaker.uuid)
+                if speaker_uuid not in speaker_uuids:
+                    continue
+                for aivm_manifest_style in aivm_manifest_speaker.styles:
+                    style_id = cls.local_style_id_to_style_id(aivm_manifest_style.local_id, speaker_uuid)  # fmt: skip
+                    # 万が一スタイル ID が衝突した場合は、音声合成モデル名順で先に見つかったものを優先する
+                    if style_id in style_index:
+                        logger.warning(f"Style ID {style_id} is duplicated. Ignoring {aivm_info.manifest.name} ({aivm_uuid}).")  # fmt: skip
+                        continue
+                    # AIVM マニフェスト記載のスタイル名とハイパーパラメータのスタイル名は必ずしも一致しないため (通常一致するはずだが…) 、
+                    # 万が一に備え AIVM マニフェストとハイパーパラメータで共通のスタイル ID からスタイル名を取得する
+                    local_style_name: str | None = None
+                    for hps_style_name, hps_style_id in aivm_style2ids[aivm_uuid].items():  # fmt: skip
+                        if hps_style_id == aivm_manifest_style.local_id:
+                            local_style_name = hps_style_name
+                            break
+                    style_index[style_id] = AivmStyleIndexEntry(
+                        aivm_manifest=aivm_info.manifest,
+                        aivm_manifest_speaker=aivm_manifest_speaker,
+                        aivm_manifest_style=aivm_manifest_style,
+                        local_style_name=local_style_name,
+                        hyper_parameters_style_id=aivm_manifest_style.local_id,
+                    )
+
+        return style_index
+
     def install_aivm(self, file: BinaryIO) -> None:
         """
         AIVMX (Aivis Voice Model for ONNX) ファイル (`.aivmx`) をインストールする
@@ -479,6 +616,26 @@ class AivmManager:
         # すべてのインストール済み音声合成モデルの情報のキャッシュを再生成
         self.get_installed_aivm_infos(force=True)
 
+        # インストール・更新されたことをリスナーに通知
+        ## リスナーでのエラーはインストール自体の失敗ではないため、ログに記録するだけにとどめる
+        for listener in self._install_listeners:
+            try:
+                listener(str(aivm_manifest.uuid))
+            except Exception as e:
+                logger.error("Failed to notify AIVM model installation.", exc_info=e)
+
+    def add_install_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        音声合成モデルがインストール・更新されたときに、AIVM の UUID を引数に呼ばれるリスナーを登録する
+
+        Parameters
+        ----------
+        listener : Callable[[str], None]
+            インストール・更新された音声合成モデルの UUID を受け取る関数
+        """
+
+        self._install_listeners.append(listener)
+
     def install_aivm_from_url(self, url: str) -> None:
         """
         指定された URL から AIVMX (Aivis Voice Model for ONNX) ファイル (`.aivmx`) をダウンロードしてインストールする
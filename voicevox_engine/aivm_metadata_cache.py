@@ -0,0 +1,202 @@
+"""AIVMX ファイルから読み込んだ AIVM メタデータの永続キャッシュ"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import aivmlib
+from aivmlib.schemas.aivm_manifest import AivmMetadata
+
+from voicevox_engine.logging import logger
+
+__all__ = ["AivmMetadataCache"]
+
+
+class AivmMetadataCache:
+    """
+    AIVMX ファイルから読み込んだ AIVM メタデータ (マニフェスト・ハイパーパラメータ・スタイルベクトル) のキャッシュ
+    AIVM メタデータの読み込みには ONNX モデル全体のデコードが必要で、モデル数が多いと起動時間の大半を占めるため、
+    ファイルパス・更新日時・ファイルサイズをキーとしてメモリ上とディスク上にキャッシュする
+    """
+
+    # キャッシュファイルのフォーマットのバージョン
+    # フォーマットを変更した場合はインクリメントし、古いキャッシュファイルを無視させる
+    CACHE_FORMAT_VERSION = 1
+
+    def __init__(self, cache_dir: Path) -> None:
+        """
+        Parameters
+        ----------
+        cache_dir : Path
+            キャッシュファイルの保存先ディレクトリ
+        """
+
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # キー: AIVMX ファイルの絶対パス, 値: (更新日時 (ns), ファイルサイズ, AIVM メタデータ)
+        self._memory_cache: dict[str, tuple[int, int, AivmMetadata]] = {}
+
+    def read(self, aivmx_file_path: Path) -> AivmMetadata:
+        """
+        AIVMX ファイルの AIVM メタデータを読み込む
+        ファイルの更新日時・サイズがキャッシュ作成時から変わっていなければ、AIVMX ファイルを開かずにキャッシュから返す
+
+        Parameters
+        ----------
+        aivmx_file_path : Path
+            AIVMX ファイルのパス
+
+        Returns
+        -------
+        aivm_metadata : AivmMetadata
+            AIVM メタデータ
+
+        Raises
+        ------
+        aivmlib.AivmValidationError
+            AIVM メタデータの読み込み・バリデーションに失敗した場合
+        """
+
+        file_path = str(aivmx_file_path.resolve())
+        stat = aivmx_file_path.stat()
+
+        # メモリ上のキャッシュを確認
+        with self._lock:
+            memory_entry = self._memory_cache.get(file_path)
+        if memory_entry is not None:
+            mtime_ns, size, aivm_metadata = memory_entry
+            if mtime_ns == stat.st_mtime_ns and size == stat.st_size:
+                return aivm_metadata
+
+        # ディスク上のキャッシュを確認
+        cache_file_path = self._get_cache_file_path(file_path)
+        aivm_metadata_or_none = self._read_cache_file(
+            cache_file_path, file_path, stat.st_mtime_ns, stat.st_size
+        )
+
+        # キャッシュがないか古い場合は AIVMX ファイルから読み込み、キャッシュファイルを作成する
+        if aivm_metadata_or_none is None:
+            with open(aivmx_file_path, mode="rb") as f:
+                aivm_metadata = aivmlib.read_aivmx_metadata(f)
+            self._write_cache_file(
+                cache_file_path,
+                file_path,
+                stat.st_mtime_ns,
+                stat.st_size,
+                aivm_metadata,
+            )
+        else:
+            aivm_metadata = aivm_metadata_or_none
+
+        with self._lock:
+            self._memory_cache[file_path] = (
+                stat.st_mtime_ns,
+                stat.st_size,
+                aivm_metadata,
+            )
+        return aivm_metadata
+
+    def remove(self, aivmx_file_path: Path) -> None:
+        """
+        AIVMX ファイルに対応するキャッシュを削除する
+
+        Parameters
+        ----------
+        aivmx_file_path : Path
+            AIVMX ファイルのパス
+        """
+
+        file_path = str(aivmx_file_path.resolve())
+        with self._lock:
+            self._memory_cache.pop(file_path, None)
+        self._get_cache_file_path(file_path).unlink(missing_ok=True)
+
+    def prune(self, aivmx_file_paths: list[Path]) -> None:
+        """
+        指定された AIVMX ファイル以外に対応するキャッシュファイルを削除する
+
+        Parameters
+        ----------
+        aivmx_file_paths : list[Path]
+            キャッシュを残す AIVMX ファイルのパスのリスト
+        """
+
+        valid_file_paths = {str(path.resolve()) for path in aivmx_file_paths}
+        valid_cache_file_paths = {
+            self._get_cache_file_path(file_path) for file_path in valid_file_paths
+        }
+        with self._lock:
+            for file_path in list(self._memory_cache.keys()):
+                if file_path not in valid_file_paths:
+                    del self._memory_cache[file_path]
+        for cache_file_path in self.cache_dir.glob("*.json"):
+            if cache_file_path not in valid_cache_file_paths:
+                cache_file_path.unlink(missing_ok=True)
+
+    def _get_cache_file_path(self, file_path: str) -> Path:
+        """AIVMX ファイルの絶対パスから、対応するキャッシュファイルのパスを求める"""
+
+        file_path_hash = hashlib.sha256(file_path.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{file_path_hash}.json"
+
+    def _read_cache_file(
+        self, cache_file_path: Path, file_path: str, mtime_ns: int, size: int
+    ) -> AivmMetadata | None:
+        """キャッシュファイルを読み込む。キャッシュファイルが存在しないか古い・壊れている場合は None を返す"""
+
+        if not cache_file_path.exists():
+            return None
+        try:
+            cache: dict[str, Any] = json.loads(
+                cache_file_path.read_text(encoding="utf-8")
+            )
+            if (
+                cache.get("version") != self.CACHE_FORMAT_VERSION
+                or cache.get("file_path") != file_path
+                or cache.get("mtime_ns") != mtime_ns
+                or cache.get("size") != size
+            ):
+                return None
+            return aivmlib.validate_aivm_metadata(cache["metadata"])
+        except (OSError, ValueError, KeyError, aivmlib.AivmValidationError) as e:
+            logger.warning(
+                f"{cache_file_path}: Failed to read AIVM metadata cache. ({e})"
+            )
+            return None
+
+    def _write_cache_file(
+        self,
+        cache_file_path: Path,
+        file_path: str,
+        mtime_ns: int,
+        size: int,
+        aivm_metadata: AivmMetadata,
+    ) -> None:
+        """キャッシュファイルを書き込む。書き込みに失敗してもキャッシュが使えないだけなので、エラーは握り潰す"""
+
+        cache = {
+            "version": self.CACHE_FORMAT_VERSION,
+            "file_path": file_path,
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "metadata": aivmlib.serialize_aivm_metadata(aivm_metadata),
+        }
+        # 書き込み途中のキャッシュファイルを読み込まないよう、一時ファイルに書き込んでから置き換える
+        temp_cache_file_path = cache_file_path.with_suffix(
+            f".{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            temp_cache_file_path.write_text(
+                json.dumps(cache, ensure_ascii=False), encoding="utf-8"
+            )
+            os.replace(temp_cache_file_path, cache_file_path)
+        except OSError as e:
+            logger.warning(
+                f"{cache_file_path}: Failed to write AIVM metadata cache. ({e})"
+            )
+            temp_cache_file_path.unlink(missing_ok=True)
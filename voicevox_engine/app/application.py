@@ -29,6 +29,7 @@ from voicevox_engine.preset.preset_manager import PresetManager
 from voicevox_engine.resource_manager import ResourceManager
 from voicevox_engine.setting.model import CorsPolicyMode
 from voicevox_engine.setting.setting_manager import SettingHandler
+from voicevox_engine.tts_pipeline.synthesis_cache import SynthesisCache
 from voicevox_engine.tts_pipeline.tts_engine import TTSEngineManager
 from voicevox_engine.user_dict.user_dict_manager import UserDictionary
 from voicevox_engine.utility.path_utility import engine_root
@@ -49,6 +50,7 @@ def generate_app(
     cors_policy_mode: CorsPolicyMode = CorsPolicyMode.localapps,
     allow_origin: list[str] | None = None,
     disable_mutable_api: bool = False,
+    synthesis_cache: SynthesisCache | None = None,
 ) -> FastAPI:
     """ASGI 'application' 仕様に準拠した AivisSpeech Engine アプリケーションインスタンスを生成する。"""
     if character_info_dir is None:
@@ -84,7 +86,9 @@ def generate_app(
     # )
 
     app.include_router(
-        generate_tts_pipeline_router(tts_engines, preset_manager, cancellable_engine)
+        generate_tts_pipeline_router(
+            tts_engines, preset_manager, cancellable_engine, synthesis_cache
+        )
     )
     app.include_router(generate_morphing_router(tts_engines, aivm_manager))
     app.include_router(
@@ -4,6 +4,8 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
 from voicevox_engine.core.core_initializer import CoreNotFound
+from voicevox_engine.tts_pipeline.cancellation import SynthesisCancelledError
+from voicevox_engine.tts_pipeline.inference_scheduler import InferenceQueueFullError
 
 
 def configure_global_exception_handlers(app: FastAPI) -> FastAPI:
@@ -14,4 +16,23 @@ def configure_global_exception_handlers(app: FastAPI) -> FastAPI:
     async def cnf_exception_handler(request: Request, e: CoreNotFound) -> JSONResponse:
         return JSONResponse(status_code=422, content={"message": f"{str(e)}"})
 
+    # 推論の待ち行列が上限に達しており、音声合成リクエストを受け付けられないエラー
+    @app.exception_handler(InferenceQueueFullError)
+    async def iqf_exception_handler(
+        request: Request, e: InferenceQueueFullError
+    ) -> JSONResponse:
+        return JSONResponse(
+            status_code=503,
+            content={"message": f"{str(e)}"},
+            headers={"Retry-After": "1"},
+        )
+
+    # クライアントとの接続が切断され、音声合成がキャンセルされたエラー
+    # レスポンスを受け取るクライアントはもういないため、スタックトレースを出さずに nginx 互換の 499 を返す
+    @app.exception_handler(SynthesisCancelledError)
+    async def sc_exception_handler(
+        request: Request, e: SynthesisCancelledError
+    ) -> JSONResponse:
+        return JSONResponse(status_code=499, content={"message": f"{str(e)}"})
+
     return app
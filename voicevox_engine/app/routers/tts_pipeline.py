@@ -1,29 +1,39 @@
 """音声合成機能を提供する API Router"""
 
-import zipfile
-from tempfile import NamedTemporaryFile, TemporaryFile
-from typing import Annotated, Self
+from collections.abc import AsyncIterator
+from typing import Annotated, Literal, Self
 
-import soundfile
 from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel, Field
 from pydantic.json_schema import SkipJsonSchema
-from starlette.background import BackgroundTask
-from starlette.responses import FileResponse
+from starlette.responses import FileResponse, Response, StreamingResponse
 
-from voicevox_engine.cancellable_engine import CancellableEngine
+from voicevox_engine.cancellable_engine import (
+    CancellableEngine,
+    CancellableEngineInternalError,
+)
 from voicevox_engine.core.core_adapter import DeviceSupport
 from voicevox_engine.metas.Metas import StyleId
 from voicevox_engine.model import AudioQuery
+from voicevox_engine.preset.model import Preset
 from voicevox_engine.preset.preset_manager import (
     PresetInputError,
     PresetInternalError,
     PresetManager,
 )
+from voicevox_engine.tts_pipeline.cancellation import (
+    CancellationToken,
+    SynthesisCancelledError,
+    iterate_cancellable_in_threadpool,
+    run_cancellable_in_threadpool,
+)
 from voicevox_engine.tts_pipeline.connect_base64_waves import (
     ConnectBase64WavesException,
     connect_base64_waves,
 )
+from voicevox_engine.tts_pipeline.inference_scheduler import (
+    InferenceSchedulerStatistics,
+)
 from voicevox_engine.tts_pipeline.kana_converter import ParseKanaError, parse_kana
 from voicevox_engine.tts_pipeline.model import (
     AccentPhrase,
@@ -31,8 +41,25 @@ from voicevox_engine.tts_pipeline.model import (
     ParseKanaErrorCode,
     Score,
 )
-from voicevox_engine.tts_pipeline.tts_engine import LATEST_VERSION, TTSEngineManager
-from voicevox_engine.utility.file_utility import try_delete_file
+from voicevox_engine.tts_pipeline.model_warmup import ModelWarmupStatus
+from voicevox_engine.tts_pipeline.synthesis_cache import SynthesisCache
+from voicevox_engine.tts_pipeline.tts_engine import (
+    LATEST_VERSION,
+    TTSEngine,
+    TTSEngineManager,
+)
+from voicevox_engine.tts_pipeline.wave_encoder import (
+    AUDIO_FORMAT_MEDIA_TYPES,
+    AudioFormat,
+    SampleFormat,
+    encode_wave,
+    generate_audio_zip_stream,
+    generate_streaming_wav_header,
+    is_supported_sample_format,
+    wave_to_pcm16_bytes,
+    wave_to_wav_bytes,
+)
+from voicevox_engine.utility.lru_cache import CacheStatistics
 
 
 class ParseKanaBadRequest(BaseModel):
@@ -74,14 +101,112 @@ class SupportedDevicesInfo(BaseModel):
         )
 
 
+class EngineReadiness(BaseModel):
+    """
+    音声合成エンジンがリクエストを遅延なく処理できる状態かどうか
+    """
+
+    ready: bool = Field(
+        description="ウォームアップ対象の全ての音声合成モデルのウォームアップが完了しているか"
+    )
+    models: dict[str, ModelWarmupStatus] = Field(
+        description="ウォームアップ対象の音声合成モデルの UUID をキーとした、ウォームアップの状態"
+    )
+
+
+# 音声データを返す API で共通の、出力形式とサンプルの形式のクエリパラメータ
+OutputFormatQuery = Annotated[
+    AudioFormat,
+    Query(
+        description=(
+            "出力形式。wav は WAV 、flac は FLAC 、ogg は Ogg Opus 、mp3 は MP3 、pcm はヘッダなしのリニア PCM (リトルエンディアン) で返す。"
+            "Opus が対応していないサンプリングレートが指定された場合、ogg は 48kHz にリサンプリングして返す。"
+            "/multi_synthesis では ZIP ファイルに格納する音声ファイルの出力形式を表す。"
+        ),
+    ),
+]
+SampleFormatQuery = Annotated[
+    SampleFormat,
+    Query(
+        description="サンプルの形式。float32 は出力形式が wav または pcm の場合のみ指定できる (それ以外の出力形式では 422 エラーを返す) 。",
+    ),
+]
+
+
 def generate_tts_pipeline_router(
     tts_engines: TTSEngineManager,
     preset_manager: PresetManager,
     cancellable_engine: CancellableEngine | None,
+    synthesis_cache: SynthesisCache | None = None,
 ) -> APIRouter:
     """音声合成 API Router を生成する"""
     router = APIRouter()
 
+    def get_preset(preset_id: int) -> Preset:
+        """プリセット ID に対応するプリセットを取得する。見つからなければ HTTP エラーを送出する。"""
+        try:
+            presets = preset_manager.load_presets()
+        except PresetInputError as err:
+            raise HTTPException(status_code=422, detail=str(err))
+        except PresetInternalError as err:
+            raise HTTPException(status_code=500, detail=str(err))
+        for preset in presets:
+            if preset.id == preset_id:
+                return preset
+        raise HTTPException(
+            status_code=422, detail="該当するプリセットIDが見つかりません"
+        )
+
+    def validate_output_format(
+        output_format: AudioFormat, sample_format: SampleFormat
+    ) -> None:
+        """出力形式とサンプルの形式の組み合わせが対応していなければ HTTP エラーを送出する。"""
+        if not is_supported_sample_format(output_format, sample_format):
+            raise HTTPException(
+                status_code=422,
+                detail=f"出力形式 {output_format} ではサンプルの形式 {sample_format} を指定できません",
+            )
+
+    def synthesize_audio_bytes(
+        engine: TTSEngine,
+        query: AudioQuery,
+        style_id: StyleId,
+        output_format: AudioFormat,
+        sample_format: SampleFormat,
+        enable_interrogative_upspeak: bool,
+        version: str,
+    ) -> bytes:
+        """
+        音声合成し、指定された出力形式にエンコードした音声データを返す
+        音声合成結果のキャッシュが有効な場合は、キャッシュにあればそのまま返し、なければ合成結果をキャッシュする
+        """
+        cache_key: str | None = None
+        if synthesis_cache is not None:
+            cache_key = synthesis_cache.make_key(
+                query,
+                style_id,
+                engine.get_synthesis_model_version(style_id),
+                output_format=output_format,
+                sample_format=sample_format,
+                enable_interrogative_upspeak=enable_interrogative_upspeak,
+                version=version,
+            )
+            audio_bytes = synthesis_cache.get(cache_key)
+            if audio_bytes is not None:
+                return audio_bytes
+
+        wave = engine.synthesize_wave(
+            query,
+            style_id,
+            enable_interrogative_upspeak=enable_interrogative_upspeak,
+        )
+        audio_bytes = encode_wave(
+            wave, query.outputSamplingRate, output_format, sample_format
+        )
+        if synthesis_cache is not None and cache_key is not None:
+            synthesis_cache.put(cache_key, audio_bytes)
+        return audio_bytes
+
     @router.post(
         "/audio_query",
         tags=["クエリ作成"],
@@ -136,20 +261,7 @@ def generate_tts_pipeline_router(
         """
         version = core_version or LATEST_VERSION
         engine = tts_engines.get_engine(version)
-        try:
-            presets = preset_manager.load_presets()
-        except PresetInputError as err:
-            raise HTTPException(status_code=422, detail=str(err))
-        except PresetInternalError as err:
-            raise HTTPException(status_code=500, detail=str(err))
-        for preset in presets:
-            if preset.id == preset_id:
-                selected_preset = preset
-                break
-        else:
-            raise HTTPException(
-                status_code=422, detail="該当するプリセットIDが見つかりません"
-            )
+        selected_preset = get_preset(preset_id)
 
         accent_phrases = engine.create_accent_phrases(text, selected_preset.style_id)
         return AudioQuery(
@@ -263,20 +375,24 @@ def generate_tts_pipeline_router(
 
     @router.post(
         "/synthesis",
-        response_class=FileResponse,
+        response_class=Response,
         responses={
             200: {
                 "content": {
-                    "audio/wav": {"schema": {"type": "string", "format": "binary"}}
+                    media_type: {"schema": {"type": "string", "format": "binary"}}
+                    for media_type in AUDIO_FORMAT_MEDIA_TYPES.values()
                 },
             }
         },
         tags=["音声合成"],
         summary="音声合成する",
     )
-    def synthesis(
+    async def synthesis(
         query: AudioQuery,
+        request: Request,
         style_id: Annotated[StyleId, Query(alias="speaker")],
+        output_format: OutputFormatQuery = "wav",
+        sample_format: SampleFormatQuery = "int16",
         enable_interrogative_upspeak: bool = Query(  # noqa: B008
             default=True,
             description="AivisSpeech Engine ではサポートされていないパラメータです (常に無視されます) 。",
@@ -285,27 +401,255 @@ def generate_tts_pipeline_router(
             str | SkipJsonSchema[None],
             Query(description="AivisSpeech Engine ではサポートされていないパラメータです (常に無視されます) 。"),
         ] = None,  # fmt: skip # noqa
-    ) -> FileResponse:
+    ) -> Response:
+        validate_output_format(output_format, sample_format)
         version = core_version or LATEST_VERSION
         engine = tts_engines.get_engine(version)
-        wave = engine.synthesize_wave(
+
+        def synthesize() -> bytes:
+            return synthesize_audio_bytes(
+                engine,
+                query,
+                style_id,
+                output_format,
+                sample_format,
+                enable_interrogative_upspeak,
+                version,
+            )
+
+        # 音声合成中にクライアントとの接続が切断された場合は、音声合成処理の段階の間で打ち切る
+        audio_bytes = await run_cancellable_in_threadpool(request, synthesize)
+        return Response(
+            content=audio_bytes, media_type=AUDIO_FORMAT_MEDIA_TYPES[output_format]
+        )
+
+    @router.post(
+        "/tts",
+        response_class=Response,
+        responses={
+            200: {
+                "content": {
+                    media_type: {"schema": {"type": "string", "format": "binary"}}
+                    for media_type in AUDIO_FORMAT_MEDIA_TYPES.values()
+                },
+            }
+        },
+        tags=["音声合成"],
+        summary="テキストから音声合成用のクエリを作成せずに直接音声合成する",
+    )
+    async def tts(
+        text: str,
+        request: Request,
+        style_id: Annotated[
+            StyleId | None,
+            Query(
+                alias="speaker",
+                description="スタイル ID 。preset_id を指定した場合は省略でき、省略時はプリセットのスタイル ID を使う。",
+            ),
+        ] = None,
+        preset_id: Annotated[
+            int | None,
+            Query(
+                description="プリセット ID 。指定した場合はプリセットの値をパラメータの初期値として使う。"
+            ),
+        ] = None,
+        speed_scale: Annotated[
+            float | None, Query(description="全体の話速 (デフォルト: 1.0)")
+        ] = None,
+        intonation_scale: Annotated[
+            float | None,
+            Query(description="話者スタイルの声色の強弱 (デフォルト: 1.0)"),
+        ] = None,
+        tempo_dynamics_scale: Annotated[
+            float | None, Query(description="話す速さの緩急の強弱 (デフォルト: 1.0)")
+        ] = None,
+        pitch_scale: Annotated[
+            float | None, Query(description="全体の音高 (デフォルト: 0.0)")
+        ] = None,
+        volume_scale: Annotated[
+            float | None, Query(description="全体の音量 (デフォルト: 1.0)")
+        ] = None,
+        pre_phoneme_length: Annotated[
+            float | None, Query(description="音声の前の無音時間 (秒) (デフォルト: 0.1)")
+        ] = None,
+        post_phoneme_length: Annotated[
+            float | None, Query(description="音声の後の無音時間 (秒) (デフォルト: 0.1)")
+        ] = None,
+        pause_length_scale: Annotated[
+            float | None,
+            Query(description="句読点などの無音時間 (倍率) (デフォルト: 1.0)"),
+        ] = None,
+        output_sampling_rate: Annotated[
+            int | None,
+            Query(description="音声データの出力サンプリングレート (デフォルト: モデルのサンプリングレート)"),
+        ] = None,
+        output_stereo: Annotated[
+            bool, Query(description="音声データをステレオ出力するか否か")
+        ] = False,
+        output_format: OutputFormatQuery = "wav",
+        sample_format: SampleFormatQuery = "int16",
+        enable_interrogative_upspeak: bool = Query(  # noqa: B008
+            default=True,
+            description="AivisSpeech Engine ではサポートされていないパラメータです (常に無視されます) 。",
+        ),
+        core_version: Annotated[
+            str | SkipJsonSchema[None],
+            Query(description="AivisSpeech Engine ではサポートされていないパラメータです (常に無視されます) 。"),
+        ] = None,  # fmt: skip # noqa
+    ) -> Response:
+        """
+        テキストを受け取り、/audio_query と /synthesis を 1 回のリクエストで行って音声データを返します。
+        音声合成用のクエリを JSON としてやり取りしないため、クエリを編集する必要がない場合は 2 回に分けて呼び出すより高速です。
+        preset_id を指定するとプリセットの値を初期値とし、個別に指定したパラメータはプリセットの値より優先されます。
+        """
+        validate_output_format(output_format, sample_format)
+        version = core_version or LATEST_VERSION
+        engine = tts_engines.get_engine(version)
+
+        # プリセットが指定された場合は、プリセットの値をパラメータの初期値とする
+        selected_preset = get_preset(preset_id) if preset_id is not None else None
+        if style_id is None:
+            if selected_preset is None:
+                raise HTTPException(
+                    status_code=422,
+                    detail="speaker と preset_id のどちらかを指定してください",
+                )
+            style_id = selected_preset.style_id
+        resolved_style_id: StyleId = style_id
+
+        def resolve(value: float | None, name: str, default: float) -> float:
+            """個別に指定された値 > プリセットの値 > デフォルト値 の順に、パラメータの値を決める"""
+            if value is not None:
+                return value
+            if selected_preset is not None:
+                return getattr(selected_preset, name)
+            return default
+
+        def synthesize() -> bytes:
+            # アクセント句系列を生成し、JSON を介さずにそのまま音声合成用のクエリとして音声合成する
+            accent_phrases = engine.create_accent_phrases(text, resolved_style_id)
+            query = AudioQuery(
+                accent_phrases=accent_phrases,
+                speedScale=resolve(speed_scale, "speedScale", 1.0),
+                intonationScale=resolve(intonation_scale, "intonationScale", 1.0),
+                tempoDynamicsScale=resolve(
+                    tempo_dynamics_scale, "tempoDynamicsScale", 1.0
+                ),
+                pitchScale=resolve(pitch_scale, "pitchScale", 0.0),
+                volumeScale=resolve(volume_scale, "volumeScale", 1.0),
+                prePhonemeLength=resolve(pre_phoneme_length, "prePhonemeLength", 0.1),
+                postPhonemeLength=resolve(
+                    post_phoneme_length, "postPhonemeLength", 0.1
+                ),
+                pauseLength=(
+                    selected_preset.pauseLength if selected_preset is not None else None
+                ),
+                pauseLengthScale=resolve(pause_length_scale, "pauseLengthScale", 1.0),
+                outputSamplingRate=(
+                    output_sampling_rate
+                    if output_sampling_rate is not None
+                    else engine.default_sampling_rate
+                ),
+                outputStereo=output_stereo,
+                kana=text,  # AivisSpeech Engine では音声合成時に読み上げテキストも必要なため、kana に読み上げテキストをそのまま入れる
+            )
+            return synthesize_audio_bytes(
+                engine,
+                query,
+                resolved_style_id,
+                output_format,
+                sample_format,
+                enable_interrogative_upspeak,
+                version,
+            )
+
+        # 音声合成中にクライアントとの接続が切断された場合は、音声合成処理の段階の間で打ち切る
+        audio_bytes = await run_cancellable_in_threadpool(request, synthesize)
+        return Response(
+            content=audio_bytes, media_type=AUDIO_FORMAT_MEDIA_TYPES[output_format]
+        )
+
+    @router.post(
+        "/stream_synthesis",
+        response_class=StreamingResponse,
+        responses={
+            200: {
+                "content": {
+                    "audio/wav": {"schema": {"type": "string", "format": "binary"}},
+                    "audio/pcm": {"schema": {"type": "string", "format": "binary"}},
+                },
+            }
+        },
+        tags=["音声合成"],
+        summary="音声合成し、合成できた部分から順にストリーミングで返す",
+    )
+    async def stream_synthesis(
+        query: AudioQuery,
+        request: Request,
+        style_id: Annotated[StyleId, Query(alias="speaker")],
+        output_format: Annotated[
+            Literal["wav", "pcm"],
+            Query(
+                description=(
+                    "出力形式。wav はデータサイズ不定のストリーミング用ヘッダが付いた 16bit リニア PCM の WAV 、"
+                    "pcm はヘッダなしの 16bit リニア PCM (リトルエンディアン) で返す。"
+                ),
+            ),
+        ] = "wav",
+        enable_interrogative_upspeak: bool = Query(  # noqa: B008
+            default=True,
+            description="AivisSpeech Engine ではサポートされていないパラメータです (常に無視されます) 。",
+        ),
+        core_version: Annotated[
+            str | SkipJsonSchema[None],
+            Query(description="AivisSpeech Engine ではサポートされていないパラメータです (常に無視されます) 。"),
+        ] = None,  # fmt: skip # noqa
+    ) -> StreamingResponse:
+        """
+        テキストを文ごとに分割して音声合成し、合成が完了した文から順に chunked transfer encoding で返します。
+        長いテキストでも、最初の文の音声合成が終わった時点で再生を開始できます。
+        """
+        version = core_version or LATEST_VERSION
+        engine = tts_engines.get_engine(version)
+        waves = engine.synthesize_wave_stream(
             query, style_id, enable_interrogative_upspeak=enable_interrogative_upspeak
         )
 
-        with NamedTemporaryFile(delete=False) as f:
-            soundfile.write(
-                file=f, data=wave, samplerate=query.outputSamplingRate, format="WAV"
+        # 最初の文から最後の文まで、同じキャンセル要求のトークンを共有する
+        # ストリーミング中にクライアントとの接続が切断された場合も、残りの文の推論を文の間や推論中のキャンセルポイントで打ち切る
+        token = CancellationToken()
+
+        # 最初の文はレスポンスを返す前に合成し、存在しないスタイル ID などのエラーを通常の HTTP エラーとして返せるようにする
+        try:
+            first_wave = await run_cancellable_in_threadpool(
+                request, lambda: next(waves, None), token
             )
+        except BaseException:
+            token.cancel()
+            raise
 
-        return FileResponse(
-            f.name,
-            media_type="audio/wav",
-            background=BackgroundTask(try_delete_file, f.name),
+        async def generate_chunks() -> AsyncIterator[bytes]:
+            if output_format == "wav":
+                yield generate_streaming_wav_header(
+                    query.outputSamplingRate, 2 if query.outputStereo else 1
+                )
+            if first_wave is not None:
+                yield wave_to_pcm16_bytes(first_wave)
+            try:
+                async for wave in iterate_cancellable_in_threadpool(waves, token):
+                    yield wave_to_pcm16_bytes(wave)
+            except SynthesisCancelledError:
+                # 接続が切断された後は送信先がないため、残りの文を返さずに終了する
+                return
+
+        return StreamingResponse(
+            generate_chunks(),
+            media_type="audio/wav" if output_format == "wav" else "audio/pcm",
         )
 
     @router.post(
         "/cancellable_synthesis",
-        response_class=FileResponse,
+        response_class=Response,
         responses={
             200: {
                 "content": {
@@ -314,22 +658,24 @@ def generate_tts_pipeline_router(
             }
         },
         tags=["音声合成"],
-        # summary="音声合成する（キャンセル可能）",
-        summary="AivisSpeech Engine ではサポートされていない API です (常に 501 Not Implemented を返します)",
+        summary="音声合成する（キャンセル可能）",
     )
-    def cancellable_synthesis(
+    async def cancellable_synthesis(
         query: AudioQuery,
         request: Request,
         style_id: Annotated[StyleId, Query(alias="speaker")],
+        enable_interrogative_upspeak: bool = Query(  # noqa: B008
+            default=True,
+            description="AivisSpeech Engine ではサポートされていないパラメータです (常に無視されます) 。",
+        ),
         core_version: Annotated[
             str | SkipJsonSchema[None],
             Query(description="AivisSpeech Engine ではサポートされていないパラメータです (常に無視されます) 。"),
         ] = None,  # fmt: skip # noqa
-    ) -> FileResponse:
-        raise HTTPException(
-            status_code=501,
-            detail="Cancelable synthesis is not supported in AivisSpeech Engine.",
-        )
+    ) -> Response:
+        """
+        音声合成をワーカープロセスで行い、クライアントとの接続が切断された場合は推論の途中でも中断します。
+        利用するには、エンジンの起動時に `--enable_cancellable_synthesis` を指定する必要があります。
         """
         if cancellable_engine is None:
             raise HTTPException(
@@ -337,26 +683,23 @@ def generate_tts_pipeline_router(
                 detail="実験的機能はデフォルトで無効になっています。使用するには引数を指定してください。",
             )
         try:
-            version = core_version or LATEST_VERSION
-            f_name = cancellable_engine._synthesis_impl(
-                query, style_id, request, version=version
+            wave = await cancellable_engine.synthesize(
+                query,
+                style_id,
+                request,
+                enable_interrogative_upspeak=enable_interrogative_upspeak,
             )
         except CancellableEngineInternalError as e:
             raise HTTPException(status_code=500, detail=str(e))
 
-        if f_name == "":
-            raise HTTPException(status_code=422, detail="不明なバージョンです")
-
-        return FileResponse(
-            f_name,
+        return Response(
+            content=wave_to_wav_bytes(wave, query.outputSamplingRate),
             media_type="audio/wav",
-            background=BackgroundTask(try_delete_file, f_name),
         )
-        """
 
     @router.post(
         "/multi_synthesis",
-        response_class=FileResponse,
+        response_class=StreamingResponse,
         responses={
             200: {
                 "content": {
@@ -369,42 +712,112 @@ def generate_tts_pipeline_router(
         tags=["音声合成"],
         summary="複数まとめて音声合成する",
     )
-    def multi_synthesis(
+    async def multi_synthesis(
         queries: list[AudioQuery],
+        request: Request,
         style_id: Annotated[StyleId, Query(alias="speaker")],
+        output_format: OutputFormatQuery = "wav",
+        sample_format: SampleFormatQuery = "int16",
         core_version: Annotated[
             str | SkipJsonSchema[None],
             Query(description="AivisSpeech Engine ではサポートされていないパラメータです (常に無視されます) 。"),
         ] = None,  # fmt: skip # noqa
-    ) -> FileResponse:
+    ) -> StreamingResponse:
+        validate_output_format(output_format, sample_format)
         version = core_version or LATEST_VERSION
         engine = tts_engines.get_engine(version)
         sampling_rate = queries[0].outputSamplingRate
 
-        with NamedTemporaryFile(delete=False) as f:
-            with zipfile.ZipFile(f, mode="a") as zip_file:
-                for i in range(len(queries)):
-                    if queries[i].outputSamplingRate != sampling_rate:
-                        raise HTTPException(
-                            status_code=422,
-                            detail="サンプリングレートが異なるクエリがあります",
-                        )
-
-                    with TemporaryFile() as wav_file:
-                        wave = engine.synthesize_wave(queries[i], style_id)
-                        soundfile.write(
-                            file=wav_file,
-                            data=wave,
-                            samplerate=sampling_rate,
-                            format="WAV",
-                        )
-                        wav_file.seek(0)
-                        zip_file.writestr(f"{str(i + 1).zfill(3)}.wav", wav_file.read())
+        for query in queries:
+            if query.outputSamplingRate != sampling_rate:
+                raise HTTPException(
+                    status_code=422,
+                    detail="サンプリングレートが異なるクエリがあります",
+                )
 
-        return FileResponse(
-            f.name,
+        # 音声合成中にクライアントとの接続が切断された場合は、まだ音声合成していないクエリを打ち切る
+        waves = await run_cancellable_in_threadpool(
+            request, lambda: engine.synthesize_waves(queries, style_id)
+        )
+
+        # ZIP ファイルを一時ファイルに書き出さず、WAV ファイル 1 つ分ずつエンコードしながらストリーミングで返す
+        return StreamingResponse(
+            generate_audio_zip_stream(
+                waves, sampling_rate, output_format, sample_format
+            ),
             media_type="application/zip",
-            background=BackgroundTask(try_delete_file, f.name),
+        )
+
+    @router.get(
+        "/cache_statistics",
+        tags=["その他"],
+        summary="音声合成エンジン内部のキャッシュの統計情報を取得する",
+    )
+    def cache_statistics(
+        core_version: Annotated[
+            str | SkipJsonSchema[None],
+            Query(description="AivisSpeech Engine ではサポートされていないパラメータです (常に無視されます) 。"),
+        ] = None,  # fmt: skip # noqa
+    ) -> dict[str, CacheStatistics]:
+        """
+        ロード済み音声合成モデルや BERT 特徴量、音声合成結果など、音声合成エンジン内部のキャッシュのヒット・ミス・破棄回数などを、キャッシュの名前をキーとして返します。
+        """
+        version = core_version or LATEST_VERSION
+        engine = tts_engines.get_engine(version)
+        cache_statistics = engine.get_cache_statistics()
+        if synthesis_cache is not None:
+            cache_statistics.update(synthesis_cache.statistics())
+        return cache_statistics
+
+    @router.get(
+        "/inference_statistics",
+        tags=["その他"],
+        summary="音声合成エンジンの推論スケジューラの統計情報を取得する",
+    )
+    def inference_statistics(
+        core_version: Annotated[
+            str | SkipJsonSchema[None],
+            Query(description="AivisSpeech Engine ではサポートされていないパラメータです (常に無視されます) 。"),
+        ] = None,  # fmt: skip # noqa
+    ) -> InferenceSchedulerStatistics | None:
+        """
+        同時に実行中の推論の数・実行を待っている推論の数・待ち行列が上限に達して拒否したリクエストの数・待ち時間などを返します。
+        推論スケジューラを持たない音声合成エンジンでは null を返します。
+        """
+        version = core_version or LATEST_VERSION
+        engine = tts_engines.get_engine(version)
+        return engine.get_inference_statistics()
+
+    @router.get(
+        "/ready",
+        responses={
+            503: {
+                "model": EngineReadiness,
+                "description": "音声合成モデルのウォームアップが完了していない",
+            }
+        },
+        tags=["その他"],
+        summary="音声合成エンジンがリクエストを遅延なく処理できる状態かどうかを取得する",
+    )
+    def ready(
+        response: Response,
+        core_version: Annotated[
+            str | SkipJsonSchema[None],
+            Query(description="AivisSpeech Engine ではサポートされていないパラメータです (常に無視されます) 。"),
+        ] = None,  # fmt: skip # noqa
+    ) -> EngineReadiness:
+        """
+        起動時に事前ロードを指定された音声合成モデルのウォームアップ (ロードとスタイルごとのダミーの推論) が全て完了していれば 200 を、
+        完了していなければ 503 を返します。ロードバランサーのヘルスチェックに使うことで、ウォームアップ済みのノードにだけリクエストを振り分けられます。
+        音声合成モデルごとのウォームアップの状態も返します。
+        """
+        version = core_version or LATEST_VERSION
+        engine = tts_engines.get_engine(version)
+        is_ready = engine.is_ready()
+        if is_ready is False:
+            response.status_code = 503
+        return EngineReadiness(
+            ready=is_ready, models=engine.get_model_warmup_statuses()
         )
 
     @router.post(
@@ -528,7 +941,7 @@ def generate_tts_pipeline_router(
 
     @router.post(
         "/connect_waves",
-        response_class=FileResponse,
+        response_class=Response,
         responses={
             200: {
                 "content": {
@@ -539,7 +952,7 @@ def generate_tts_pipeline_router(
         tags=["その他"],
         summary="base64エンコードされた複数のwavデータを一つに結合する",
     )
-    def connect_waves(waves: list[str]) -> FileResponse:
+    def connect_waves(waves: list[str]) -> Response:
         """
         base64エンコードされたwavデータを一纏めにし、wavファイルで返します。
         """
@@ -548,18 +961,9 @@ def generate_tts_pipeline_router(
         except ConnectBase64WavesException as err:
             raise HTTPException(status_code=422, detail=str(err))
 
-        with NamedTemporaryFile(delete=False) as f:
-            soundfile.write(
-                file=f,
-                data=waves_nparray,
-                samplerate=sampling_rate,
-                format="WAV",
-            )
-
-        return FileResponse(
-            f.name,
+        return Response(
+            content=wave_to_wav_bytes(waves_nparray, sampling_rate),
             media_type="audio/wav",
-            background=BackgroundTask(try_delete_file, f.name),
         )
 
     @router.post(
@@ -1,13 +1,17 @@
 """ユーザー辞書機能を提供する API Router"""
 
-from typing import Annotated
+from collections.abc import Mapping
+from typing import Annotated, Literal
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query
-from pydantic import ValidationError
+from pydantic import BaseModel, Field, ValidationError
 from pydantic.json_schema import SkipJsonSchema
 
 from voicevox_engine.user_dict.model import UserDictWord, WordTypes
-from voicevox_engine.user_dict.user_dict_manager import UserDictionary
+from voicevox_engine.user_dict.user_dict_manager import (
+    UserDictionary,
+    UserDictTransaction,
+)
 from voicevox_engine.user_dict.user_dict_word import (
     USER_DICT_MAX_PRIORITY,
     USER_DICT_MIN_PRIORITY,
@@ -18,6 +22,100 @@ from voicevox_engine.user_dict.user_dict_word import (
 from ..dependencies import VerifyMutabilityAllowed
 
 
+class UserDictWordOperation(BaseModel):
+    """ユーザー辞書の一括更新で適用する 1 件の操作"""
+
+    action: Literal["add", "rewrite", "delete"] = Field(
+        description="操作の種類。add は追加、rewrite は更新、delete は削除"
+    )
+    word_uuid: str | SkipJsonSchema[None] = Field(
+        default=None,
+        description="更新・削除する言葉のUUID (rewrite と delete では必須)",
+    )
+    surface: str | SkipJsonSchema[None] = Field(
+        default=None, description="言葉の表層形 (add と rewrite では必須)"
+    )
+    pronunciation: str | SkipJsonSchema[None] = Field(
+        default=None, description="言葉の発音（カタカナ） (add と rewrite では必須)"
+    )
+    accent_type: int | SkipJsonSchema[None] = Field(
+        default=None,
+        description="アクセント型（音が下がる場所を指す） (add と rewrite では必須)",
+    )
+    word_type: WordTypes | SkipJsonSchema[None] = Field(
+        default=None,
+        description="PROPER_NOUN（固有名詞）、COMMON_NOUN（普通名詞）、VERB（動詞）、ADJECTIVE（形容詞）、SUFFIX（語尾）のいずれか",
+    )
+    priority: int | SkipJsonSchema[None] = Field(
+        default=None,
+        description="単語の優先度（0から10までの整数）。数字が大きいほど優先度が高くなる。",
+    )
+
+
+class UserDictWordOperationResult(BaseModel):
+    """ユーザー辞書の一括更新での 1 件の操作の結果"""
+
+    success: bool = Field(description="操作に成功したかどうか")
+    word_uuid: str | None = Field(
+        default=None,
+        description="操作の対象になった言葉のUUID (add では新たに割り当てられたUUID)",
+    )
+    error: str | None = Field(default=None, description="操作に失敗した理由")
+
+
+class UserDictBatchResult(BaseModel):
+    """ユーザー辞書の一括更新の結果"""
+
+    committed: bool = Field(description="ユーザー辞書に変更が保存されたかどうか")
+    results: list[UserDictWordOperationResult] = Field(
+        description="操作ごとの結果 (リクエストと同じ順序)"
+    )
+
+
+class UserDictVersion(BaseModel):
+    """ユーザー辞書のバージョン"""
+
+    version: int = Field(
+        description="ユーザー辞書のバージョン (ユーザー辞書が変更されるたびに増える)"
+    )
+    applied_version: int = Field(
+        description="テキスト解析に適用済みのユーザー辞書のバージョン (version と一致していれば、すべての変更が適用済み)"
+    )
+
+
+def _apply_user_dict_word_operation(
+    transaction: UserDictTransaction, operation: UserDictWordOperation
+) -> str:
+    """ユーザー辞書の一括更新の 1 件の操作をトランザクションに適用し、対象の言葉の UUID を返す。"""
+    if operation.action == "delete":
+        if operation.word_uuid is None:
+            raise UserDictInputError("word_uuid が指定されていません")
+        transaction.delete_word(operation.word_uuid)
+        return operation.word_uuid
+
+    if (
+        operation.surface is None
+        or operation.pronunciation is None
+        or operation.accent_type is None
+    ):
+        raise UserDictInputError(
+            "surface・pronunciation・accent_type が指定されていません"
+        )
+    word_property = WordProperty(
+        surface=operation.surface,
+        pronunciation=operation.pronunciation,
+        accent_type=operation.accent_type,
+        word_type=operation.word_type,
+        priority=operation.priority,
+    )
+    if operation.action == "add":
+        return transaction.apply_word(word_property)
+    if operation.word_uuid is None:
+        raise UserDictInputError("word_uuid が指定されていません")
+    transaction.rewrite_word(operation.word_uuid, word_property)
+    return operation.word_uuid
+
+
 def generate_user_dict_router(
     user_dict: UserDictionary, verify_mutability: VerifyMutabilityAllowed
 ) -> APIRouter:
@@ -28,13 +126,13 @@ def generate_user_dict_router(
         "/user_dict",
         response_description="単語のUUIDとその詳細",
     )
-    def get_user_dict_words() -> dict[str, UserDictWord]:
+    def get_user_dict_words() -> Mapping[str, UserDictWord]:
         """
         ユーザー辞書に登録されている単語の一覧を返します。
         単語の表層形(surface)は正規化済みの物を返します。
         """
         try:
-            return user_dict.read_dict()
+            return user_dict.get_words()
         except UserDictInputError as err:
             raise HTTPException(status_code=422, detail=str(err))
         except Exception:
@@ -42,6 +140,17 @@ def generate_user_dict_router(
                 status_code=500, detail="辞書の読み込みに失敗しました。"
             )
 
+    @router.get("/user_dict_version")
+    def get_user_dict_version() -> UserDictVersion:
+        """
+        ユーザー辞書のバージョンを返します。
+        ユーザー辞書の変更はバックグラウンドで辞書に適用されるため、変更直後の読み方を確認したい場合は、
+        applied_version が version に追いつくまで待ってください。
+        """
+        return UserDictVersion(
+            version=user_dict.version, applied_version=user_dict.applied_version
+        )
+
     @router.post("/user_dict_word", dependencies=[Depends(verify_mutability)])
     def add_user_dict_word(
         surface: Annotated[str, Query(description="言葉の表層形")],
@@ -175,6 +284,72 @@ def generate_user_dict_router(
                 status_code=500, detail="ユーザー辞書の更新に失敗しました。"
             )
 
+    @router.post(
+        "/user_dict_words",
+        dependencies=[Depends(verify_mutability)],
+    )
+    def batch_update_user_dict_words(
+        operations: Annotated[
+            list[UserDictWordOperation],
+            Body(description="順に適用する言葉の追加・更新・削除の操作のリスト"),
+        ],
+        atomic: Annotated[
+            bool,
+            Query(
+                description="true の場合、1 件でも失敗した操作があればすべての操作を取り消す。false の場合、成功した操作のみを保存する"
+            ),
+        ] = True,
+    ) -> UserDictBatchResult:
+        """
+        ユーザー辞書に対する言葉の追加・更新・削除をまとめて行います。
+        すべての操作を検証・適用した後に、ユーザー辞書の保存とコンパイルを 1 回だけ行います。
+        大量の言葉を登録する場合は、`/user_dict_word` を繰り返し呼ぶ代わりにこの API を使ってください。
+        """
+        results: list[UserDictWordOperationResult] = []
+        try:
+            with user_dict.transaction() as transaction:
+                for operation in operations:
+                    try:
+                        word_uuid = _apply_user_dict_word_operation(
+                            transaction, operation
+                        )
+                        results.append(
+                            UserDictWordOperationResult(
+                                success=True, word_uuid=word_uuid
+                            )
+                        )
+                    except (UserDictInputError, ValidationError) as err:
+                        results.append(
+                            UserDictWordOperationResult(
+                                success=False,
+                                word_uuid=operation.word_uuid,
+                                error=str(err),
+                            )
+                        )
+                has_failure = any(not result.success for result in results)
+                if atomic and has_failure:
+                    transaction.rollback()
+                committed = transaction.is_modified and not transaction.is_rolled_back
+        except Exception:
+            raise HTTPException(
+                status_code=500, detail="ユーザー辞書の更新に失敗しました。"
+            )
+
+        if atomic and has_failure:
+            # 取り消された操作は、単体では成功していても失敗として返す
+            results = [
+                (
+                    result
+                    if not result.success
+                    else UserDictWordOperationResult(
+                        success=False,
+                        error="他の操作が失敗したため取り消されました",
+                    )
+                )
+                for result in results
+            ]
+        return UserDictBatchResult(committed=committed, results=results)
+
     @router.post(
         "/import_user_dict",
         status_code=204,
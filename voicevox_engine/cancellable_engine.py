@@ -1,25 +1,34 @@
 """キャンセル可能な音声合成"""
 
-import asyncio
+import itertools
+import multiprocessing
+import pickle
 import queue
 import sys
-from multiprocessing import Pipe, Process
+import threading
+from multiprocessing.process import BaseProcess
 
 if sys.platform == "win32":
     from multiprocessing.connection import PipeConnection as ConnectionType
 else:
     from multiprocessing.connection import Connection as ConnectionType
 
+from collections.abc import Mapping
 from pathlib import Path
-from tempfile import NamedTemporaryFile
+from typing import Any
 
-import soundfile
-from fastapi import Request
+import numpy as np
+from fastapi import HTTPException, Request
+from numpy.typing import NDArray
 
-from .core.core_initializer import initialize_cores
 from .metas.Metas import StyleId
 from .model import AudioQuery
-from .tts_pipeline.tts_engine import LatestVersion, make_tts_engines_from_cores
+from .tts_pipeline.cancellation import (
+    current_cancellation_token,
+    raise_if_cancelled,
+    run_cancellable_in_threadpool,
+)
+from .tts_pipeline.onnx_session_config import OnnxSessionConfig
 
 
 class CancellableEngineInternalError(Exception):
@@ -28,22 +37,71 @@ class CancellableEngineInternalError(Exception):
     pass
 
 
+def send_result(con: ConnectionType, result: tuple[Any, ...]) -> None:
+    """
+    ワーカープロセスから音声合成の結果を送る
+    pickle protocol 5 の out-of-band バッファを使い、音声波形の NDArray のデータを pickle のバイト列にコピーせず、
+    そのままパイプに書き込む
+
+    Parameters
+    ----------
+    con: ConnectionType
+        メインプロセスと通信するためのPipe
+    result: tuple[Any, ...]
+        送信する結果
+    """
+    buffers: list[pickle.PickleBuffer] = []
+    payload = pickle.dumps(result, protocol=5, buffer_callback=buffers.append)
+    raw_buffers = [buffer.raw() for buffer in buffers]
+    con.send_bytes(payload)
+    con.send([raw_buffer.nbytes for raw_buffer in raw_buffers])
+    for raw_buffer in raw_buffers:
+        con.send_bytes(raw_buffer)
+
+
+def recv_result(con: ConnectionType) -> tuple[Any, ...]:
+    """
+    send_result() で送られた音声合成の結果を受け取る
+    out-of-band バッファはあらかじめ確保した bytearray に直接読み込むため、復元された NDArray は書き込み可能になる
+
+    Parameters
+    ----------
+    con: ConnectionType
+        ワーカープロセスと通信するためのPipe
+
+    Returns
+    -------
+    result: tuple[Any, ...]
+        受信した結果
+    """
+    payload = con.recv_bytes()
+    buffer_sizes: list[int] = con.recv()
+    buffers: list[bytearray] = []
+    for buffer_size in buffer_sizes:
+        buffer = bytearray(buffer_size)
+        con.recv_bytes_into(buffer)
+        buffers.append(buffer)
+    return pickle.loads(payload, buffers=buffers)
+
+
 class CancellableEngine:
     """
     音声合成のキャンセル機能に関するクラス
-    初期化後は、synthesis関数で音声合成できる
-    （オリジナルと比べ引数が増えているので注意）
-
-    パラメータ use_gpu, voicelib_dirs, voicevox_dir,
-    runtime_dirs, cpu_num_threads, enable_mock は、 core_initializer を参照
+    音声合成を StyleBertVITS2TTSEngine を持つワーカープロセスで行い、クライアントとの接続が切断されたら
+    推論の途中であってもワーカープロセスごと終了させることで、不要になった音声合成に CPU を使い続けないようにする
+    ワーカープロセスはそれぞれ BERT モデルを読み込んだ状態で待機しており、GIL を共有しないため複数コアで並列に音声合成できる
+    生成された音声波形はディスクを介さずパイプで直接受け取り、音声ファイルへのエンコードはメインプロセス側で行う
+    接続の切断はリクエストごとのキャンセル要求のトークンを通じて ASGI の http.disconnect イベントから直接通知されるため、
+    定期的に全リクエストの接続状態を確認する必要はない
+    初期化後は、synthesize 関数で音声合成できる
 
     Attributes
     ----------
-    watch_con_list: list[tuple[Request, Process]]
-        Requestは接続の監視に使用され、Processは通信切断時のプロセスキルに使用される
-        クライアントから接続があるとlistにtupleが追加される
-        接続が切断、もしくは音声合成が終了すると削除される
-    procs_and_cons: queue.Queue[tuple[Process, ConnectionType]]
+    running_jobs: dict[int, BaseProcess]
+        音声合成中のジョブ ID と、そのジョブを実行しているワーカープロセスの対応表
+        キャンセル要求を受けたジョブのワーカープロセスを O(1) で取り出して終了させるために使用される
+        音声合成を開始すると追加され、音声合成が終了するかキャンセルされると削除される
+    procs_and_cons: queue.Queue[tuple[BaseProcess, ConnectionType]]
         音声合成の準備が終わっているプロセスのList
         （音声合成中のプロセスは入っていない）
     """
@@ -52,54 +110,79 @@ class CancellableEngine:
         self,
         init_processes: int,
         use_gpu: bool,
-        voicelib_dirs: list[Path] | None,
-        voicevox_dir: Path | None,
-        runtime_dirs: list[Path] | None,
-        cpu_num_threads: int | None,
-        enable_mock: bool,
+        installed_aivm_dir: Path,
+        max_loaded_models: int | None = None,
+        enable_optimized_onnx_model_cache: bool = True,
+        onnx_session_config: OnnxSessionConfig = OnnxSessionConfig(),
+        onnx_session_overrides: Mapping[str, OnnxSessionConfig] | None = None,
     ) -> None:
         """
         変数の初期化を行う
         また、init_processesの数だけプロセスを起動し、procs_and_consに格納する
+
+        Parameters
+        ----------
+        init_processes : int
+            起動するワーカープロセスの数
+        use_gpu : bool
+            ワーカープロセスで GPU を使って推論するかどうか
+        installed_aivm_dir : Path
+            AIVMX ファイルのインストール先ディレクトリ
+        max_loaded_models : int | None
+            ワーカープロセスごとに同時にメモリ上に保持する音声合成モデルの最大数 (None なら無制限)
+        enable_optimized_onnx_model_cache : bool
+            ワーカープロセスで最適化済みの ONNX モデルのディスクキャッシュを使うかどうか
+        onnx_session_config : OnnxSessionConfig
+            ワーカープロセスの BERT モデル・音声合成モデルの ONNX Runtime のセッションに反映する設定
+        onnx_session_overrides : Mapping[str, OnnxSessionConfig] | None
+            ワーカープロセスでのモデルごとのセッションの上書き設定 (キーは AIVM の UUID 、BERT モデルは BERT_MODEL_KEY)
         """
 
         self.use_gpu = use_gpu
-        self.voicelib_dirs = voicelib_dirs
-        self.voicevox_dir = voicevox_dir
-        self.runtime_dirs = runtime_dirs
-        self.cpu_num_threads = cpu_num_threads
-        self.enable_mock = enable_mock
+        self.installed_aivm_dir = installed_aivm_dir
+        self.max_loaded_models = max_loaded_models
+        # ワーカープロセスでも、メインプロセスと同じスレッド数・量子化などのセッションの設定で推論する
+        # 設定を反映しないと、ワーカープロセスごとに ONNX Runtime の既定値 (全コア) のスレッドで推論し、CPU を奪い合ってしまう
+        self.enable_optimized_onnx_model_cache = enable_optimized_onnx_model_cache
+        self.onnx_session_config = onnx_session_config
+        self.onnx_session_overrides = dict(onnx_session_overrides or {})
+
+        # 親プロセスでは ONNX Runtime などがスレッドを起動済みで fork すると子プロセスがデッドロックしうるため、
+        # すべての OS で spawn によってワーカープロセスを起動する
+        self._mp_context = multiprocessing.get_context("spawn")
 
-        self.watch_con_list: list[tuple[Request, Process]] = []
+        self.running_jobs: dict[int, BaseProcess] = {}
+        self._running_jobs_lock = threading.Lock()
+        self._job_ids = itertools.count()
 
-        procs_and_cons: queue.Queue[tuple[Process, ConnectionType]] = queue.Queue()
+        procs_and_cons: queue.Queue[tuple[BaseProcess, ConnectionType]] = queue.Queue()
         for _ in range(init_processes):
             procs_and_cons.put(self.start_new_proc())
         self.procs_and_cons = procs_and_cons
 
     def start_new_proc(
         self,
-    ) -> tuple[Process, ConnectionType]:
+    ) -> tuple[BaseProcess, ConnectionType]:
         """
         新しく開始したプロセスを返す関数
 
         Returns
         -------
-        ret_proc: Process
+        ret_proc: BaseProcess
             新規のプロセス
         sub_proc_con1: ConnectionType
             ret_procのプロセスと通信するためのPipe
         """
-        sub_proc_con1, sub_proc_con2 = Pipe(True)
-        ret_proc = Process(
+        sub_proc_con1, sub_proc_con2 = self._mp_context.Pipe(True)
+        ret_proc = self._mp_context.Process(
             target=start_synthesis_subprocess,
             kwargs={
                 "use_gpu": self.use_gpu,
-                "voicelib_dirs": self.voicelib_dirs,
-                "voicevox_dir": self.voicevox_dir,
-                "runtime_dirs": self.runtime_dirs,
-                "cpu_num_threads": self.cpu_num_threads,
-                "enable_mock": self.enable_mock,
+                "installed_aivm_dir": self.installed_aivm_dir,
+                "max_loaded_models": self.max_loaded_models,
+                "enable_optimized_onnx_model_cache": self.enable_optimized_onnx_model_cache,
+                "onnx_session_config": self.onnx_session_config,
+                "onnx_session_overrides": self.onnx_session_overrides,
                 "sub_proc_con": sub_proc_con2,
             },
             daemon=True,
@@ -109,52 +192,60 @@ class CancellableEngine:
 
     def finalize_con(
         self,
-        req: Request,
-        proc: Process,
+        proc: BaseProcess,
         sub_proc_con: ConnectionType | None,
     ) -> None:
         """
-        接続が切断された時の処理を行う関数
-        watch_con_listからの削除、プロセスの後処理を行う
+        音声合成が終了した時の処理を行う関数
         プロセスが生きている場合はそのままprocs_and_consに加える
         死んでいる場合は新しく生成したものをprocs_and_consに加える
 
         Parameters
         ----------
-        req: fastapi.Request
-            接続確立時に受け取ったものをそのまま渡せばよい
-            https://fastapi.tiangolo.com/advanced/using-request-directly/
-        proc: Process
+        proc: BaseProcess
             音声合成を行っていたプロセス
         sub_proc_con: ConnectionType, optional
             音声合成を行っていたプロセスとのPipe
             指定されていない場合、プロセスは再利用されず終了される
         """
-        try:
-            self.watch_con_list.remove((req, proc))
-        except ValueError:
-            pass
-        try:
-            if not proc.is_alive() or sub_proc_con is None:
-                proc.close()
-                raise ValueError
+        if proc.is_alive() and sub_proc_con is not None:
             # プロセスが死んでいない場合は再利用する
             self.procs_and_cons.put((proc, sub_proc_con))
-        except ValueError:
-            # プロセスが死んでいるので新しく作り直す
-            self.procs_and_cons.put(self.start_new_proc())
+            return
 
-    def _synthesis_impl(
+        # プロセスが死んでいる (もしくは再利用しない) ので新しく作り直す
+        if proc.is_alive():
+            proc.terminate()
+        proc.join()
+        proc.close()
+        if sub_proc_con is not None:
+            sub_proc_con.close()
+        self.procs_and_cons.put(self.start_new_proc())
+
+    def cancel_job(self, job_id: int) -> None:
+        """
+        音声合成中のジョブをキャンセルし、ジョブを実行しているワーカープロセスを終了させる
+        ワーカープロセスの後処理は、音声合成の結果を待っていたスレッド側で行われる
+
+        Parameters
+        ----------
+        job_id: int
+            キャンセルするジョブの ID (既に終了している場合は何もしない)
+        """
+        with self._running_jobs_lock:
+            proc = self.running_jobs.pop(job_id, None)
+        if proc is not None and proc.is_alive():
+            proc.terminate()
+
+    async def synthesize(
         self,
         query: AudioQuery,
         style_id: StyleId,
         request: Request,
-        version: str | LatestVersion,
-    ) -> str:
+        enable_interrogative_upspeak: bool = True,
+    ) -> NDArray[np.float32]:
         """
-        音声合成を行う関数
-        通常エンジンの引数に比べ、requestが必要になっている
-        また、返り値がファイル名になっている
+        クライアントとの接続が切断されたらキャンセルされるように、ワーカープロセスで音声合成を行う
 
         Parameters
         ----------
@@ -163,103 +254,188 @@ class CancellableEngine:
         request: fastapi.Request
             接続確立時に受け取ったものをそのまま渡せばよい
             https://fastapi.tiangolo.com/advanced/using-request-directly/
-        version
+        enable_interrogative_upspeak: bool
 
         Returns
         -------
-        f_name: str
-            生成された音声ファイルの名前
+        wave: NDArray[np.float32]
+            生成された音声波形
+
+        Raises
+        ------
+        HTTPException
+            ワーカープロセス内の音声合成エンジンが HTTPException を送出した場合 (存在しないスタイル ID など)
+        CancellableEngineInternalError
+            ワーカープロセスが終了していた場合など
+        SynthesisCancelledError
+            クライアントとの接続が切断され、音声合成がキャンセルされた場合
+        """
+        return await run_cancellable_in_threadpool(
+            request,
+            lambda: self._synthesis_impl(query, style_id, enable_interrogative_upspeak),
+        )
+
+    def _synthesis_impl(
+        self,
+        query: AudioQuery,
+        style_id: StyleId,
+        enable_interrogative_upspeak: bool = True,
+    ) -> NDArray[np.float32]:
+        """
+        音声合成を行う関数
+        current_cancellation_token にキャンセル要求のトークンが設定されている場合は、
+        キャンセルされた時点でワーカープロセスを終了させて SynthesisCancelledError を送出する
+
+        Parameters
+        ----------
+        query: AudioQuery
+        style_id: StyleId
+        enable_interrogative_upspeak: bool
+
+        Returns
+        -------
+        wave: NDArray[np.float32]
+            生成された音声波形
+
+        Raises
+        ------
+        HTTPException
+            ワーカープロセス内の音声合成エンジンが HTTPException を送出した場合 (存在しないスタイル ID など)
+        CancellableEngineInternalError
+            ワーカープロセスが終了していた場合など
+        SynthesisCancelledError
+            音声合成がキャンセルされた場合
         """
+        token = current_cancellation_token.get()
+        # ワーカープロセスの空きを待ち始める前にキャンセルされていれば、待たずに打ち切る
+        raise_if_cancelled()
+
         proc, sub_proc_con1 = self.procs_and_cons.get()
-        self.watch_con_list.append((request, proc))
+        # ワーカープロセスの空きを待っている間にキャンセルされた場合は、まだ何も送っていないワーカープロセスを終了させずに戻す
+        # キャンセル時のコールバックを登録してから気付くと、待機中の正常なワーカープロセスを終了させてしまい、
+        # BERT モデルの読み込みからやり直す新しいワーカープロセスを起動することになる
+        if token is not None and token.is_cancelled:
+            self.finalize_con(proc, sub_proc_con1)
+            token.raise_if_cancelled()
+
+        job_id = next(self._job_ids)
+        with self._running_jobs_lock:
+            self.running_jobs[job_id] = proc
+
+        def cancel() -> None:
+            self.cancel_job(job_id)
+
+        if token is not None:
+            # 既にキャンセルされている場合は、その場でワーカープロセスが終了させられる
+            token.add_callback(cancel)
         try:
-            sub_proc_con1.send((query, style_id, version))
-            f_name = sub_proc_con1.recv()
-            if isinstance(f_name, str):
-                audio_file_name = f_name
-            else:
-                # ここには来ないはず
-                raise CancellableEngineInternalError("不正な値が生成されました")
-        except EOFError:
+            sub_proc_con1.send((query, style_id, enable_interrogative_upspeak))
+            result = recv_result(sub_proc_con1)
+        except (EOFError, OSError):
+            # 接続の切断によりワーカープロセスが終了させられた場合もここに来る
+            self.finalize_con(proc, None)
+            raise_if_cancelled()
             raise CancellableEngineInternalError("既にサブプロセスは終了されています")
-        except Exception:
-            self.finalize_con(request, proc, sub_proc_con1)
+        except BaseException:
+            # 送受信の途中で失敗した場合 (KeyboardInterrupt や out-of-band バッファの復元の失敗など) は、
+            # パイプに読み残しや書きかけのデータが残っている可能性があり、次のリクエストが古い結果を受け取りかねないため、
+            # ワーカープロセスを再利用せずに作り直す
+            sub_proc_con1.close()
+            self.finalize_con(proc, None)
             raise
+        finally:
+            if token is not None:
+                token.remove_callback(cancel)
+            with self._running_jobs_lock:
+                cancelled = self.running_jobs.pop(job_id, None) is None
 
-        self.finalize_con(request, proc, sub_proc_con1)
-        return audio_file_name
-
-    async def catch_disconnection(self) -> None:
-        """
-        接続監視を行うコルーチン
-        """
-        while True:
-            await asyncio.sleep(1)
-            for con in self.watch_con_list:
-                req, proc = con
-                if await req.is_disconnected():
-                    try:
-                        if proc.is_alive():
-                            proc.terminate()
-                            proc.join()
-                        proc.close()
-                    except ValueError:
-                        pass
-                    finally:
-                        self.finalize_con(req, proc, None)
+        # 結果を受け取った直後にキャンセルされた場合、ワーカープロセスは終了させられているため再利用しない
+        self.finalize_con(proc, None if cancelled else sub_proc_con1)
+        match result:
+            case ("ok", wave):
+                return wave
+            case ("http_error", status_code, detail):
+                raise HTTPException(status_code=status_code, detail=detail)
+            case ("error", message):
+                raise CancellableEngineInternalError(message)
+            case _:
+                # ここには来ないはず
+                raise CancellableEngineInternalError("不正な値が生成されました")
 
 
 def start_synthesis_subprocess(
     use_gpu: bool,
-    voicelib_dirs: list[Path] | None,
-    voicevox_dir: Path | None,
-    runtime_dirs: list[Path] | None,
-    cpu_num_threads: int | None,
-    enable_mock: bool,
+    installed_aivm_dir: Path,
+    max_loaded_models: int | None,
     sub_proc_con: ConnectionType,
+    enable_optimized_onnx_model_cache: bool = True,
+    onnx_session_config: OnnxSessionConfig = OnnxSessionConfig(),
+    onnx_session_overrides: Mapping[str, OnnxSessionConfig] | None = None,
 ) -> None:
     """
     音声合成を行うサブプロセスで行うための関数
     pickle化の関係でグローバルに書いている
 
-    引数 use_gpu, voicelib_dirs, voicevox_dir,
-    runtime_dirs, cpu_num_threads, enable_mock は、 core_initializer を参照
-
     Parameters
     ----------
+    use_gpu: bool
+        GPU を使って推論するかどうか
+    installed_aivm_dir: Path
+        AIVMX ファイルのインストール先ディレクトリ
+    max_loaded_models: int | None
+        同時にメモリ上に保持する音声合成モデルの最大数
     sub_proc_con: ConnectionType
         メインプロセスと通信するためのPipe
+    enable_optimized_onnx_model_cache: bool
+        最適化済みの ONNX モデルのディスクキャッシュを使うかどうか
+    onnx_session_config: OnnxSessionConfig
+        BERT モデル・音声合成モデルの ONNX Runtime のセッションに反映する設定
+    onnx_session_overrides: Mapping[str, OnnxSessionConfig] | None
+        モデルごとのセッションの上書き設定
     """
 
-    core_manager = initialize_cores(
+    # Style-Bert-VITS2 や ONNX Runtime の読み込みは重いため、サブプロセス内でのみ import する
+    from .aivm_manager import AivmManager
+    from .tts_pipeline.style_bert_vits2_tts_engine import StyleBertVITS2TTSEngine
+
+    # BERT モデルはエンジンの初期化時に読み込まれるため、以降の音声合成ではすぐに推論を始められる
+    aivm_manager = AivmManager(installed_aivm_dir)
+    engine = StyleBertVITS2TTSEngine(
+        aivm_manager,
         use_gpu=use_gpu,
-        voicelib_dirs=voicelib_dirs,
-        voicevox_dir=voicevox_dir,
-        runtime_dirs=runtime_dirs,
-        cpu_num_threads=cpu_num_threads,
-        enable_mock=enable_mock,
+        max_loaded_models=max_loaded_models,
+        # サブプロセスは 1 件ずつ音声合成するため、推論の同時実行数の制御は不要
+        max_concurrent_inferences=1,
+        max_inference_queue_size=None,
+        enable_optimized_onnx_model_cache=enable_optimized_onnx_model_cache,
+        onnx_session_config=onnx_session_config,
+        onnx_session_overrides=onnx_session_overrides,
     )
-    tts_engines = make_tts_engines_from_cores(core_manager)
 
-    assert len(tts_engines.versions()) != 0, "音声合成エンジンがありません。"
     while True:
         try:
-            query, style_id, version = sub_proc_con.recv()
+            query, style_id, enable_interrogative_upspeak = sub_proc_con.recv()
             try:
-                _engine = tts_engines.get_engine(version)
-            except Exception:
-                # バージョンが見つからないエラー
-                sub_proc_con.send("")
+                try:
+                    wave = engine.synthesize_wave(
+                        query, style_id, enable_interrogative_upspeak
+                    )
+                except HTTPException as e:
+                    if e.status_code != 404:
+                        raise
+                    # サブプロセスの起動後にインストールされた音声合成モデルのスタイル ID が指定された可能性があるため、
+                    # インストール済みモデルの一覧を読み込み直してから再試行する
+                    aivm_manager.get_installed_aivm_infos(force=True)
+                    wave = engine.synthesize_wave(
+                        query, style_id, enable_interrogative_upspeak
+                    )
+            except HTTPException as e:
+                send_result(sub_proc_con, ("http_error", e.status_code, e.detail))
+                continue
+            except Exception as e:
+                send_result(sub_proc_con, ("error", str(e)))
                 continue
-            # FIXME: enable_interrogative_upspeakフラグをWebAPIから受け渡してくる
-            wave = _engine.synthesize_wave(
-                query, style_id, enable_interrogative_upspeak=False
-            )
-            with NamedTemporaryFile(delete=False) as f:
-                soundfile.write(
-                    file=f, data=wave, samplerate=query.outputSamplingRate, format="WAV"
-                )
-            sub_proc_con.send(f.name)
+            send_result(sub_proc_con, ("ok", wave))
         except Exception:
             sub_proc_con.close()
             raise
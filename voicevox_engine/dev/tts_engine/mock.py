@@ -1,6 +1,5 @@
 """TTSEngine のモック"""
 
-import copy
 from typing import Final
 
 import numpy as np
@@ -30,9 +29,6 @@ class MockTTSEngine(TTSEngine):
         enable_interrogative_upspeak: bool = True,
     ) -> NDArray[np.float32]:
         """音声合成用のクエリに含まれる読み仮名に基づいてOpenJTalkで音声波形を生成する。モーラごとの調整は反映されない。"""
-        # モーフィング時などに同一参照のqueryで複数回呼ばれる可能性があるので、元の引数のqueryに破壊的変更を行わない
-        query = copy.deepcopy(query)
-
         # recall text in katakana
         flatten_moras = to_flatten_moras(query.accent_phrases)
         kana_text = "".join([mora.text for mora in flatten_moras])
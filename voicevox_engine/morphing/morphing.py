@@ -3,7 +3,6 @@ WORLDを使ってモーフィングするためのモジュール。
 pyworldの入出力はnp.doubleやnp.float64なので注意。
 """
 
-from copy import deepcopy
 from dataclasses import dataclass
 from itertools import chain
 
@@ -104,13 +103,15 @@ def synthesis_morphing_parameter(
     base_style_id: StyleId,
     target_style_id: StyleId,
 ) -> _MorphingParameter:
-    query = deepcopy(query)
-
+    # 元の引数のqueryに破壊的変更を行わないよう、書き換える設定だけを差し替えた浅いコピーを作る
     # 不具合回避のためデフォルトのサンプリングレートでWORLDに掛けた後に指定のサンプリングレートに変換する
-    query.outputSamplingRate = engine.default_sampling_rate
-
     # WORLDに掛けるため合成はモノラルで行う
-    query.outputStereo = False
+    query = query.model_copy(
+        update={
+            "outputSamplingRate": engine.default_sampling_rate,
+            "outputStereo": False,
+        }
+    )
 
     base_wave = engine.synthesize_wave(query, base_style_id).astype(np.double)
     target_wave = engine.synthesize_wave(query, target_style_id).astype(np.double)
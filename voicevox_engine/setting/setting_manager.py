@@ -1,6 +1,6 @@
 """エンジン設定関連の処理"""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 from typing import Any
@@ -8,6 +8,7 @@ from typing import Any
 import yaml
 from pydantic import TypeAdapter
 
+from ..tts_pipeline.onnx_session_config import OnnxSessionConfig
 from ..utility.path_utility import get_save_dir
 from .model import CorsPolicyMode
 
@@ -18,6 +19,10 @@ class Setting:
 
     cors_policy_mode: CorsPolicyMode  # リソース共有ポリシー
     allow_origin: str | None = None  # 許可するオリジン
+    # 全ての ONNX Runtime のセッションに反映する設定 (コマンドライン引数での指定が優先される)
+    onnx_session: OnnxSessionConfig = field(default_factory=OnnxSessionConfig)
+    # モデルごとに上書きする ONNX Runtime のセッションの設定 (キーは AIVM の UUID 、BERT モデルは "bert")
+    onnx_session_overrides: dict[str, OnnxSessionConfig] = field(default_factory=dict)
 
 
 _setting_adapter = TypeAdapter(Setting)
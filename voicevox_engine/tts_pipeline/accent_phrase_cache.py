@@ -0,0 +1,181 @@
+"""テキストの言語解析結果のキャッシュ"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from voicevox_engine.tts_pipeline.model import AccentPhrase, Mora
+from voicevox_engine.utility.lru_cache import CacheStatistics, LRUCache
+
+__all__ = ["AccentPhraseCache"]
+
+
+@dataclass(frozen=True)
+class _FrozenMora:
+    """キャッシュ内で共有される、書き換えられない Mora"""
+
+    text: str
+    consonant: str | None
+    consonant_length: float | None
+    vowel: str
+    vowel_length: float
+    pitch: float
+
+    @classmethod
+    def from_mora(cls, mora: Mora) -> "_FrozenMora":
+        return cls(
+            text=mora.text,
+            consonant=mora.consonant,
+            consonant_length=mora.consonant_length,
+            vowel=mora.vowel,
+            vowel_length=mora.vowel_length,
+            pitch=mora.pitch,
+        )
+
+    def to_mora(self) -> Mora:
+        # キャッシュに入れる前に検証済みのため、検証を省略して高速に生成する
+        return Mora.model_construct(
+            text=self.text,
+            consonant=self.consonant,
+            consonant_length=self.consonant_length,
+            vowel=self.vowel,
+            vowel_length=self.vowel_length,
+            pitch=self.pitch,
+        )
+
+
+@dataclass(frozen=True)
+class _FrozenAccentPhrase:
+    """キャッシュ内で共有される、書き換えられない AccentPhrase"""
+
+    moras: tuple[_FrozenMora, ...]
+    accent: int
+    pause_mora: _FrozenMora | None
+    is_interrogative: bool
+
+    @classmethod
+    def from_accent_phrase(cls, accent_phrase: AccentPhrase) -> "_FrozenAccentPhrase":
+        return cls(
+            moras=tuple(_FrozenMora.from_mora(mora) for mora in accent_phrase.moras),
+            accent=accent_phrase.accent,
+            pause_mora=(
+                _FrozenMora.from_mora(accent_phrase.pause_mora)
+                if accent_phrase.pause_mora is not None
+                else None
+            ),
+            is_interrogative=accent_phrase.is_interrogative,
+        )
+
+    def to_accent_phrase(self) -> AccentPhrase:
+        return AccentPhrase.model_construct(
+            moras=[mora.to_mora() for mora in self.moras],
+            accent=self.accent,
+            pause_mora=(
+                self.pause_mora.to_mora() if self.pause_mora is not None else None
+            ),
+            is_interrogative=self.is_interrogative,
+        )
+
+
+class AccentPhraseCache:
+    """
+    正規化済みテキストとユーザー辞書の世代番号をキーとした、テキストの言語解析結果 (g2p の結果) の LRU キャッシュ
+    チャットのような用途では同じフレーズが繰り返し解析されるため、pyopenjtalk での解析とその後のアクセント句の組み立てを丸ごと省略できる
+    キーにユーザー辞書の世代番号を含めるため、ユーザー辞書が更新されると以前の解析結果は参照されなくなり、LRU で順次破棄される
+    キャッシュ内では書き換えられない構造で保持し、取得のたびに新しいオブジェクトを組み立てて返すため、呼び出し元で書き換えても安全
+    """
+
+    def __init__(
+        self, max_entries: int, get_dict_generation: Callable[[], int]
+    ) -> None:
+        """
+        Parameters
+        ----------
+        max_entries : int
+            アクセント句系列・カタカナモーラと音高のリストそれぞれについて、保持する解析結果の数の上限
+        get_dict_generation : Callable[[], int]
+            テキスト解析に適用中のユーザー辞書の世代番号を返す関数
+        """
+
+        self._get_dict_generation = get_dict_generation
+        # キー: (正規化済みテキスト, ユーザー辞書の世代番号)
+        self._accent_phrases: LRUCache[tuple[str, int], tuple[_FrozenAccentPhrase, ...]] = LRUCache(max_entries=max_entries)  # fmt: skip
+        self._kata_tone_lists: LRUCache[tuple[str, int], tuple[tuple[str, int], ...]] = LRUCache(max_entries=max_entries)  # fmt: skip
+
+    def _make_key(self, normalized_text: str) -> tuple[str, int]:
+        # 解析より先に世代番号を取得する
+        # 解析中にユーザー辞書が差し替えられても、新しい辞書での解析結果が古い世代番号で登録されるだけで、誤った結果は返らない
+        return normalized_text, self._get_dict_generation()
+
+    def get_accent_phrases(
+        self, normalized_text: str, analyze: Callable[[str], list[AccentPhrase]]
+    ) -> list[AccentPhrase]:
+        """
+        正規化済みテキストのアクセント句系列を、キャッシュになければ解析して返す
+
+        Parameters
+        ----------
+        normalized_text : str
+            正規化済みテキスト
+        analyze : Callable[[str], list[AccentPhrase]]
+            正規化済みテキストからアクセント句系列を生成する関数
+
+        Returns
+        -------
+        list[AccentPhrase]
+            アクセント句系列 (呼び出しごとに新しく生成されたオブジェクト)
+        """
+
+        key = self._make_key(normalized_text)
+        frozen_accent_phrases = self._accent_phrases.get(key)
+        if frozen_accent_phrases is None:
+            frozen_accent_phrases = tuple(
+                _FrozenAccentPhrase.from_accent_phrase(accent_phrase)
+                for accent_phrase in analyze(normalized_text)
+            )
+            self._accent_phrases.put(key, frozen_accent_phrases)
+        return [
+            frozen_accent_phrase.to_accent_phrase()
+            for frozen_accent_phrase in frozen_accent_phrases
+        ]
+
+    def get_kata_tone_list(
+        self, normalized_text: str, analyze: Callable[[str], list[tuple[str, int]]]
+    ) -> list[tuple[str, int]]:
+        """
+        正規化済みテキストのカタカナモーラと音高のリストを、キャッシュになければ解析して返す
+
+        Parameters
+        ----------
+        normalized_text : str
+            正規化済みテキスト
+        analyze : Callable[[str], list[tuple[str, int]]]
+            正規化済みテキストからカタカナモーラと音高のリストを生成する関数
+
+        Returns
+        -------
+        list[tuple[str, int]]
+            カタカナモーラと音高 (0 or 1) のリスト
+        """
+
+        key = self._make_key(normalized_text)
+        kata_tone_list = self._kata_tone_lists.get(key)
+        if kata_tone_list is None:
+            kata_tone_list = tuple(
+                (kata, tone) for kata, tone in analyze(normalized_text)
+            )
+            self._kata_tone_lists.put(key, kata_tone_list)
+        return list(kata_tone_list)
+
+    def statistics(self) -> CacheStatistics:
+        """キャッシュの統計情報 (アクセント句系列とカタカナモーラと音高のリストの合計) を返す"""
+
+        accent_phrases = self._accent_phrases.statistics()
+        kata_tone_lists = self._kata_tone_lists.statistics()
+        return CacheStatistics(
+            hits=accent_phrases.hits + kata_tone_lists.hits,
+            misses=accent_phrases.misses + kata_tone_lists.misses,
+            evictions=accent_phrases.evictions + kata_tone_lists.evictions,
+            expirations=accent_phrases.expirations + kata_tone_lists.expirations,
+            entries=accent_phrases.entries + kata_tone_lists.entries,
+            total_bytes=accent_phrases.total_bytes + kata_tone_lists.total_bytes,
+        )
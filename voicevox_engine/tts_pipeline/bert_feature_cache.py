@@ -0,0 +1,118 @@
+"""Style-Bert-VITS2 の BERT 特徴量のキャッシュ"""
+
+import functools
+import importlib
+import inspect
+from collections.abc import Callable, Hashable
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from voicevox_engine.logging import logger
+from voicevox_engine.utility.lru_cache import CacheStatistics, LRUCache
+
+__all__ = ["BertFeatureCache"]
+
+
+class BertFeatureCache:
+    """
+    Style-Bert-VITS2 の BERT 特徴量のキャッシュ
+    BERT 特徴量は正規化後のテキストと音素の割り当て (word2ph) だけで決まり、話速や音量などのパラメータには依存しないため、
+    パラメータだけを変えて同じ文を音声合成し直す際には BERT の推論を丸ごと省略できる
+    """
+
+    # Style-Bert-VITS2 の ONNX 推論で BERT 特徴量を抽出する関数が定義・参照されているモジュールと関数名
+    # 推論処理 (get_text_onnx()) はモジュールに import された関数名を参照するため、参照元のモジュール側を差し替える
+    TARGET_MODULE_NAME = "style_bert_vits2.models.infer_onnx"
+    TARGET_FUNCTION_NAME = "extract_bert_feature_onnx"
+
+    def __init__(self, max_bytes: int) -> None:
+        """
+        Parameters
+        ----------
+        max_bytes : int
+            キャッシュする BERT 特徴量の合計バイト数の上限
+        """
+
+        self._cache: LRUCache[Hashable, NDArray[Any]] = LRUCache(
+            max_bytes=max_bytes,
+            get_size=lambda feature: feature.nbytes,
+        )
+
+    def wrap(
+        self, extract_bert_feature: Callable[..., NDArray[Any]]
+    ) -> Callable[..., NDArray[Any]]:
+        """
+        BERT 特徴量を抽出する関数を、キャッシュを参照するよう包んだ関数を返す
+
+        Parameters
+        ----------
+        extract_bert_feature : Callable[..., NDArray[Any]]
+            Style-Bert-VITS2 の BERT 特徴量を抽出する関数
+
+        Returns
+        -------
+        Callable[..., NDArray[Any]]
+            キャッシュを参照する BERT 特徴量の抽出関数
+        """
+
+        @functools.wraps(extract_bert_feature)
+        def cached_extract_bert_feature(
+            text: str, word2ph: list[int], *args: Any, **kwargs: Any
+        ) -> NDArray[Any]:
+            # 引数のうちテキストと word2ph 以外 (言語・補助テキストなど) もすべてキーに含める
+            key = (
+                text,
+                tuple(word2ph),
+                tuple(str(arg) for arg in args),
+                tuple(sorted((k, str(v)) for k, v in kwargs.items())),
+            )
+            feature = self._cache.get(key)
+            if feature is None:
+                feature = np.asarray(extract_bert_feature(text, word2ph, *args, **kwargs))  # fmt: skip
+                self._cache.put(key, feature)
+            # 呼び出し元で書き換えられてもキャッシュが壊れないよう、コピーを返す
+            return feature.copy()
+
+        # 別のインスタンスで差し替え済みの関数を再度差し替える際に、元の関数を取り出せるようにしておく
+        setattr(cached_extract_bert_feature, "_with_bert_feature_cache", True)
+        return cached_extract_bert_feature
+
+    def install(self) -> bool:
+        """
+        Style-Bert-VITS2 の ONNX 推論で BERT 特徴量を抽出する関数を、キャッシュを参照する関数に差し替える
+
+        Returns
+        -------
+        bool
+            差し替えられたかどうか (Style-Bert-VITS2 の内部構造が想定と異なる場合は False)
+        """
+
+        try:
+            module = importlib.import_module(self.TARGET_MODULE_NAME)
+        except ImportError:
+            module = None
+        extract_bert_feature = getattr(module, self.TARGET_FUNCTION_NAME, None)
+        if module is None or extract_bert_feature is None:
+            logger.warning(
+                "BERT feature cache is disabled because the Style-Bert-VITS2 internals are not as expected."
+            )
+            return False
+
+        # 既に差し替え済みの場合は、キャッシュが二重にならないよう元の関数を包み直す
+        # キャンセルポイント (install_cancellation_points()) も外れるため、差し替えた後で改めて差し込む必要がある
+        extract_bert_feature = inspect.unwrap(
+            extract_bert_feature,
+            stop=lambda func: not (
+                getattr(func, "_with_bert_feature_cache", False) is True
+                or getattr(func, "_with_cancellation_points", False) is True
+            ),
+        )
+        setattr(module, self.TARGET_FUNCTION_NAME, self.wrap(extract_bert_feature))
+        return True
+
+    def statistics(self) -> CacheStatistics:
+        """キャッシュの統計情報を返す"""
+
+        return self._cache.statistics()
@@ -0,0 +1,250 @@
+"""音声合成のキャンセル"""
+
+import asyncio
+import functools
+import importlib
+import threading
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextvars import ContextVar
+from typing import TypeVar
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+
+__all__ = [
+    "SynthesisCancelledError",
+    "CancellationToken",
+    "current_cancellation_token",
+    "raise_if_cancelled",
+    "with_cancellation_points",
+    "install_cancellation_points",
+    "run_cancellable_in_threadpool",
+    "iterate_cancellable_in_threadpool",
+]
+
+T = TypeVar("T")
+
+
+class SynthesisCancelledError(Exception):
+    """クライアントとの接続が切断されたなどの理由で、音声合成がキャンセルされた"""
+
+    pass
+
+
+class CancellationToken:
+    """
+    1 件のリクエストに対応するキャンセル要求を伝えるトークン
+    キャンセルされると登録済みのコールバックを呼び出すため、ポーリングせずにキャンセルを検知できる
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks: list[Callable[[], None]] = []
+
+    @property
+    def is_cancelled(self) -> bool:
+        """キャンセルされたかどうか"""
+        return self._cancelled
+
+    def cancel(self) -> None:
+        """キャンセルし、登録済みのコールバックを呼び出す (2 回目以降の呼び出しは何もしない)"""
+        with self._lock:
+            if self._cancelled is True:
+                return
+            self._cancelled = True
+            callbacks = self._callbacks
+            self._callbacks = []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """
+        キャンセルされたときに呼び出されるコールバックを登録する
+        既にキャンセルされている場合は、その場で呼び出す
+        """
+        with self._lock:
+            if self._cancelled is False:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        """登録したコールバックを解除する"""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self) -> None:
+        """キャンセルされていれば SynthesisCancelledError を送出する"""
+        if self._cancelled is True:
+            raise SynthesisCancelledError("Synthesis was cancelled.")
+
+
+# 実行中の音声合成に対応するキャンセル要求のトークン
+# 音声合成処理の各段階の間で参照し、キャンセルされていればその時点で処理を打ち切る
+current_cancellation_token: ContextVar[CancellationToken | None] = ContextVar(
+    "current_cancellation_token", default=None
+)
+
+
+def raise_if_cancelled() -> None:
+    """
+    実行中の音声合成がキャンセルされていれば SynthesisCancelledError を送出する
+    音声合成処理の段階の間に置く協調的なキャンセルポイントで、トークンが設定されていなければ何もしない
+    """
+    token = current_cancellation_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def with_cancellation_points(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    関数の呼び出しの前後をキャンセルポイントにした関数を返す
+
+    Parameters
+    ----------
+    func : Callable[..., T]
+        キャンセルポイントで挟む関数
+
+    Returns
+    -------
+    Callable[..., T]
+        呼び出しの前後で raise_if_cancelled() を呼ぶ関数
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: object, **kwargs: object) -> T:
+        raise_if_cancelled()
+        result = func(*args, **kwargs)
+        raise_if_cancelled()
+        return result
+
+    setattr(wrapper, "_with_cancellation_points", True)
+    return wrapper
+
+
+def install_cancellation_points(module_name: str, function_name: str) -> bool:
+    """
+    外部ライブラリのモジュールの関数を、呼び出しの前後をキャンセルポイントにした関数に差し替える
+    外部ライブラリの推論処理の途中に、キャンセルを検知できる箇所を差し込むために用いる
+
+    Parameters
+    ----------
+    module_name : str
+        差し替える関数を参照しているモジュールの名前
+    function_name : str
+        差し替える関数の名前
+
+    Returns
+    -------
+    bool
+        差し替えられたかどうか (モジュールや関数が存在しない場合は False)
+    """
+
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        return False
+    func = getattr(module, function_name, None)
+    if func is None:
+        return False
+
+    # 既に差し替え済みの場合は、キャンセルポイントが二重にならないよう包まれている関数を包み直す
+    if getattr(func, "_with_cancellation_points", False) is True:
+        func = func.__wrapped__
+    setattr(module, function_name, with_cancellation_points(func))
+    return True
+
+
+async def _cancel_on_disconnect(request: Request, token: CancellationToken) -> None:
+    """ASGI の http.disconnect イベントを受け取るまで待ち、受け取ったらトークンをキャンセルする"""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            token.cancel()
+            return
+
+
+async def run_cancellable_in_threadpool(
+    request: Request,
+    func: Callable[[], T],
+    token: CancellationToken | None = None,
+) -> T:
+    """
+    同期関数をスレッドプールで実行し、実行中にクライアントとの接続が切断されたらキャンセルを要求する
+    実行中の関数からは current_cancellation_token でキャンセル要求のトークンを参照できる
+
+    Parameters
+    ----------
+    request : Request
+        接続の切断を監視するリクエスト (リクエストボディは読み込み済みである必要がある)
+    func : Callable[[], T]
+        実行する関数
+    token : CancellationToken | None
+        キャンセル要求のトークン (None なら新たに作成する)
+        ストリーミングレスポンスのように、続きの処理と同じトークンを共有する場合に指定する
+
+    Returns
+    -------
+    T
+        関数の戻り値
+
+    Raises
+    ------
+    SynthesisCancelledError
+        関数が実行中にキャンセルされた場合
+    """
+
+    cancellation_token = token if token is not None else CancellationToken()
+    watcher = asyncio.create_task(_cancel_on_disconnect(request, cancellation_token))
+
+    def run() -> T:
+        # スレッドプールのスレッドにはコンテキストが引き継がれない場合があるため、スレッド内で明示的に設定する
+        current_cancellation_token.set(cancellation_token)
+        return func()
+
+    try:
+        return await run_in_threadpool(run)
+    finally:
+        watcher.cancel()
+
+
+async def iterate_cancellable_in_threadpool(
+    iterator: Iterator[T], token: CancellationToken
+) -> AsyncIterator[T]:
+    """
+    同期イテレーターをスレッドプールで 1 要素ずつ進め、非同期イテレーターとして返す
+    要素の生成中は current_cancellation_token でキャンセル要求のトークンを参照できる
+    ストリーミングレスポンスの途中でクライアントとの接続が切断されると、Starlette がこの非同期イテレーターを打ち切るため、
+    その時点でトークンをキャンセルし、生成中の要素 (推論中の文) もキャンセルポイントで打ち切る
+
+    Parameters
+    ----------
+    iterator : Iterator[T]
+        要素を生成する同期イテレーター
+    token : CancellationToken
+        キャンセル要求のトークン
+
+    Yields
+    ------
+    T
+        同期イテレーターが生成した要素
+    """
+
+    sentinel = object()
+
+    def next_item() -> object:
+        current_cancellation_token.set(token)
+        token.raise_if_cancelled()
+        return next(iterator, sentinel)
+
+    try:
+        while True:
+            item = await run_in_threadpool(next_item)
+            if item is sentinel:
+                return
+            yield item  # type: ignore[misc]
+    finally:
+        # 最後まで生成し終えた場合もキャンセルするが、その時点で参照している処理はないため影響しない
+        token.cancel()
@@ -0,0 +1,187 @@
+"""音声合成モデルの推論の同時実行数を制御するスケジューラ"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+
+from voicevox_engine.logging import logger
+from voicevox_engine.tts_pipeline.cancellation import current_cancellation_token
+
+__all__ = [
+    "InferencePriority",
+    "InferenceQueueFullError",
+    "InferenceScheduler",
+    "InferenceSchedulerStatistics",
+]
+
+
+class InferencePriority(IntEnum):
+    """推論の優先度 (値が小さいほど優先される)"""
+
+    # 1 件ずつの音声合成など、ユーザーが結果を待っているリクエスト
+    INTERACTIVE = 0
+    # 複数件をまとめて音声合成するなど、多少待たされても問題ないリクエスト
+    BATCH = 1
+
+
+class InferenceQueueFullError(Exception):
+    """推論の待ち行列が上限に達しており、新たな推論を受け付けられない"""
+
+    pass
+
+
+@dataclass(frozen=True)
+class InferenceSchedulerStatistics:
+    """推論スケジューラの統計情報"""
+
+    max_concurrency: int
+    max_queue_size: int | None
+    running: int
+    queued: int
+    completed: int
+    rejected: int
+    cancelled: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+
+class InferenceScheduler:
+    """
+    推論の同時実行数を制限し、上限を超えた推論を優先度順の待ち行列で待たせるスケジューラ
+    ONNX Runtime は 1 回の推論の中でスレッド並列に CPU コアを使い切るため、同時に多数の推論を走らせても
+    CPU コアを奪い合うだけで、レイテンシが予測できなくなる
+    推論は呼び出し元のスレッドでそのまま実行し、スケジューラは実行の順番と同時実行数だけを制御する
+    """
+
+    def __init__(self, max_concurrency: int, max_queue_size: int | None) -> None:
+        """
+        Parameters
+        ----------
+        max_concurrency : int
+            同時に実行できる推論の数
+        max_queue_size : int | None
+            実行を待てる推論の数の上限 (None なら無制限)
+        """
+
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+
+        self._max_concurrency = max_concurrency
+        self._max_queue_size = max_queue_size
+
+        self._condition = threading.Condition()
+        # 実行待ちの推論の待ち行列 (優先度, 到着順) のヒープ
+        self._waiting: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._cancelled = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    @contextmanager
+    def acquire(
+        self,
+        priority: InferencePriority = InferencePriority.INTERACTIVE,
+        enforce_queue_limit: bool = True,
+    ) -> Iterator[None]:
+        """
+        推論の実行枠を確保し、with ブロックを抜けるまで保持する
+        実行枠が空いていない場合は、優先度が高く先に到着した推論から順に実行枠が割り当てられるまで待つ
+
+        Parameters
+        ----------
+        priority : InferencePriority
+            推論の優先度
+        enforce_queue_limit : bool
+            待ち行列の上限を適用するかどうか
+            ストリーミング合成の 2 文目以降など、既に受け付けたリクエストの続きの推論では False を指定する
+
+        Raises
+        ------
+        InferenceQueueFullError
+            待ち行列が上限に達している場合
+        SynthesisCancelledError
+            実行枠が割り当てられるのを待っている間に音声合成がキャンセルされた場合
+        """
+
+        token = current_cancellation_token.get()
+
+        def wake_up() -> None:
+            # キャンセルされたら待機中のスレッドを起こし、待ち行列から抜けさせる
+            with self._condition:
+                self._condition.notify_all()
+
+        start_time = time.perf_counter()
+        with self._condition:
+            if token is not None:
+                token.raise_if_cancelled()
+            ticket = (int(priority), next(self._sequence))
+            if self._running >= self._max_concurrency or len(self._waiting) > 0:
+                if (
+                    enforce_queue_limit is True
+                    and self._max_queue_size is not None
+                    and len(self._waiting) >= self._max_queue_size
+                ):
+                    self._rejected += 1
+                    raise InferenceQueueFullError(
+                        f"Inference queue is full. ({len(self._waiting)} requests waiting)"
+                    )
+                heapq.heappush(self._waiting, ticket)
+                if token is not None:
+                    token.add_callback(wake_up)
+                try:
+                    while (
+                        self._running >= self._max_concurrency
+                        or self._waiting[0] != ticket
+                    ):
+                        if token is not None and token.is_cancelled:
+                            # 待ち行列から取り除き、後続の推論が先頭に繰り上がれるよう待機中のスレッドを起こす
+                            self._waiting.remove(ticket)
+                            heapq.heapify(self._waiting)
+                            self._cancelled += 1
+                            self._condition.notify_all()
+                            token.raise_if_cancelled()
+                        self._condition.wait()
+                finally:
+                    if token is not None:
+                        token.remove_callback(wake_up)
+                heapq.heappop(self._waiting)
+            self._running += 1
+            wait_seconds = time.perf_counter() - start_time
+            self._total_wait_seconds += wait_seconds
+            self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+            # 後続の待ち行列の先頭も実行枠が空いていれば動けるよう、待機中のスレッドを起こす
+            self._condition.notify_all()
+
+        if wait_seconds >= 0.01:
+            logger.info(f"Waited {wait_seconds:.2f} sec in the inference queue.")
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._running -= 1
+                self._completed += 1
+                self._condition.notify_all()
+
+    def statistics(self) -> InferenceSchedulerStatistics:
+        """推論スケジューラの統計情報を返す"""
+
+        with self._condition:
+            return InferenceSchedulerStatistics(
+                max_concurrency=self._max_concurrency,
+                max_queue_size=self._max_queue_size,
+                running=self._running,
+                queued=len(self._waiting),
+                completed=self._completed,
+                rejected=self._rejected,
+                cancelled=self._cancelled,
+                total_wait_seconds=self._total_wait_seconds,
+                max_wait_seconds=self._max_wait_seconds,
+            )
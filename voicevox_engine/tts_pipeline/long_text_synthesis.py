@@ -0,0 +1,152 @@
+"""長いテキストを分割して音声合成する際の、分割単位のまとめ上げと音声波形の連結"""
+
+from collections.abc import Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+__all__ = [
+    "group_segments_into_chunks",
+    "trim_silence",
+    "concatenate_with_crossfade",
+]
+
+
+def group_segments_into_chunks(
+    segment_lengths: Sequence[int], max_chunk_length: int
+) -> list[tuple[int, int]]:
+    """
+    文や句などの分割単位の長さのリストを、先頭から順に合計の長さが上限を超えない範囲でまとめる
+    1 つで上限を超える分割単位は、それだけで 1 つのまとまりになる
+
+    Parameters
+    ----------
+    segment_lengths : Sequence[int]
+        分割単位ごとの長さ (モーラ数)
+    max_chunk_length : int
+        1 つのまとまりの長さの上限
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        まとまりごとの、分割単位のインデックスの (開始位置, 終了位置) のリスト
+    """
+
+    chunks: list[tuple[int, int]] = []
+    start = 0
+    chunk_length = 0
+    for index, segment_length in enumerate(segment_lengths):
+        if index > start and chunk_length + segment_length > max_chunk_length:
+            chunks.append((start, index))
+            start = index
+            chunk_length = 0
+        chunk_length += segment_length
+    if start < len(segment_lengths):
+        chunks.append((start, len(segment_lengths)))
+    return chunks
+
+
+def trim_silence(
+    wave: NDArray[np.float32],
+    sample_rate: int,
+    trim_head: bool = True,
+    trim_tail: bool = True,
+    threshold: float = 1e-3,
+    margin_seconds: float = 0.03,
+) -> NDArray[np.float32]:
+    """
+    音声波形の前後の無音区間を、発話の立ち上がり・減衰が途切れないよう少しだけ残して切り詰める
+    全体が無音の場合はそのまま返す
+
+    Parameters
+    ----------
+    wave : NDArray[np.float32]
+        -1.0 ~ 1.0 の範囲に正規化された音声波形
+    sample_rate : int
+        サンプリングレート
+    trim_head : bool, optional
+        前の無音区間を切り詰めるかどうか
+    trim_tail : bool, optional
+        後ろの無音区間を切り詰めるかどうか
+    threshold : float, optional
+        無音とみなす振幅の上限
+    margin_seconds : float, optional
+        発話の前後に残す無音区間の秒数
+
+    Returns
+    -------
+    NDArray[np.float32]
+        無音区間を切り詰めた音声波形
+    """
+
+    voiced_indices = np.flatnonzero(np.abs(wave) > threshold)
+    if len(voiced_indices) == 0:
+        return wave
+
+    margin = int(sample_rate * margin_seconds)
+    start = max(0, int(voiced_indices[0]) - margin) if trim_head else 0
+    end = min(len(wave), int(voiced_indices[-1]) + 1 + margin) if trim_tail else len(wave)  # fmt: skip
+    return wave[start:end]
+
+
+def concatenate_with_crossfade(
+    waves: Sequence[NDArray[np.float32]],
+    sample_rate: int,
+    gap_seconds: Sequence[float],
+    crossfade_seconds: float = 0.01,
+) -> NDArray[np.float32]:
+    """
+    音声波形の間に無音区間を挟み、継ぎ目を短いクロスフェードで重ね合わせながら連結する
+    無音区間がクロスフェードより長い場合、前の音声波形は無音区間に向かってフェードアウトする
+
+    Parameters
+    ----------
+    waves : Sequence[NDArray[np.float32]]
+        連結する音声波形のリスト
+    sample_rate : int
+        サンプリングレート
+    gap_seconds : Sequence[float]
+        音声波形の間に挟む無音区間の秒数 (len(waves) - 1 個)
+    crossfade_seconds : float, optional
+        継ぎ目で重ね合わせる秒数
+
+    Returns
+    -------
+    NDArray[np.float32]
+        連結した音声波形
+    """
+
+    assert len(gap_seconds) == max(0, len(waves) - 1)
+    if len(waves) == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    # 連結後の長さを先に求めて一度だけ確保し、長いテキストでも連結のたびに配列をコピーしないようにする
+    segments = [waves[0]] + [
+        np.concatenate(
+            (np.zeros(int(sample_rate * gap), dtype=np.float32), wave)
+        )
+        for wave, gap in zip(waves[1:], gap_seconds)
+    ]  # fmt: skip
+    crossfade_length = int(sample_rate * crossfade_seconds)
+    overlaps = [
+        min(crossfade_length, len(previous), len(current))
+        for previous, current in zip(segments[:-1], segments[1:])
+    ]
+    result = np.zeros(
+        sum(len(segment) for segment in segments) - sum(overlaps), dtype=np.float32
+    )
+
+    position = 0
+    for index, segment in enumerate(segments):
+        segment = segment.astype(np.float32, copy=True)
+        overlap_head = overlaps[index - 1] if index > 0 else 0
+        overlap_tail = overlaps[index] if index < len(overlaps) else 0
+        # 継ぎ目では、前の音声波形をフェードアウト・次の音声波形をフェードインさせて足し合わせる
+        if overlap_head > 0:
+            segment[:overlap_head] *= np.linspace(0.0, 1.0, overlap_head, dtype=np.float32)  # fmt: skip
+        if overlap_tail > 0:
+            segment[len(segment) - overlap_tail :] *= np.linspace(1.0, 0.0, overlap_tail, dtype=np.float32)  # fmt: skip
+        start = position - overlap_head
+        result[start : start + len(segment)] += segment
+        position = start + len(segment)
+    return result
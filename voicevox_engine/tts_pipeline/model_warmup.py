@@ -0,0 +1,195 @@
+"""音声合成モデルの事前ロードとウォームアップ"""
+
+import queue
+import threading
+import time
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Literal
+
+from ..logging import logger
+from ..metas.Metas import StyleId
+
+__all__ = ["ModelWarmupState", "ModelWarmupStatus", "ModelWarmer"]
+
+# ウォームアップの状態
+# pending: ウォームアップ待ち, loading: モデルをロード中, warming_up: スタイルごとにダミーの推論を実行中,
+# ready: ウォームアップ完了, failed: ウォームアップに失敗, unloaded: ウォームアップ後にアンロードされた
+ModelWarmupState = Literal[
+    "pending", "loading", "warming_up", "ready", "failed", "unloaded"
+]
+
+
+@dataclass(frozen=True)
+class ModelWarmupStatus:
+    """音声合成モデルのウォームアップの状態"""
+
+    state: ModelWarmupState
+    warmed_up_style_ids: list[StyleId] = field(default_factory=list)
+    elapsed_seconds: float | None = None
+    error: str | None = None
+
+
+class ModelWarmer:
+    """
+    指定された音声合成モデルを事前にロードし、スタイルごとにダミーの推論を 1 回実行してウォームアップする
+    モデルのロードに加え、ONNX Runtime のグラフ最適化やメモリアロケータの初回確保は最初の推論時に行われるため、
+    ウォームアップしておかないと、各モデルの最初の音声合成だけ数秒単位で遅くなる
+    ウォームアップはバックグラウンドのスレッドで 1 モデルずつ行い、その間も API サーバーはリクエストを受け付ける
+    """
+
+    def __init__(
+        self,
+        targets: Mapping[str, Sequence[StyleId] | None],
+        load_model: Callable[[str], object],
+        get_style_ids: Callable[[str], list[StyleId]],
+        warmup_style: Callable[[StyleId], None],
+    ) -> None:
+        """
+        Parameters
+        ----------
+        targets : Mapping[str, Sequence[StyleId] | None]
+            ウォームアップ対象の AIVM の UUID と、ダミーの推論を行うスタイル ID のリスト (None なら全てのスタイル)
+        load_model : Callable[[str], object]
+            AIVM の UUID に対応する音声合成モデルをロードする関数
+        get_style_ids : Callable[[str], list[StyleId]]
+            AIVM の UUID に対応する音声合成モデルの全てのスタイル ID を返す関数
+        warmup_style : Callable[[StyleId], None]
+            スタイル ID に対応するスタイルでダミーの推論を実行する関数
+        """
+
+        self._targets = dict(targets)
+        self._load_model = load_model
+        self._get_style_ids = get_style_ids
+        self._warmup_style = warmup_style
+
+        self._lock = threading.Lock()
+        self._statuses: dict[str, ModelWarmupStatus] = {
+            aivm_uuid: ModelWarmupStatus(state="pending") for aivm_uuid in targets
+        }
+        self._queue: queue.Queue[str] = queue.Queue()
+        self._worker_thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """全てのウォームアップ対象のウォームアップをバックグラウンドで開始する"""
+
+        for aivm_uuid in self._targets:
+            self._queue.put(aivm_uuid)
+        self._ensure_worker_thread()
+
+    def is_target(self, aivm_uuid: str) -> bool:
+        """指定された AIVM の UUID がウォームアップ対象かどうかを返す"""
+        return aivm_uuid in self._targets
+
+    def warmup(self, aivm_uuid: str) -> None:
+        """
+        ウォームアップ対象の音声合成モデルを、バックグラウンドでウォームアップし直す
+        音声合成モデルがインストール・更新されたときに呼ばれる (ウォームアップ対象でなければ何もしない)
+
+        Parameters
+        ----------
+        aivm_uuid : str
+            AIVM の UUID
+        """
+
+        if self.is_target(aivm_uuid) is False:
+            return
+        self._set_status(aivm_uuid, ModelWarmupStatus(state="pending"))
+        self._queue.put(aivm_uuid)
+        self._ensure_worker_thread()
+
+    def mark_unloaded(self, aivm_uuid: str) -> None:
+        """ウォームアップ済みの音声合成モデルがアンロードされたことを記録する"""
+
+        with self._lock:
+            status = self._statuses.get(aivm_uuid)
+            if status is not None and status.state == "ready":
+                self._statuses[aivm_uuid] = ModelWarmupStatus(
+                    state="unloaded", elapsed_seconds=status.elapsed_seconds
+                )
+
+    def statuses(self) -> dict[str, ModelWarmupStatus]:
+        """ウォームアップ対象の AIVM の UUID をキーとした、ウォームアップの状態を返す"""
+        with self._lock:
+            return dict(self._statuses)
+
+    def is_ready(self) -> bool:
+        """
+        全てのウォームアップ対象のウォームアップが完了しているかどうかを返す
+        ウォームアップ後に上限超過でアンロードされたモデルは、次の音声合成時に再ロードされるため完了扱いとする
+        """
+        with self._lock:
+            return all(
+                status.state in ("ready", "unloaded")
+                for status in self._statuses.values()
+            )
+
+    def join(self) -> None:
+        """キューに積まれた全てのウォームアップが終わるまで待つ"""
+        self._queue.join()
+
+    def _set_status(self, aivm_uuid: str, status: ModelWarmupStatus) -> None:
+        with self._lock:
+            self._statuses[aivm_uuid] = status
+
+    def _ensure_worker_thread(self) -> None:
+        with self._lock:
+            if self._worker_thread is not None and self._worker_thread.is_alive():
+                return
+            self._worker_thread = threading.Thread(
+                target=self._worker_loop, name="ModelWarmer", daemon=True
+            )
+            self._worker_thread.start()
+
+    def _worker_loop(self) -> None:
+        while True:
+            aivm_uuid = self._queue.get()
+            try:
+                self._warmup_model(aivm_uuid)
+            finally:
+                self._queue.task_done()
+
+    def _warmup_model(self, aivm_uuid: str) -> None:
+        """1 つの音声合成モデルをロードし、スタイルごとにダミーの推論を実行する"""
+
+        start_time = time.time()
+        try:
+            self._set_status(aivm_uuid, ModelWarmupStatus(state="loading"))
+            self._load_model(aivm_uuid)
+
+            style_ids = self._targets[aivm_uuid]
+            if style_ids is None:
+                style_ids = self._get_style_ids(aivm_uuid)
+            warmed_up_style_ids: list[StyleId] = []
+            for style_id in style_ids:
+                self._set_status(
+                    aivm_uuid,
+                    ModelWarmupStatus(
+                        state="warming_up",
+                        warmed_up_style_ids=list(warmed_up_style_ids),
+                    ),
+                )
+                self._warmup_style(style_id)
+                warmed_up_style_ids.append(style_id)
+        except Exception as e:
+            logger.error(f"Failed to warm up model {aivm_uuid}.", exc_info=e)
+            self._set_status(
+                aivm_uuid,
+                ModelWarmupStatus(
+                    state="failed",
+                    elapsed_seconds=time.time() - start_time,
+                    error=str(e),
+                ),
+            )
+            return
+
+        elapsed_seconds = time.time() - start_time
+        self._set_status(
+            aivm_uuid,
+            ModelWarmupStatus(
+                state="ready",
+                warmed_up_style_ids=warmed_up_style_ids,
+                elapsed_seconds=elapsed_seconds,
+            ),
+        )
+        logger.info(f"Model {aivm_uuid} warmed up. ({elapsed_seconds:.2f}s)")
@@ -0,0 +1,353 @@
+"""ONNX Runtime のセッションの設定 (スレッド数・メモリアリーナ・実行モード・グラフ最適化レベル・量子化)"""
+
+import contextvars
+import hashlib
+import json
+import os
+import sys
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Literal
+
+import onnxruntime
+
+from ..logging import logger
+from .quantized_onnx_model_cache import QuantizedOnnxModelCache
+
+__all__ = [
+    "BERT_MODEL_KEY",
+    "OnnxSessionConfig",
+    "OnnxSessionConfigurator",
+    "install_inference_session_factory",
+]
+
+# セッションの設定を個別に上書きする際に、BERT モデルを指すキー (音声合成モデルは AIVM の UUID で指定する)
+BERT_MODEL_KEY = "bert"
+
+# onnxruntime.InferenceSession のコンストラクタと同じ引数に、差し替える前の InferenceSession クラスを加えて受け取る関数
+InferenceSessionFactory = Callable[..., onnxruntime.InferenceSession]
+
+_EXECUTION_MODES: dict[str, onnxruntime.ExecutionMode] = {
+    "sequential": onnxruntime.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": onnxruntime.ExecutionMode.ORT_PARALLEL,
+}
+_GRAPH_OPTIMIZATION_LEVELS: dict[str, onnxruntime.GraphOptimizationLevel] = {
+    "disable": onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+@dataclass(frozen=True)
+class OnnxSessionConfig:
+    """
+    ONNX Runtime のセッションの設定
+    None の項目は指定なしとして扱い、ONNX Runtime (または呼び出し元のライブラリ) の既定値のままにする
+    """
+
+    # 1 つの演算子の中で並列に計算するスレッド数 (0 なら物理コア数)
+    intra_op_num_threads: int | None = None
+    # 独立した演算子同士を並列に実行するスレッド数 (execution_mode が parallel の場合のみ使われる)
+    inter_op_num_threads: int | None = None
+    # 演算子を 1 つずつ実行するか (sequential) 、独立した演算子同士を並列に実行するか (parallel)
+    execution_mode: Literal["sequential", "parallel"] | None = None
+    # セッションの作成時に行うグラフ最適化のレベル
+    graph_optimization_level: Literal["disable", "basic", "extended", "all"] | None = None  # fmt: skip
+    # CPU のメモリアリーナを使うかどうか (無効化すると推論ごとの確保・解放が増えるが、ピーク時のメモリ使用量を抑えられる)
+    enable_cpu_mem_arena: bool | None = None
+    # 入力の形状ごとにメモリの確保パターンを記録して再利用するかどうか
+    enable_mem_pattern: bool | None = None
+    # intra_op のスレッドを待機中にスピンさせるかどうか (無効化すると CPU 使用率が下がり、多数のセッションでコアを奪い合いにくくなる)
+    intra_op_allow_spinning: bool | None = None
+    # intra_op のスレッドごとに割り当てる論理プロセッサ (例: "1,2;3,4" で 2 つ目のスレッドを 1,2 番、3 つ目を 3,4 番に固定する)
+    # 1 つ目のスレッドは呼び出し元のスレッドのため、intra_op_num_threads - 1 個をセミコロン区切りで指定する
+    intra_op_thread_affinities: str | None = None
+    # モデルの重みの量子化 (int8 なら INT8 に動的量子化したモデルを読み込む)
+    # 量子化すると CPU での推論が速くなりメモリ使用量も減るが、わずかに品質が下がる
+    # 量子化したモデルは CPU でしか高速に動作しないため、GPU で推論する場合は無視される
+    quantization: Literal["none", "int8"] | None = None
+
+    def merge(self, override: "OnnxSessionConfig") -> "OnnxSessionConfig":
+        """
+        override で指定されている項目だけを上書きした設定を返す
+
+        Parameters
+        ----------
+        override : OnnxSessionConfig
+            上書きする設定
+
+        Returns
+        -------
+        OnnxSessionConfig
+            上書き後の設定
+        """
+
+        return replace(
+            self,
+            **{
+                name: value
+                for name, value in asdict(override).items()
+                if value is not None
+            },
+        )
+
+    def apply(self, sess_options: onnxruntime.SessionOptions) -> None:
+        """
+        指定されている項目を ONNX Runtime のセッションのオプションに反映する
+
+        Parameters
+        ----------
+        sess_options : onnxruntime.SessionOptions
+            反映先のセッションのオプション
+        """
+
+        if self.intra_op_num_threads is not None:
+            sess_options.intra_op_num_threads = self.intra_op_num_threads
+        if self.inter_op_num_threads is not None:
+            sess_options.inter_op_num_threads = self.inter_op_num_threads
+        if self.execution_mode is not None:
+            sess_options.execution_mode = _EXECUTION_MODES[self.execution_mode]
+        if self.graph_optimization_level is not None:
+            sess_options.graph_optimization_level = _GRAPH_OPTIMIZATION_LEVELS[self.graph_optimization_level]  # fmt: skip
+        if self.enable_cpu_mem_arena is not None:
+            sess_options.enable_cpu_mem_arena = self.enable_cpu_mem_arena
+        if self.enable_mem_pattern is not None:
+            sess_options.enable_mem_pattern = self.enable_mem_pattern
+        if self.intra_op_allow_spinning is not None:
+            sess_options.add_session_config_entry(
+                "session.intra_op.allow_spinning",
+                "1" if self.intra_op_allow_spinning else "0",
+            )
+        if self.intra_op_thread_affinities is not None:
+            sess_options.add_session_config_entry(
+                "session.intra_op_thread_affinities", self.intra_op_thread_affinities
+            )
+
+
+class OnnxSessionConfigurator:
+    """
+    ONNX Runtime のセッションの作成時に、エンジン全体の設定とモデルごとの上書き設定を反映する
+    BERT モデルと音声合成モデルのどちらのセッションにも、同じ手順で同じ設定が反映される
+    どのモデルのセッションを作成しているかは、モデルの読み込みを target() で囲んで伝える
+    """
+
+    def __init__(
+        self,
+        config: OnnxSessionConfig,
+        overrides: Mapping[str, OnnxSessionConfig] | None = None,
+        session_factory: InferenceSessionFactory | None = None,
+        quantized_onnx_model_cache: QuantizedOnnxModelCache | None = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        config : OnnxSessionConfig
+            全てのセッションに反映する設定
+        overrides : Mapping[str, OnnxSessionConfig] | None
+            モデルごとの上書き設定 (キーは AIVM の UUID 、BERT モデルは BERT_MODEL_KEY)
+        session_factory : InferenceSessionFactory | None
+            設定を反映したオプションでセッションを作成する関数 (最適化済みモデルのキャッシュなど)
+            None ならそのまま InferenceSession を作成する
+        quantized_onnx_model_cache : QuantizedOnnxModelCache | None
+            量子化済みモデルのキャッシュ (None なら quantization の設定に関わらず量子化しない)
+        """
+
+        self.config = config
+        self.overrides = dict(overrides) if overrides is not None else {}
+        self._session_factory = session_factory
+        self._quantized_onnx_model_cache = quantized_onnx_model_cache
+        self._current_model_key: contextvars.ContextVar[str | None] = (
+            contextvars.ContextVar("onnx_session_model_key", default=None)
+        )
+
+    def resolve(self, model_key: str | None) -> OnnxSessionConfig:
+        """
+        指定されたモデルのセッションに反映する設定を返す
+
+        Parameters
+        ----------
+        model_key : str | None
+            AIVM の UUID または BERT_MODEL_KEY (None ならエンジン全体の設定をそのまま返す)
+
+        Returns
+        -------
+        OnnxSessionConfig
+            モデルごとの上書き設定を反映した設定
+        """
+
+        override = self.overrides.get(model_key) if model_key is not None else None
+        if override is None:
+            return self.config
+        return self.config.merge(override)
+
+    def fingerprint(self, model_key: str) -> str:
+        """
+        指定されたモデルでの音声合成の結果を左右するセッションの設定を表すハッシュを返す
+        量子化やグラフ最適化の設定が変わると同じモデルでも推論結果がわずかに変わるため、音声合成結果のキャッシュキーに含める
+        音声合成には BERT モデルも使われるため、BERT モデルの設定も含める
+
+        Parameters
+        ----------
+        model_key : str
+            AIVM の UUID
+
+        Returns
+        -------
+        str
+            セッションの設定を表すハッシュ
+        """
+
+        payload = json.dumps(
+            {
+                "bert": asdict(self.resolve(BERT_MODEL_KEY)),
+                "model": asdict(self.resolve(model_key)),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    @contextmanager
+    def target(self, model_key: str) -> Iterator[None]:
+        """
+        with 文の中で作成されるセッションに、指定されたモデルの設定を反映する
+
+        Parameters
+        ----------
+        model_key : str
+            AIVM の UUID または BERT_MODEL_KEY
+        """
+
+        token = self._current_model_key.set(model_key)
+        try:
+            yield
+        finally:
+            self._current_model_key.reset(token)
+
+    def create_session(
+        self,
+        inference_session_class: type[onnxruntime.InferenceSession],
+        path_or_bytes: str | bytes | os.PathLike[str],
+        sess_options: onnxruntime.SessionOptions | None = None,
+        providers: Any = None,
+        provider_options: Any = None,
+        **kwargs: Any,
+    ) -> onnxruntime.InferenceSession:
+        """
+        設定を反映したオプションで ONNX Runtime のセッションを作成する
+        引数は onnxruntime.InferenceSession のコンストラクタと同じ
+
+        Parameters
+        ----------
+        inference_session_class : type[onnxruntime.InferenceSession]
+            セッションの作成に使う (差し替える前の) InferenceSession クラス
+        path_or_bytes : str | bytes | os.PathLike[str]
+            ONNX モデルのパスまたはバイト列
+        sess_options : onnxruntime.SessionOptions | None
+            呼び出し元が指定したセッションのオプション
+        providers : Any
+            ExecutionProvider のリスト
+        provider_options : Any
+            ExecutionProvider ごとのオプション
+
+        Returns
+        -------
+        onnxruntime.InferenceSession
+            作成されたセッション
+        """
+
+        model_key = self._current_model_key.get()
+        config = self.resolve(model_key)
+        sess_options = sess_options if sess_options is not None else onnxruntime.SessionOptions()  # fmt: skip
+        config.apply(sess_options)
+
+        # 量子化が指定されていて CPU のみで推論する場合は、量子化済みモデルに差し替えてセッションを作成する
+        if config.quantization == "int8" and self._quantized_onnx_model_cache is not None:  # fmt: skip
+            path_or_bytes = self._get_quantized_model(model_key, path_or_bytes, providers)  # fmt: skip
+
+        if self._session_factory is not None:
+            return self._session_factory(inference_session_class, path_or_bytes, sess_options, providers, provider_options, **kwargs)  # fmt: skip
+        return inference_session_class(path_or_bytes, sess_options, providers, provider_options, **kwargs)  # fmt: skip
+
+    def _get_quantized_model(
+        self,
+        model_key: str | None,
+        path_or_bytes: str | bytes | os.PathLike[str],
+        providers: Any,
+    ) -> str | bytes | os.PathLike[str]:
+        """量子化済みモデルを使える場合はそのパスを、使えない場合は元のモデルをそのまま返す"""
+
+        assert self._quantized_onnx_model_cache is not None
+        provider_names = [
+            provider if isinstance(provider, str) else provider[0]
+            for provider in (providers or ["CPUExecutionProvider"])
+        ]
+        if any(name != "CPUExecutionProvider" for name in provider_names):
+            logger.info(f"Skipping INT8 quantization of {model_key} on GPU.")
+            return path_or_bytes
+        if isinstance(path_or_bytes, bytes):
+            # メモリ上のモデルはキャッシュキーを作れないため量子化しない
+            return path_or_bytes
+        try:
+            return str(self._quantized_onnx_model_cache.get_quantized_model_path(path_or_bytes))  # fmt: skip
+        except Exception as e:
+            # 量子化に失敗しても元のモデルで推論できるため、元のモデルにフォールバックする
+            logger.warning(f"Failed to quantize {model_key}. Using the original model.", exc_info=e)  # fmt: skip
+            return path_or_bytes
+
+    def install(self) -> None:
+        """
+        onnxruntime.InferenceSession を、設定を反映してセッションを作成するサブクラスに差し替える
+        Style-Bert-VITS2 はセッションのオプションを外から指定できないため、セッションの作成そのものに割り込む
+        """
+
+        install_inference_session_factory(self.create_session)
+
+
+def install_inference_session_factory(session_factory: InferenceSessionFactory) -> None:
+    """
+    onnxruntime.InferenceSession を、指定された関数でセッションを作成するサブクラスに差し替える
+    既に差し替えられている場合は、差し替える前の InferenceSession から作り直す (最後に差し替えた関数だけが使われる)
+
+    Parameters
+    ----------
+    session_factory : InferenceSessionFactory
+        差し替える前の InferenceSession クラスと、InferenceSession のコンストラクタと同じ引数を受け取り、セッションを作成する関数
+    """
+
+    original_class = getattr(onnxruntime.InferenceSession, "_original", onnxruntime.InferenceSession)  # fmt: skip
+    current_class = onnxruntime.InferenceSession
+
+    class HookedInferenceSession(original_class):  # type: ignore[valid-type, misc]
+        def __init__(
+            self,
+            path_or_bytes: str | bytes | os.PathLike[str],
+            sess_options: onnxruntime.SessionOptions | None = None,
+            providers: Any = None,
+            provider_options: Any = None,
+            **kwargs: Any,
+        ) -> None:
+            # セッションの作成は session_factory に任せ、作成されたセッションの状態を引き継ぐ
+            session = session_factory(
+                original_class,
+                path_or_bytes,
+                sess_options,
+                providers,
+                provider_options,
+                **kwargs,
+            )
+            self.__dict__.update(session.__dict__)
+
+    setattr(HookedInferenceSession, "_original", original_class)
+
+    # onnxruntime.InferenceSession だけでなく、`from onnxruntime import InferenceSession` で
+    # 読み込み済みのモジュールが参照している InferenceSession も差し替える
+    # InferenceSession が定義されている ONNX Runtime 内部のモジュールは差し替えない
+    for module in list(sys.modules.values()):
+        if (
+            getattr(module, "__name__", None) != original_class.__module__
+            and getattr(module, "InferenceSession", None) is current_class
+        ):  # fmt: skip
+            setattr(module, "InferenceSession", HookedInferenceSession)
+    onnxruntime.InferenceSession = HookedInferenceSession  # type: ignore[misc]
@@ -0,0 +1,239 @@
+"""ONNX Runtime で最適化済みの ONNX モデルのディスクキャッシュ"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import onnxruntime
+
+from voicevox_engine.logging import logger
+
+__all__ = ["OptimizedOnnxModelCache"]
+
+
+class OptimizedOnnxModelCache:
+    """
+    ONNX Runtime がセッションの作成時に行うグラフ最適化の結果を ONNX モデルとしてディスクに保存し、次回以降の起動で再利用するキャッシュ
+    BERT モデルや AIVMX ファイル内の音声合成モデルは、起動のたびにセッションの作成時にグラフ最適化が行われ、起動と最初の音声合成が遅くなる
+    最適化済みのモデルを読み込む際はグラフ最適化を無効化するため、セッションの作成にかかる時間を大幅に短縮できる
+
+    最適化の結果は ONNX Runtime のバージョン・ExecutionProvider・最適化レベルによって変わるため、これらをキャッシュキーに含める
+    元のモデルが更新された場合も、ファイルのサイズ・更新日時 (メモリ上のモデルの場合は内容のハッシュ) がキャッシュキーに含まれるため、
+    古い最適化済みモデルが使われることはない
+    元のモデルがアンインストール・更新された場合に残る最適化済みモデルは、prune() で削除する
+    """
+
+    # 最適化済みモデルのファイル名の拡張子
+    SUFFIX = ".optimized.onnx"
+    # 最適化済みモデルの元のモデルのパス・サイズ・更新日時を記録するファイルの拡張子
+    SOURCE_SUFFIX = ".source.json"
+
+    def __init__(self, cache_dir: Path) -> None:
+        """
+        Parameters
+        ----------
+        cache_dir : Path
+            最適化済みモデルの保存先ディレクトリ
+        """
+
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        """最適化済みモデルを再利用してセッションを作成した回数"""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """グラフ最適化を行って最適化済みモデルを保存した回数"""
+        return self._misses
+
+    def create_session(
+        self,
+        inference_session_class: type[onnxruntime.InferenceSession],
+        path_or_bytes: str | bytes | os.PathLike[str],
+        sess_options: onnxruntime.SessionOptions | None = None,
+        providers: Any = None,
+        provider_options: Any = None,
+        **kwargs: Any,
+    ) -> onnxruntime.InferenceSession:
+        """
+        最適化済みモデルのキャッシュを使って ONNX Runtime のセッションを作成する
+        引数は onnxruntime.InferenceSession のコンストラクタと同じで、キャッシュを使えない場合はそのままセッションを作成する
+
+        Parameters
+        ----------
+        inference_session_class : type[onnxruntime.InferenceSession]
+            セッションの作成に使う (差し替える前の) InferenceSession クラス
+        path_or_bytes : str | bytes | os.PathLike[str]
+            ONNX モデルのパスまたはバイト列
+        sess_options : onnxruntime.SessionOptions | None
+            セッションのオプション
+        providers : Any
+            ExecutionProvider のリスト
+        provider_options : Any
+            ExecutionProvider ごとのオプション
+
+        Returns
+        -------
+        onnxruntime.InferenceSession
+            作成されたセッション
+        """
+
+        sess_options = sess_options if sess_options is not None else onnxruntime.SessionOptions()  # fmt: skip
+
+        # 呼び出し元が最適化済みモデルの保存先を自前で指定している場合や、最適化が無効化されている場合はキャッシュしない
+        if (
+            sess_options.optimized_model_filepath != ""
+            or sess_options.graph_optimization_level
+            == onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL
+        ):
+            return inference_session_class(path_or_bytes, sess_options, providers, provider_options, **kwargs)  # fmt: skip
+
+        try:
+            model_id, fingerprint = self._make_key(path_or_bytes, sess_options, providers)  # fmt: skip
+        except OSError:
+            return inference_session_class(path_or_bytes, sess_options, providers, provider_options, **kwargs)  # fmt: skip
+        cache_path = self.cache_dir / f"{model_id}-{fingerprint}{self.SUFFIX}"
+
+        # 最適化済みモデルがあれば、グラフ最適化を無効化して読み込む
+        if cache_path.exists():
+            optimization_level = sess_options.graph_optimization_level
+            sess_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL  # fmt: skip
+            try:
+                session = inference_session_class(str(cache_path), sess_options, providers, provider_options, **kwargs)  # fmt: skip
+                with self._lock:
+                    self._hits += 1
+                # 元のモデルの記録がない最適化済みモデル (記録を始める前に保存されたものなど) も prune() の対象にする
+                if not isinstance(path_or_bytes, bytes) and not (self.cache_dir / f"{model_id}{self.SOURCE_SUFFIX}").exists():  # fmt: skip
+                    self._write_source(model_id, Path(path_or_bytes))
+                return session
+            except Exception as e:
+                # 最適化済みモデルが壊れている場合は削除し、元のモデルから作り直す
+                logger.warning(f"Failed to load optimized ONNX model {cache_path}. Re-optimizing...", exc_info=e)  # fmt: skip
+                cache_path.unlink(missing_ok=True)
+            finally:
+                sess_options.graph_optimization_level = optimization_level
+
+        # 元のモデルからセッションを作成し、グラフ最適化の結果を一時ファイルに保存してから差し替える
+        # 保存に失敗しても音声合成には影響しないため、最適化済みモデルの保存なしでセッションを作成し直す
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")  # fmt: skip
+        sess_options.optimized_model_filepath = str(tmp_path)
+        try:
+            session = inference_session_class(path_or_bytes, sess_options, providers, provider_options, **kwargs)  # fmt: skip
+        except Exception as e:
+            logger.warning("Failed to save optimized ONNX model. Retrying without the cache...", exc_info=e)  # fmt: skip
+            tmp_path.unlink(missing_ok=True)
+            sess_options.optimized_model_filepath = ""
+            return inference_session_class(path_or_bytes, sess_options, providers, provider_options, **kwargs)  # fmt: skip
+        finally:
+            sess_options.optimized_model_filepath = ""
+
+        if tmp_path.exists():
+            os.replace(tmp_path, cache_path)
+            self._remove_stale_entries(model_id, cache_path)
+            if not isinstance(path_or_bytes, bytes):
+                self._write_source(model_id, Path(path_or_bytes))
+            with self._lock:
+                self._misses += 1
+            logger.info(f"Optimized ONNX model saved to {cache_path}.")
+        return session
+
+    def prune(self) -> None:
+        """
+        元のモデルが削除・更新された最適化済みモデルを削除する
+        音声合成モデルがアンインストールされたり、更新後に一度も読み込まれなかったりした場合でも、
+        古い最適化済みモデルがディスクに残り続けないよう、起動時や音声合成モデルの更新時に呼び出す
+        メモリ上のモデルから作成した最適化済みモデルは元のモデルの有無を確認できないため、削除しない
+        """
+
+        for source_path in self.cache_dir.glob(f"*{self.SOURCE_SUFFIX}"):
+            model_id = source_path.name.removesuffix(self.SOURCE_SUFFIX)
+            try:
+                source = json.loads(source_path.read_text(encoding="utf-8"))
+                stat = Path(source["path"]).stat()
+                if (stat.st_size, stat.st_mtime_ns) == (source["size"], source["mtime_ns"]):  # fmt: skip
+                    continue
+            except (OSError, ValueError, KeyError, TypeError):
+                # 元のモデルが削除された場合や、記録が壊れている場合
+                pass
+            logger.info(f"Removing stale optimized ONNX models of {model_id}...")
+            self._remove_stale_entries(model_id, None)
+            # 読み込み中で削除できなかった最適化済みモデルがあれば、次回の prune() で改めて削除する
+            if not any(self.cache_dir.glob(f"{model_id}-*{self.SUFFIX}")):
+                source_path.unlink(missing_ok=True)
+
+    def _make_key(
+        self,
+        path_or_bytes: str | bytes | os.PathLike[str],
+        sess_options: onnxruntime.SessionOptions,
+        providers: Any,
+    ) -> tuple[str, str]:
+        """元のモデルを識別する ID と、最適化の結果を左右する条件のハッシュを返す"""
+
+        if isinstance(path_or_bytes, bytes):
+            # メモリ上のモデルは内容そのものでしか識別できないため、内容のハッシュを ID とする
+            model_id = hashlib.sha256(path_or_bytes).hexdigest()[:16]
+            model_version = ""
+        else:
+            model_path = Path(path_or_bytes).resolve()
+            stat = model_path.stat()
+            model_id = hashlib.sha256(str(model_path).encode("utf-8")).hexdigest()[:16]
+            model_version = f"{stat.st_size}:{stat.st_mtime_ns}"
+
+        provider_names = [
+            provider if isinstance(provider, str) else provider[0]
+            for provider in (providers or [])
+        ]
+        fingerprint = hashlib.sha256(
+            "\n".join(
+                [
+                    model_version,
+                    onnxruntime.__version__,
+                    ",".join(provider_names),
+                    str(sess_options.graph_optimization_level),
+                ]
+            ).encode("utf-8")
+        ).hexdigest()[:16]
+        return model_id, fingerprint
+
+    def _write_source(self, model_id: str, model_path: Path) -> None:
+        """prune() で元のモデルの削除・更新を検出できるよう、元のモデルのパス・サイズ・更新日時を記録する"""
+
+        model_path = model_path.resolve()
+        try:
+            stat = model_path.stat()
+            (self.cache_dir / f"{model_id}{self.SOURCE_SUFFIX}").write_text(
+                json.dumps(
+                    {
+                        "path": str(model_path),
+                        "size": stat.st_size,
+                        "mtime_ns": stat.st_mtime_ns,
+                    }
+                ),
+                encoding="utf-8",
+            )
+        except OSError as e:
+            logger.warning(f"Failed to record the source of {model_path}. ({e})")
+
+    def _remove_stale_entries(self, model_id: str, current_path: Path | None) -> None:
+        """
+        同じ元のモデルに対する、古い条件で最適化されたモデルを削除する
+        current_path が None なら、同じ元のモデルに対する全ての最適化済みモデルを削除する
+        """
+
+        for stale_path in self.cache_dir.glob(f"{model_id}-*{self.SUFFIX}"):
+            if stale_path == current_path:
+                continue
+            try:
+                stale_path.unlink()
+            except OSError:
+                # Windows では他のプロセスが読み込み中の場合があるため、次回の保存時に削除する
+                pass
@@ -0,0 +1,127 @@
+"""INT8 に動的量子化した ONNX モデルのディスクキャッシュ"""
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+import onnxruntime
+
+from ..logging import logger
+
+__all__ = ["QuantizedOnnxModelCache"]
+
+
+class QuantizedOnnxModelCache:
+    """
+    ONNX モデルの重みを INT8 に動的量子化したモデルを生成し、ディスクに保存して再利用するキャッシュ
+    CPU での推論では、BERT モデルや音声合成モデルの行列積が推論時間とメモリ使用量の大半を占める
+    重みを INT8 に量子化すると、わずかな品質の低下と引き換えに、推論時間とメモリ使用量を大きく削減できる
+
+    量子化には数十秒から数分かかるため、初回だけ量子化して保存し、2 回目以降は保存済みのモデルを読み込む
+    元のモデルのサイズ・更新日時と ONNX Runtime のバージョンをキャッシュキーに含めるため、
+    AIVMX ファイルが更新されたり ONNX Runtime が更新されたりした場合は量子化し直す
+    """
+
+    # 量子化済みモデルのファイル名の拡張子
+    SUFFIX = ".int8.onnx"
+
+    # 量子化する演算子
+    # Conv は ConvInteger に置き換わるが、CPU では元の Conv より遅くなることが多いため量子化しない
+    OP_TYPES_TO_QUANTIZE = ["MatMul", "Attention", "Gather"]
+
+    def __init__(self, cache_dir: Path) -> None:
+        """
+        Parameters
+        ----------
+        cache_dir : Path
+            量子化済みモデルの保存先ディレクトリ
+        """
+
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # 同じモデルを複数のスレッドで同時に量子化しないよう、量子化は 1 つずつ行う
+        self._lock = threading.Lock()
+
+    def get_quantized_model_path(self, model_path: str | os.PathLike[str]) -> Path:
+        """
+        指定された ONNX モデルを INT8 に動的量子化したモデルのパスを返す
+        量子化済みモデルがまだなければ、量子化して保存してから返す
+
+        Parameters
+        ----------
+        model_path : str | os.PathLike[str]
+            元の ONNX モデル (AIVMX ファイルを含む) のパス
+
+        Returns
+        -------
+        Path
+            量子化済みモデルのパス
+
+        Raises
+        ------
+        ImportError
+            量子化に必要な onnx パッケージがインストールされていない場合
+        """
+
+        model_id, fingerprint = self._make_key(Path(model_path))
+        cache_path = self.cache_dir / f"{model_id}-{fingerprint}{self.SUFFIX}"
+        if cache_path.exists():
+            return cache_path
+
+        with self._lock:
+            # ロックを待っている間に、他のスレッドが量子化を終えている場合がある
+            if cache_path.exists():
+                return cache_path
+
+            # onnxruntime.quantization は onnx パッケージに依存するため、量子化を行う場合のみ読み込む
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            start_time = time.time()
+            logger.info(f"Quantizing {model_path} to INT8...")
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            try:
+                quantize_dynamic(
+                    model_input=Path(model_path),
+                    model_output=tmp_path,
+                    op_types_to_quantize=self.OP_TYPES_TO_QUANTIZE,
+                    weight_type=QuantType.QInt8,
+                )
+                os.replace(tmp_path, cache_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+            self._remove_stale_entries(model_id, cache_path)
+            logger.info(
+                f"Quantized model saved to {cache_path}. ({time.time() - start_time:.2f}s)"
+            )
+        return cache_path
+
+    def _make_key(self, model_path: Path) -> tuple[str, str]:
+        """元のモデルを識別する ID と、量子化の結果を左右する条件のハッシュを返す"""
+
+        model_path = model_path.resolve()
+        stat = model_path.stat()
+        model_id = hashlib.sha256(str(model_path).encode("utf-8")).hexdigest()[:16]
+        fingerprint = hashlib.sha256(
+            "\n".join(
+                [
+                    f"{stat.st_size}:{stat.st_mtime_ns}",
+                    onnxruntime.__version__,
+                    ",".join(self.OP_TYPES_TO_QUANTIZE),
+                ]
+            ).encode("utf-8")
+        ).hexdigest()[:16]
+        return model_id, fingerprint
+
+    def _remove_stale_entries(self, model_id: str, current_path: Path) -> None:
+        """同じ元のモデルに対する、古い条件で量子化されたモデルを削除する"""
+
+        for stale_path in self.cache_dir.glob(f"{model_id}-*{self.SUFFIX}"):
+            if stale_path == current_path:
+                continue
+            try:
+                stale_path.unlink()
+            except OSError:
+                # Windows では他のプロセスが読み込み中の場合があるため、次回の保存時に削除する
+                pass
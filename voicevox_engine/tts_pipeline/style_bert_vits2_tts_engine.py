@@ -1,8 +1,12 @@
 # flake8: noqa
 
-import copy
+import contextvars
 import re
+import threading
 import time
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
 from typing import Any, Final, Sequence
@@ -38,33 +42,126 @@ from ..dev.core.mock import MockCoreWrapper
 from ..logging import logger
 from ..metas.Metas import StyleId
 from ..model import AudioQuery
+from ..tts_pipeline.accent_phrase_cache import AccentPhraseCache
+from ..tts_pipeline.bert_feature_cache import BertFeatureCache
+from ..tts_pipeline.cancellation import install_cancellation_points, raise_if_cancelled
+from ..tts_pipeline.inference_scheduler import (
+    InferencePriority,
+    InferenceScheduler,
+    InferenceSchedulerStatistics,
+)
+from ..tts_pipeline.long_text_synthesis import (
+    concatenate_with_crossfade,
+    group_segments_into_chunks,
+    trim_silence,
+)
 from ..tts_pipeline.model import AccentPhrase, Mora
+from ..tts_pipeline.model_warmup import ModelWarmer, ModelWarmupStatus
+from ..tts_pipeline.onnx_session_config import (
+    BERT_MODEL_KEY,
+    OnnxSessionConfig,
+    OnnxSessionConfigurator,
+)
+from ..tts_pipeline.optimized_onnx_model_cache import OptimizedOnnxModelCache
+from ..tts_pipeline.quantized_onnx_model_cache import QuantizedOnnxModelCache
 from ..tts_pipeline.tts_engine import (
     TTSEngine,
     raw_wave_to_output_wave,
     to_flatten_moras,
 )
+from ..user_dict.user_dict_manager import get_openjtalk_dict_generation
+from ..utility.lru_cache import CacheStatistics, LRUCache
 from ..utility.path_utility import get_save_dir
 
 
+@dataclass(frozen=True)
+class _InferenceParameters:
+    """AudioQuery から変換した Style-Bert-VITS2 の推論パラメータ"""
+
+    local_speaker_id: int
+    local_style_name: str
+    style_weight: float
+    sdp_ratio: float
+    length: float
+    pitch_scale: float
+
+
 class StyleBertVITS2TTSEngine(TTSEngine):
     """Style-Bert-VITS2 TTS Engine"""
 
     # BERT モデルのキャッシュディレクトリ
     BERT_MODEL_CACHE_DIR: Final[Path] = get_save_dir() / "BertModelCaches"
 
+    # ONNX Runtime で最適化済みの BERT モデル・音声合成モデルのキャッシュの保存先ディレクトリ
+    OPTIMIZED_ONNX_MODEL_CACHE_DIR: Final[Path] = get_save_dir() / "OptimizedOnnxModelCaches"  # fmt: skip
+
+    # INT8 に量子化した BERT モデル・音声合成モデルのキャッシュの保存先ディレクトリ
+    QUANTIZED_ONNX_MODEL_CACHE_DIR: Final[Path] = get_save_dir() / "QuantizedOnnxModelCaches"  # fmt: skip
+
+    # 複数のクエリをまとめて音声合成する際に、並行して推論するクエリの最大数
+    ## 推論の前後にある GIL を握る前処理・後処理と、GIL を解放する ONNX Runtime での推論を重ね合わせて CPU を遊ばせないためのもので、
+    ## ONNX Runtime 自体もスレッド並列で推論するため、これ以上増やしても CPU コア数を奪い合うだけになる
+    MAX_BATCH_SYNTHESIS_WORKERS: Final[int] = 2
+
+    # 長いテキストを分割して音声合成する際に、分割した箇所に挟む無音区間の秒数 (話速 1.0 の場合)
+    ## 分割した各部分の前後の無音区間は一旦切り詰め、文末・句の区切りごとに一定の長さの無音区間を挟み直す
+    LONG_TEXT_SENTENCE_PAUSE_SECONDS: Final[float] = 0.4
+    LONG_TEXT_CLAUSE_PAUSE_SECONDS: Final[float] = 0.2
+
+    # ウォームアップ時にダミーの推論で読み上げるテキスト
+    WARMUP_TEXT: Final[str] = "こんにちは。音声合成の準備をしています。"
+
     def __init__(
         self,
         aivm_manager: AivmManager,
         use_gpu: bool = False,
         load_all_models: bool = False,
+        max_loaded_models: int | None = None,
+        max_model_memory_bytes: int | None = None,
+        bert_feature_cache_bytes: int = 128 * 1024 * 1024,
+        accent_phrase_cache_size: int = 1024,
+        max_concurrent_inferences: int = MAX_BATCH_SYNTHESIS_WORKERS,
+        max_inference_queue_size: int | None = 64,
+        preload_models: Sequence[str] = (),
+        preload_style_ids: Sequence[StyleId] = (),
+        enable_optimized_onnx_model_cache: bool = True,
+        onnx_session_config: OnnxSessionConfig = OnnxSessionConfig(),
+        onnx_session_overrides: Mapping[str, OnnxSessionConfig] | None = None,
+        long_text_chunk_moras: int = 0,
+        long_text_max_workers: int = 1,
     ) -> None:
         self.aivm_manager = aivm_manager
         self.use_gpu = use_gpu
         self.load_all_models = load_all_models
 
+        # 長いテキストの分割合成
+        ## 読み上げるモーラ数がこの値を超える場合、文末・句の区切りで分割し、この値以下のまとまりごとに推論して連結する
+        ## Style-Bert-VITS2 の推論時間とメモリ使用量は系列長に対して線形以上に増えるため、ニュース記事のような長文を
+        ## 一度に推論するとメモリ使用量が跳ね上がるが、分割すれば系列長が抑えられ、入力の長さに関わらず一定の範囲に収まる
+        ## 0 以下なら分割しない (分割位置の前後で抑揚がわずかに変わるため、既定では分割せず、明示的に指定された場合のみ分割する)
+        self.long_text_chunk_moras = long_text_chunk_moras
+        ## 分割したまとまりを並行して推論する数 (1 なら順番に推論し、同時に保持する推論途中のデータを最小限に抑える)
+        self.long_text_max_workers = max(1, long_text_max_workers)
+
+        # 推論スケジューラ
+        ## Starlette のスレッドプールから同時に呼ばれる推論の数を制限し、上限を超えた推論は優先度順に待たせる
+        ## 待ち行列も上限に達した場合は InferenceQueueFullError を送出し、API では 503 Service Unavailable を返す
+        self.inference_scheduler = InferenceScheduler(
+            max_concurrent_inferences, max_inference_queue_size
+        )
+
         # ロード済みモデルのキャッシュ
-        self.tts_models: dict[str, TTSModel] = {}
+        ## ロード済みモデルの数・合計メモリ使用量が上限を超えたら、最も長く使われていないモデルからアンロードする
+        ## モデルのメモリ使用量は ONNX の重みの大部分を占める AIVMX ファイルのサイズで近似している
+        ## アンロードしたモデルで推論中のリクエストがあっても、その推論が終わるまでは参照が残るため安全に解放される
+        self.tts_models: LRUCache[str, TTSModel] = LRUCache(
+            max_entries=max_loaded_models,
+            max_bytes=max_model_memory_bytes,
+            on_evict=self._on_model_evicted,
+        )
+        # 音声合成モデルのウォームアップ (ウォームアップ対象が指定された場合のみ、初期化の最後に生成される)
+        self.model_warmer: ModelWarmer | None = None
+        self._load_model_lock = threading.Lock()
 
         # ONNX Runtime での推論に利用するデバイスを選択
         self.available_onnx_providers: list[str] = onnxruntime.get_available_providers()
@@ -110,16 +207,58 @@ class StyleBertVITS2TTSEngine(TTSEngine):
         # Style-Bert-VITS2 本体のロガーを抑制
         style_bert_vits2_logger.remove()
 
+        # ONNX Runtime のグラフ最適化の結果をディスクにキャッシュし、次回以降の起動では最適化済みのモデルを読み込む
+        ## BERT モデルと AIVMX ファイル内の音声合成モデルは、読み込みのたびにグラフ最適化が行われ、起動と最初の音声合成が遅くなる
+        self.optimized_onnx_model_cache: OptimizedOnnxModelCache | None = None
+        if enable_optimized_onnx_model_cache is True:
+            self.optimized_onnx_model_cache = OptimizedOnnxModelCache(
+                self.OPTIMIZED_ONNX_MODEL_CACHE_DIR
+            )
+            # アンインストールされた音声合成モデルなど、元のモデルが削除・更新された最適化済みモデルを削除する
+            self.optimized_onnx_model_cache.prune()
+
+        # 量子化が指定されたモデルは、INT8 に動的量子化したモデルを初回だけ生成して保存し、以降はそれを読み込む
+        ## CPU での推論では BERT モデルの推論が大半を占めるため、BERT モデルだけ量子化するだけでも効果が大きい
+        self.quantized_onnx_model_cache: QuantizedOnnxModelCache | None = None
+        if any(
+            config.quantization == "int8"
+            for config in [
+                onnx_session_config,
+                *(onnx_session_overrides or {}).values(),
+            ]
+        ):
+            self.quantized_onnx_model_cache = QuantizedOnnxModelCache(
+                self.QUANTIZED_ONNX_MODEL_CACHE_DIR
+            )
+
+        # BERT モデル・音声合成モデルの ONNX Runtime のセッションに、スレッド数やメモリアリーナなどの設定を反映する
+        ## Style-Bert-VITS2 はセッションのオプションを外から指定できないため、onnxruntime.InferenceSession ごと差し替える
+        ## 設定を反映したオプションで最適化済みモデルのキャッシュを引くため、キャッシュもこの差し替えを経由して使う
+        ## BERT モデルを読み込む前に差し替える必要がある
+        self.onnx_session_configurator = OnnxSessionConfigurator(
+            onnx_session_config,
+            onnx_session_overrides,
+            session_factory=(
+                self.optimized_onnx_model_cache.create_session
+                if self.optimized_onnx_model_cache is not None
+                else None
+            ),
+            quantized_onnx_model_cache=self.quantized_onnx_model_cache,
+        )
+        self.onnx_session_configurator.install()
+        logger.info(f"ONNX Runtime session config: {onnx_session_config}")
+
         # 音声合成に必要な BERT モデル・トークナイザーを読み込む
         ## 一度ロードすればプロセス内でグローバルに保持される
         start_time = time.time()
         logger.info("Loading BERT model and tokenizer...")
-        onnx_bert_models.load_model(
-            language=Languages.JP,
-            pretrained_model_name_or_path="tsukumijima/deberta-v2-large-japanese-char-wwm-onnx",
-            onnx_providers=self.onnx_providers,
-            cache_dir=str(self.BERT_MODEL_CACHE_DIR),
-        )
+        with self.onnx_session_configurator.target(BERT_MODEL_KEY):
+            onnx_bert_models.load_model(
+                language=Languages.JP,
+                pretrained_model_name_or_path="tsukumijima/deberta-v2-large-japanese-char-wwm-onnx",
+                onnx_providers=self.onnx_providers,
+                cache_dir=str(self.BERT_MODEL_CACHE_DIR),
+            )
         onnx_bert_models.load_tokenizer(
             language=Languages.JP,
             pretrained_model_name_or_path="tsukumijima/deberta-v2-large-japanese-char-wwm-onnx",
@@ -129,17 +268,71 @@ class StyleBertVITS2TTSEngine(TTSEngine):
             f"BERT model and tokenizer loaded. ({time.time() - start_time:.2f}s)"
         )
 
+        # BERT 特徴量のキャッシュを有効化する
+        ## 同じ文を話速や音量などのパラメータだけ変えて音声合成し直す際に、最も重い BERT の推論を省略できる
+        self.bert_feature_cache: BertFeatureCache | None = None
+        if bert_feature_cache_bytes > 0:
+            bert_feature_cache = BertFeatureCache(bert_feature_cache_bytes)
+            if bert_feature_cache.install() is True:
+                self.bert_feature_cache = bert_feature_cache
+
+        # Style-Bert-VITS2 の推論処理の途中 (g2p と BERT 、BERT と VITS の間) にキャンセルポイントを差し込む
+        ## BERT 特徴量の抽出関数の呼び出し前後をキャンセルポイントにすることで、BERT 特徴量のキャッシュの有無に関わらず、
+        ## 推論中にクライアントとの接続が切断された場合も、VITS の推論に入る前に打ち切れる
+        ## BERT 特徴量のキャッシュに差し替えた関数を包む必要があるため、キャッシュを有効化した後に差し込む
+        if (
+            install_cancellation_points(
+                BertFeatureCache.TARGET_MODULE_NAME,
+                BertFeatureCache.TARGET_FUNCTION_NAME,
+            )
+            is False
+        ):
+            logger.warning(
+                "Cancellation during inference is disabled because the Style-Bert-VITS2 internals are not as expected."
+            )
+
+        # テキストの言語解析結果 (g2p の結果) のキャッシュを有効化する
+        ## チャットのように同じフレーズが繰り返し音声合成される場合に、pyopenjtalk での解析とアクセント句の組み立てを省略できる
+        ## キーにユーザー辞書の世代番号を含めるため、ユーザー辞書が更新されると古い解析結果は参照されなくなる
+        self.accent_phrase_cache: AccentPhraseCache | None = None
+        if accent_phrase_cache_size > 0:
+            self.accent_phrase_cache = AccentPhraseCache(
+                accent_phrase_cache_size, get_openjtalk_dict_generation
+            )
+
         # load_all_models が True の場合は全ての音声合成モデルをロードしておく
         if load_all_models is True:
             logger.info("Loading all models...")
             for aivm_uuid in self.aivm_manager.get_installed_aivm_infos().keys():
                 self.load_model(aivm_uuid)
-            logger.info("All models loaded.")
+                # ロード済みモデルの上限に達した場合、残りのモデルは必要になった時点でロードする
+                if self.tts_models.statistics().evictions > 0:
+                    logger.warning(
+                        "Model cache limit reached. The remaining models will be loaded on demand."
+                    )
+                    break
+            else:
+                logger.info("All models loaded.")
 
         # VOICEVOX CORE の通常の CoreWrapper の代わりに MockCoreWrapper を利用する
         ## 継承元の TTSEngine は self._core に CoreWrapper を入れた CoreAdapter のインスタンスがないと動作しない
         self._core = CoreAdapter(MockCoreWrapper())
 
+        # 指定された音声合成モデル・スタイルを事前にロードし、ダミーの推論でウォームアップする
+        ## 各モデルの最初の音声合成では、モデルのロードに加えて ONNX Runtime のグラフ最適化やメモリアロケータの初回確保が走り、数秒単位で遅くなる
+        ## ウォームアップはバックグラウンドで行い、完了するまでは /ready が 503 を返すため、ロードバランサーはウォームアップ済みのノードにだけ振り分けられる
+        warmup_targets = self._resolve_warmup_targets(preload_models, preload_style_ids)
+        if len(warmup_targets) > 0:
+            self.model_warmer = ModelWarmer(
+                warmup_targets,
+                load_model=self.load_model,
+                get_style_ids=self._get_style_ids,
+                warmup_style=self._warmup_style,
+            )
+            self.model_warmer.start()
+        # 音声合成モデルがインストール・更新されたら、古いモデルをアンロードし、ウォームアップ対象ならウォームアップし直す
+        self.aivm_manager.add_install_listener(self._on_aivm_installed)
+
     @property
     def default_sampling_rate(self) -> int:
         """合成される音声波形のデフォルトサンプリングレートを取得する。"""
@@ -178,14 +371,25 @@ class StyleBertVITS2TTSEngine(TTSEngine):
         """
 
         # 既に読み込まれている場合はそのまま返す
-        if aivm_uuid in self.tts_models:
-            return self.tts_models[aivm_uuid]
+        tts_model = self.tts_models.get(aivm_uuid)
+        if tts_model is not None:
+            return tts_model
+
+        # 同じモデルを複数のリクエストが同時にロードしないよう、ロード処理は排他的に行う
+        with self._load_model_lock:
+            tts_model = self.tts_models.peek(aivm_uuid)
+            if tts_model is not None:
+                return tts_model
+            return self._load_model(aivm_uuid)
+
+    def _load_model(self, aivm_uuid: str) -> TTSModel:
+        """load_model() の実処理 (呼び出し元でロックを取得していること)"""
 
         # AIVM メタデータを読み込む
+        ## AivmManager 側でキャッシュされているため、通常は AIVMX ファイルを再度デコードすることはない
         aivm_info = self.aivm_manager.get_aivm_info(aivm_uuid)
         try:
-            with open(aivm_info.file_path, mode="rb") as f:
-                aivm_metadata = aivmlib.read_aivmx_metadata(f)
+            aivm_metadata = self.aivm_manager.get_aivm_metadata(aivm_uuid)
         except aivmlib.AivmValidationError as e:
             logger.error(f"{aivm_info.file_path}: Failed to read AIVM metadata. ({e})")
             raise HTTPException(
@@ -214,12 +418,15 @@ class StyleBertVITS2TTSEngine(TTSEngine):
             onnx_providers=self.onnx_providers,
         )  # fmt: skip
         start_time = time.time()
-        tts_model.load()
+        with self.onnx_session_configurator.target(aivm_uuid):
+            tts_model.load()
         logger.info(
             f"{aivm_info.manifest.name} ({aivm_uuid}) loaded. ({time.time() - start_time:.2f}s)"
         )
 
-        self.tts_models[aivm_uuid] = tts_model
+        self.tts_models.put(
+            aivm_uuid, tts_model, size=aivm_info.file_path.stat().st_size
+        )
         return tts_model
 
     def is_model_loaded(self, aivm_uuid: str) -> bool:
@@ -240,6 +447,203 @@ class StyleBertVITS2TTSEngine(TTSEngine):
 
         return aivm_uuid in self.tts_models
 
+    def get_model_cache_statistics(self) -> CacheStatistics:
+        """
+        ロード済みモデルのキャッシュの統計情報 (ヒット・ミス・アンロード回数、ロード済みモデル数、推定メモリ使用量) を返す
+        継承元の TTSEngine には存在しない、StyleBertVITS2TTSEngine 固有のメソッド
+
+        Returns
+        -------
+        CacheStatistics
+            ロード済みモデルのキャッシュの統計情報
+        """
+
+        return self.tts_models.statistics()
+
+    def get_cache_statistics(self) -> dict[str, CacheStatistics]:
+        """
+        エンジン内部のキャッシュの統計情報を、キャッシュの名前をキーとして取得する
+        継承元の TTSEngine.get_cache_statistics() をオーバーライドし、Style-Bert-VITS2 固有のキャッシュの統計情報を返す
+
+        Returns
+        -------
+        dict[str, CacheStatistics]
+            キャッシュの名前をキーとした統計情報
+        """
+
+        cache_statistics = {"model": self.get_model_cache_statistics()}
+        if self.bert_feature_cache is not None:
+            cache_statistics["bert_feature"] = self.bert_feature_cache.statistics()
+        if self.accent_phrase_cache is not None:
+            cache_statistics["accent_phrase"] = self.accent_phrase_cache.statistics()
+        return cache_statistics
+
+    def get_inference_statistics(self) -> InferenceSchedulerStatistics | None:
+        """
+        推論スケジューラの統計情報 (同時実行数・待ち行列の長さ・待ち時間など) を取得する
+        継承元の TTSEngine.get_inference_statistics() をオーバーライドしている
+
+        Returns
+        -------
+        InferenceSchedulerStatistics | None
+            推論スケジューラの統計情報
+        """
+
+        return self.inference_scheduler.statistics()
+
+    def get_model_warmup_statuses(self) -> dict[str, ModelWarmupStatus]:
+        """
+        AIVM の UUID をキーとした、音声合成モデルのウォームアップの状態を取得する
+        継承元の TTSEngine.get_model_warmup_statuses() をオーバーライドしている
+
+        Returns
+        -------
+        dict[str, ModelWarmupStatus]
+            ウォームアップ対象の AIVM の UUID をキーとしたウォームアップの状態
+        """
+
+        if self.model_warmer is None:
+            return {}
+        return self.model_warmer.statuses()
+
+    def is_ready(self) -> bool:
+        """
+        音声合成モデルのウォームアップが全て完了し、リクエストを遅延なく処理できる状態かどうかを取得する
+        継承元の TTSEngine.is_ready() をオーバーライドしている
+
+        Returns
+        -------
+        bool
+            ウォームアップ対象の全ての音声合成モデルのウォームアップが完了しているかどうか
+        """
+
+        if self.model_warmer is None:
+            return True
+        return self.model_warmer.is_ready()
+
+    def _resolve_warmup_targets(
+        self, preload_models: Sequence[str], preload_style_ids: Sequence[StyleId]
+    ) -> dict[str, list[StyleId] | None]:
+        """
+        事前にロードする AIVM の UUID・スタイル ID のリストから、ウォームアップ対象の AIVM の UUID と
+        ダミーの推論を行うスタイル ID のリスト (None なら全てのスタイル) を求める
+        """
+
+        warmup_targets: dict[str, list[StyleId] | None] = {
+            aivm_uuid: None for aivm_uuid in preload_models
+        }
+        for style_id in preload_style_ids:
+            try:
+                aivm_manifest = self.aivm_manager.get_style_index_entry(
+                    style_id
+                ).aivm_manifest
+            except HTTPException:
+                logger.warning(f"Style ID {style_id} to preload is not found. Skipped.")
+                continue
+            aivm_uuid = str(aivm_manifest.uuid)
+            if aivm_uuid not in warmup_targets:
+                warmup_targets[aivm_uuid] = []
+            style_ids = warmup_targets[aivm_uuid]
+            if style_ids is not None and style_id not in style_ids:
+                style_ids.append(style_id)
+        return warmup_targets
+
+    def _get_style_ids(self, aivm_uuid: str) -> list[StyleId]:
+        """AIVM の UUID に対応する音声合成モデルの全てのスタイル ID を返す"""
+
+        aivm_info = self.aivm_manager.get_aivm_info(aivm_uuid)
+        return [
+            style.id
+            for library_speaker in aivm_info.speakers
+            for style in library_speaker.speaker.styles
+        ]
+
+    def _warmup_style(self, style_id: StyleId) -> None:
+        """
+        スタイル ID に対応するスタイルで、テキスト解析から推論までダミーの音声合成を 1 回実行する
+        推論スケジューラ上では、1 件ずつの音声合成より後回しにする
+        """
+
+        query = AudioQuery(
+            accent_phrases=self.create_accent_phrases(self.WARMUP_TEXT, style_id),
+            speedScale=1.0,
+            intonationScale=1.0,
+            tempoDynamicsScale=1.0,
+            pitchScale=0.0,
+            volumeScale=1.0,
+            prePhonemeLength=0.1,
+            postPhonemeLength=0.1,
+            pauseLength=None,
+            pauseLengthScale=1.0,
+            outputSamplingRate=self.default_sampling_rate,
+            outputStereo=False,
+            kana=self.WARMUP_TEXT,
+        )
+        self._synthesize_wave(query, style_id, InferencePriority.BATCH)
+
+    def _on_aivm_installed(self, aivm_uuid: str) -> None:
+        """音声合成モデルがインストール・更新されたときに AivmManager から呼ばれる"""
+
+        # 更新前の AIVMX ファイルからロードされたモデルが残っていれば、次の音声合成時に新しいファイルからロードし直すようアンロードする
+        if self.tts_models.pop(aivm_uuid) is not None:
+            logger.info(f"Model {aivm_uuid} unloaded because it was updated.")
+        # 更新前の AIVMX ファイルから作成した最適化済みモデルは二度と使われないため、ここで削除する
+        if self.optimized_onnx_model_cache is not None:
+            self.optimized_onnx_model_cache.prune()
+        if self.model_warmer is not None:
+            self.model_warmer.warmup(aivm_uuid)
+
+    def get_synthesis_model_version(self, style_id: StyleId) -> str:
+        """
+        指定されたスタイル ID の音声合成に使われるモデルのバージョンを表す文字列を取得する
+        継承元の TTSEngine.get_synthesis_model_version() をオーバーライドし、
+        同じ UUID のまま AIVMX ファイルが更新された場合も区別できるよう、AIVM マニフェストのバージョンとファイルの更新日時を含める
+        さらに、推論結果を左右するエンジンの設定 (推論デバイス・ONNX Runtime のセッションの設定・長いテキストの分割単位など) も含める
+
+        Parameters
+        ----------
+        style_id : StyleId
+            スタイル ID
+
+        Returns
+        -------
+        str
+            音声合成モデルのバージョンを表す文字列
+        """
+
+        aivm_manifest = self.aivm_manager.get_style_index_entry(style_id).aivm_manifest
+        aivm_info = self.aivm_manager.get_aivm_info(str(aivm_manifest.uuid))
+        mtime_ns = aivm_info.file_path.stat().st_mtime_ns
+
+        # 推論デバイスや量子化・グラフ最適化などのセッションの設定が変わると、同じモデルでも音声がわずかに変わる
+        ## エンジンの設定を変えて再起動した際に、ディスク上のキャッシュから以前の設定での音声を返さないよう含めておく
+        session_fingerprint = self.onnx_session_configurator.fingerprint(str(aivm_manifest.uuid))  # fmt: skip
+        providers = ",".join(
+            provider if isinstance(provider, str) else provider[0]
+            for provider in self.onnx_providers
+        )
+        optimized = (
+            "optimized" if self.optimized_onnx_model_cache is not None else "raw"
+        )
+        ## 長いテキストを分割して推論する場合も、分割位置が変わると音声が変わるため、分割の単位となるモーラ数を含める
+        return (
+            f"{aivm_manifest.uuid}:{aivm_manifest.version}:{mtime_ns}:"
+            f"{providers}:{optimized}:{session_fingerprint}:"
+            f"chunk{max(0, self.long_text_chunk_moras)}"
+        )
+
+    def _on_model_evicted(self, aivm_uuid: str, tts_model: TTSModel) -> None:
+        """上限超過によりロード済みモデルがキャッシュから破棄されたときに呼ばれる"""
+
+        statistics = self.tts_models.statistics()
+        logger.info(
+            f"Model {aivm_uuid} unloaded to stay within the model cache limit. "
+            f"(loaded: {statistics.entries} models / {statistics.total_bytes / 1024 / 1024:.1f}MB, "
+            f"hits: {statistics.hits}, misses: {statistics.misses}, evictions: {statistics.evictions})"
+        )
+        if self.model_warmer is not None:
+            self.model_warmer.mark_unloaded(aivm_uuid)
+
     def create_accent_phrases(self, text: str, style_id: StyleId) -> list[AccentPhrase]:
         """
         テキストからアクセント句系列を生成する
@@ -269,6 +673,38 @@ class StyleBertVITS2TTSEngine(TTSEngine):
         ## Style-Bert-VITS2 では「〜」などの伸ばす棒も長音記号として扱うため、normalize_text() でそれらを統一する
         normalized_text = normalize_text(text)
 
+        # 正規化済みテキストからアクセント句系列を生成
+        ## 同じテキストの解析結果がキャッシュにあれば、g2p 処理を省略してキャッシュから取得する
+        if self.accent_phrase_cache is not None:
+            accent_phrases = self.accent_phrase_cache.get_accent_phrases(
+                normalized_text, self._analyze_accent_phrases
+            )
+        else:
+            accent_phrases = self._analyze_accent_phrases(normalized_text)
+
+        # ダミーの音素長・モーラ音高を生成
+        ## VOICEVOX ENGINE と異なりスタイル ID に基づいてその音素長・モーラ音高を更新することは原理上不可能なため、
+        ## 音素長・モーラ音高は常にダミー値で返される
+        ## 下記の処理ですでにダミーデータは入れられているのだが、念のため
+        accent_phrases = self.update_length_and_pitch(accent_phrases, style_id)
+        return accent_phrases
+
+    def _analyze_accent_phrases(self, normalized_text: str) -> list[AccentPhrase]:
+        """
+        Style-Bert-VITS2 の基準で正規化済みのテキストに g2p 処理を行い、アクセント句系列を生成する
+        create_accent_phrases() の実体で、解析結果はスタイル ID に依存しないため、テキストの言語解析結果のキャッシュに格納される
+
+        Parameters
+        ----------
+        normalized_text : str
+            正規化済みテキスト
+
+        Returns
+        -------
+        list[AccentPhrase]
+            アクセント句系列
+        """
+
         # g2p 処理を行い、テキストからモーラ情報と音高 (0 or 1) のリストを取得
         ## Style-Bert-VITS2 側では、pyopenjtalk_g2p_prosody() から取得したアクセント情報が含まれるモーラのリストを
         ## モーラ情報と音高のリストに変換し (句読点や記号は失われている) 、後付けで失われた句読点や記号のモーラを適切な位置に追加する形で実装されている
@@ -405,11 +841,6 @@ class StyleBertVITS2TTSEngine(TTSEngine):
                 )
             )
 
-        # ダミーの音素長・モーラ音高を生成
-        ## VOICEVOX ENGINE と異なりスタイル ID に基づいてその音素長・モーラ音高を更新することは原理上不可能なため、
-        ## 音素長・モーラ音高は常にダミー値で返される
-        ## 上記処理ですでにダミーデータは入れられているのだが、念のため
-        accent_phrases = self.update_length_and_pitch(accent_phrases, style_id)
         return accent_phrases
 
     def update_length(
@@ -471,8 +902,184 @@ class StyleBertVITS2TTSEngine(TTSEngine):
             生成された音声波形 (float32 型)
         """
 
+        return self._synthesize_wave(query, style_id, InferencePriority.INTERACTIVE)
+
+    def _synthesize_wave(
+        self,
+        query: AudioQuery,
+        style_id: StyleId,
+        priority: InferencePriority,
+    ) -> NDArray[np.float32]:
+        """synthesize_wave() / synthesize_waves() の実装本体で、推論スケジューラでの優先度を指定して音声波形を生成する"""
+
         # モーフィング時などに同一参照の AudioQuery で複数回呼ばれる可能性があるので、元の引数の AudioQuery に破壊的変更を行わない
-        query = copy.deepcopy(query)
+        ## 以降の処理は AudioQuery を読み取るだけで書き換えないため、コピーせずにそのまま参照する
+        ## モーラ数の多い長いテキストでは、AudioQuery の deepcopy だけで推論前の CPU 時間の無視できない割合を占めていた
+
+        # 読み上げテキストと、AudioQuery.accent_phrases から変換したカタカナモーラと音高 (0 or 1) のリストを取得
+        text = self._get_synthesis_text(query)
+        kata_tone_list = _accent_phrases_to_kata_tone_list(query.accent_phrases)
+
+        # 音声合成モデルと推論パラメータを取得
+        ## クライアントとの接続が切断されていれば、モデルのロードや推論の前に打ち切る
+        raise_if_cancelled()
+        model, inference_parameters = self._prepare_inference(query, style_id)
+
+        # 音声合成を実行
+        ## 長いテキストは文末・句の区切りで分割して推論し、短いクロスフェードで連結する
+        if 0 < self.long_text_chunk_moras < len(kata_tone_list):
+            raw_sample_rate, raw_wave = self._infer_long_text(
+                model, inference_parameters, text, kata_tone_list, priority
+            )
+        else:
+            raw_sample_rate, raw_wave = self._infer(
+                model, inference_parameters, text, kata_tone_list, priority
+            )
+        raise_if_cancelled()
+
+        # 前後の無音区間を追加
+        raw_wave = _add_silence(
+            raw_wave,
+            raw_sample_rate,
+            query.prePhonemeLength,
+            query.postPhonemeLength,
+        )
+
+        # 生成した音声の音量調整/サンプルレート変更/ステレオ化を行ってから返す
+        wave = raw_wave_to_output_wave(query, raw_wave, raw_sample_rate)
+        return wave
+
+    def synthesize_waves(
+        self,
+        queries: list[AudioQuery],
+        style_id: StyleId,
+        enable_interrogative_upspeak: bool = True,
+    ) -> list[NDArray[np.float32]]:
+        """
+        複数の音声合成用のクエリから Style-Bert-VITS2 で音声波形をまとめて生成する
+        継承元の TTSEngine.synthesize_waves() をオーバーライドし、スタイルの解決とモデルのロードを 1 回にまとめた上で、
+        前処理と推論を重ね合わせられるよう複数のクエリを並行して音声合成する
+
+        Parameters
+        ----------
+        queries : list[AudioQuery]
+            音声合成用のクエリのリスト
+        style_id : StyleId
+            スタイル ID
+        enable_interrogative_upspeak : bool, optional
+            疑問文の場合に抑揚を上げるかどうか (VOICEVOX ENGINE との互換性維持のためのパラメータ)
+
+        Returns
+        -------
+        list[NDArray[np.float32]]
+            クエリと同じ順序で並んだ、生成された音声波形 (float32 型) のリスト
+        """
+
+        if len(queries) == 0:
+            return []
+
+        # 存在しないスタイル ID のエラーを最初に返し、かつモデルのロードが並行して走らないよう、先にモデルをロードしておく
+        self.initialize_synthesis(style_id, skip_reinit=True)
+
+        # まとめての音声合成は、推論スケジューラ上で 1 件ずつの音声合成より後回しにする
+        if len(queries) == 1:
+            return [self._synthesize_wave(queries[0], style_id, InferencePriority.BATCH)]  # fmt: skip
+
+        # キャンセル要求のトークンを参照できるよう、呼び出し元のコンテキストをクエリごとに複製して音声合成する
+        ## 素の ThreadPoolExecutor のスレッドには ContextVar が引き継がれないため、複製しないと途中でキャンセルできない
+        max_workers = min(len(queries), self.MAX_BATCH_SYNTHESIS_WORKERS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._synthesize_wave,
+                    query,
+                    style_id,
+                    InferencePriority.BATCH,
+                )
+                for query in queries
+            ]
+            return [future.result() for future in futures]
+
+    def synthesize_wave_stream(
+        self,
+        query: AudioQuery,
+        style_id: StyleId,
+        enable_interrogative_upspeak: bool = True,
+    ) -> Iterator[NDArray[np.float32]]:
+        """
+        音声合成用のクエリを文末記号 (。！？ など) の位置で文ごとに分割して Style-Bert-VITS2 で推論し、
+        推論が完了した文から順に音声波形を返す
+        継承元の TTSEngine.synthesize_wave_stream() をオーバーライドし、文ごとの分割合成に差し替えている
+        長いテキストであっても、最初の文の推論が終わった時点で音声波形を返し始められる
+
+        Parameters
+        ----------
+        query : AudioQuery
+            音声合成用のクエリ
+        style_id : StyleId
+            スタイル ID
+        enable_interrogative_upspeak : bool, optional
+            疑問文の場合に抑揚を上げるかどうか (VOICEVOX ENGINE との互換性維持のためのパラメータ)
+
+        Yields
+        ------
+        NDArray[np.float32]
+            文ごとに生成された音声波形 (float32 型)
+        """
+
+        # モーフィング時などに同一参照の AudioQuery で複数回呼ばれる可能性があるので、元の引数の AudioQuery に破壊的変更を行わない
+        ## 以降の処理は AudioQuery を読み取るだけで書き換えないため、コピーせずにそのまま参照する
+
+        # 読み上げテキストと、AudioQuery.accent_phrases から変換したカタカナモーラと音高 (0 or 1) のリストを取得
+        text = self._get_synthesis_text(query)
+        kata_tone_list = _accent_phrases_to_kata_tone_list(query.accent_phrases)
+
+        # 音声合成モデルと推論パラメータを取得
+        raise_if_cancelled()
+        model, inference_parameters = self._prepare_inference(query, style_id)
+
+        # 読み上げテキストとカタカナモーラと音高のリストを文ごとに分割
+        segments = _split_text_and_kata_tone_list_into_sentences(text, kata_tone_list)
+        logger.info(f"Streaming synthesis: {len(segments)} segment(s).")
+
+        for index, (segment_text, segment_kata_tone_list) in enumerate(segments):
+            # 文ごとの推論の前に、クライアントとの接続が切断されていれば打ち切る
+            raise_if_cancelled()
+            # 2 文目以降は既に受け付けたリクエストの続きのため、待ち行列が埋まっていても途中で打ち切らない
+            raw_sample_rate, raw_wave = self._infer(
+                model,
+                inference_parameters,
+                segment_text,
+                segment_kata_tone_list,
+                enforce_queue_limit=index == 0,
+            )
+
+            # 最初の文の前・最後の文の後にのみ無音区間を追加
+            raw_wave = _add_silence(
+                raw_wave,
+                raw_sample_rate,
+                query.prePhonemeLength if index == 0 else 0.0,
+                query.postPhonemeLength if index == len(segments) - 1 else 0.0,
+            )
+
+            # 生成した音声の音量調整/サンプルレート変更/ステレオ化を行ってから返す
+            yield raw_wave_to_output_wave(query, raw_wave, raw_sample_rate)
+
+    def _get_synthesis_text(self, query: AudioQuery) -> str:
+        """
+        音声合成用のクエリから Style-Bert-VITS2 に渡す読み上げテキストを取得する
+
+        Parameters
+        ----------
+        query : AudioQuery
+            音声合成用のクエリ
+
+        Returns
+        -------
+        str
+            読み上げテキスト (空文字列の場合もある)
+        """
 
         # もし AudioQuery.kana に漢字混じりの通常の文章が指定されている場合はそれを使う (AivisSpeech 独自仕様)
         ## VOICEVOX ENGINE では AudioQuery.kana は読み取り専用パラメータだが、AivisSpeech Engine では
@@ -495,7 +1102,13 @@ class StyleBertVITS2TTSEngine(TTSEngine):
                 last_mora = query.accent_phrases[-1].moras[-1]
                 if last_mora.text == "ガ":
                     # Style-Bert-VITS2 側の g2p 処理を呼び、カタカナ化されたモーラのリストを取得
-                    kata_mora_list = g2kata_tone(normalize_text(text))
+                    ## 同じテキストの解析結果がキャッシュにあれば、g2p 処理を省略してキャッシュから取得する
+                    if self.accent_phrase_cache is not None:
+                        kata_mora_list = self.accent_phrase_cache.get_kata_tone_list(
+                            normalize_text(text), g2kata_tone
+                        )
+                    else:
+                        kata_mora_list = g2kata_tone(normalize_text(text))
                     # kata_mora_list の最後のモーラが "ガ" でない場合は "ガ" を追加
                     if len(kata_mora_list) > 0 and kata_mora_list[-1][0] != "ガ":
                         text += "ガ"
@@ -510,72 +1123,45 @@ class StyleBertVITS2TTSEngine(TTSEngine):
             if text == "。":
                 text = ""
 
-        # AudioQuery.accent_phrase をカタカナモーラと音高 (0 or 1) のリストに変換
-        kata_tone_list: list[tuple[str, int]] = []
-        for accent_phrase in query.accent_phrases:
-            # モーラのうちどこがアクセント核かを示すインデックス
-            accent_index = accent_phrase.accent - 1  # 1-indexed -> 0-indexed
-            for index, mora in enumerate(accent_phrase.moras):
-                tone = 0
-                # index が 0 かつ accent_index が 0 以外の時は常に tone を 0 にする
-                if index == 0 and accent_index != 0:
-                    tone = 0
-                # index <= accent_index の時は tone を 1 にする
-                elif index <= accent_index:
-                    tone = 1
-                # それ以外の時は tone を 0 にする
-                else:
-                    tone = 0
-                # モーラのテキストと音高をリストに追加
-                kata_tone_list.append((mora.text, tone))
-            # もし pause_mora があればそれも追加
-            ## AivisSpeech Engine から取得した AudioQuery がそのまま送られた際は pause_mora は設定されず、
-            ## 句読点や記号は通常の mora (vowel=pau) として text 内の記号表現を維持した状態で含まれる
-            ## 一方 AivisSpeech エディタ側で読みが編集されている際は AudioQuery に pause_mora が設定されていることがあるため、
-            ## 互換性のために pause_mora が設定されている場合のみ読点として追加する
-            if accent_phrase.pause_mora is not None:
-                kata_tone_list.append((',', 0))  # テキストは "," 固定 ("," は正規化後の読点の文字列表現) 、音高は 0 固定  # fmt: skip
+        return text
 
-        # 音素と音高のリストに変換した後、さらにそれぞれ音素・音高だけのリストに変換
-        ## text が空文字列の時は、InvalidToneError を回避するために None を渡す
-        if text != "":
-            # 事前にカタカナ表記でない音素と音高のリストに変換するのが大変重要
-            ## これをやらないと InvalidToneError が発生する
-            ## Mora.consonant / Mora.vowel に入れられた子音/母音は VOICEVOX ENGINE 互換の表現で Style-Bert-VITS2 とは
-            ## 微妙に異なるため採用せず、常に Mora.text に記載のカタカナのみから音素と音高を取得する
-            ## VOICEVOX ENGINE 互換にする際に記号モーラの Mora.vowel が "pau" に統一されてしまう兼ね合いもある
-            phone_tone_list = kata_tone2phone_tone(kata_tone_list)
-            given_phone_list = [phone for phone, _ in phone_tone_list]
-            given_tone_list = [tone for _, tone in phone_tone_list]
-        else:
-            given_phone_list = None
-            given_tone_list = None
+    def _prepare_inference(
+        self, query: AudioQuery, style_id: StyleId
+    ) -> tuple[TTSModel, _InferenceParameters]:
+        """
+        スタイル ID に対応する音声合成モデルをロードし、音声合成用のクエリを Style-Bert-VITS2 の推論パラメータに変換する
 
-        # スタイル ID に対応する AivmManifest, AivmManifestSpeaker, AivmManifestSpeakerStyle を取得
-        result = self.aivm_manager.get_aivm_manifest_from_style_id(style_id)
-        aivm_manifest = result[0]
-        aivm_manifest_speaker = result[1]
-        aivm_manifest_speaker_style = result[2]
+        Parameters
+        ----------
+        query : AudioQuery
+            音声合成用のクエリ
+        style_id : StyleId
+            スタイル ID
+
+        Returns
+        -------
+        tuple[TTSModel, _InferenceParameters]
+            ロード済みの音声合成モデルと推論パラメータ
+        """
+
+        # スタイル ID に対応する AivmManifest, AivmManifestSpeaker, AivmManifestSpeakerStyle を索引から取得
+        style_index_entry = self.aivm_manager.get_style_index_entry(style_id)
+        aivm_manifest = style_index_entry.aivm_manifest
+        aivm_manifest_speaker = style_index_entry.aivm_manifest_speaker
+        aivm_manifest_speaker_style = style_index_entry.aivm_manifest_style
 
         # 音声合成モデルをロード (初回のみ)
         model = self.load_model(str(aivm_manifest.uuid))
         logger.info(f"Model: {aivm_manifest.name} / Version {aivm_manifest.version}")  # fmt: skip
         logger.info(f"Speaker: {aivm_manifest_speaker.name} / Style: {aivm_manifest_speaker_style.name}")  # fmt: skip
 
-        # ローカルな話者 ID・スタイル ID を取得
+        # ローカルな話者 ID・スタイル名を取得
         ## 現在の Style-Bert-VITS2 の API ではスタイル ID ではなくスタイル名を指定する必要があるため、
-        ## 別途 local_style_id に対応するスタイル名をハイパーパラメータから取得している
-        ## AIVM マニフェスト記載のスタイル名とハイパーパラメータのスタイル名は必ずしも一致しないため (通常一致するはずだが…) 、
-        ## 万が一に備え AIVM マニフェストとハイパーパラメータで共通のスタイル ID からスタイル名を取得する
+        ## 索引の構築時に AIVM マニフェストとハイパーパラメータで共通のスタイル ID から取得しておいたスタイル名を利用する
         local_speaker_id: int = aivm_manifest_speaker.local_id
-        local_style_id: int = aivm_manifest_speaker_style.local_id
-        local_style_name: str | None = None
-        for hps_style_name, hps_style_id in model.hyper_parameters.data.style2id.items():  # fmt: skip
-            if hps_style_id == local_style_id:
-                local_style_name = hps_style_name
-                break
+        local_style_name = style_index_entry.local_style_name
         if local_style_name is None:
-            raise ValueError(f"Style ID {local_style_id} not found in hyper parameters.")  # fmt: skip
+            raise ValueError(f"Style ID {style_index_entry.hyper_parameters_style_id} not found in hyper parameters.")  # fmt: skip
 
         # 話速
         ## ref: https://github.com/litagin02/Style-Bert-VITS2/blob/2.4.1/server_editor.py#L314
@@ -612,10 +1198,6 @@ class StyleBertVITS2TTSEngine(TTSEngine):
         ## pitchScale の基準は 0.0 (-1 ~ 1) なので、1.0 を基準とした 0 ~ 2 の範囲に変換する
         pitch_scale = max(0.0, 1.0 + query.pitchScale)
 
-        # 音声合成を実行
-        ## 出力音声は int16 型の NDArray で返される
-        logger.info("Running inference...")
-        logger.info(f"Text: {text}")
         logger.info(f"         Speed: {length:.2f} (Input: {query.speedScale:.2f})")
         logger.info(f"  Style Weight: {style_weight:.2f} (Input: {query.intonationScale:.2f})")  # fmt: skip
         logger.info(f"Tempo Dynamics: {sdp_ratio:.2f} (Input: {query.tempoDynamicsScale:.2f})")  # fmt: skip
@@ -623,38 +1205,192 @@ class StyleBertVITS2TTSEngine(TTSEngine):
         logger.info(f"        Volume: {query.volumeScale:.2f}")
         logger.info(f"   Pre-Silence: {query.prePhonemeLength:.2f}")
         logger.info(f"  Post-Silence: {query.postPhonemeLength:.2f}")
-        start_time = time.time()
-        raw_sample_rate, raw_wave = model.infer(
-            text=text,
-            given_phone=given_phone_list,
-            given_tone=given_tone_list,
-            language=Languages.JP,
-            speaker_id=local_speaker_id,
-            style=local_style_name,
+
+        return model, _InferenceParameters(
+            local_speaker_id=local_speaker_id,
+            local_style_name=local_style_name,
             style_weight=style_weight,
             sdp_ratio=sdp_ratio,
             length=length,
             pitch_scale=pitch_scale,
-            # AivisSpeech Engine ではテキストの改行ごとの分割生成を行わない (エディタ側の機能と競合するため)
-            # line_split=True だと音素やアクセントの指定ができない
-            line_split=False,
         )
+
+    def _infer(
+        self,
+        model: TTSModel,
+        inference_parameters: _InferenceParameters,
+        text: str,
+        kata_tone_list: list[tuple[str, int]],
+        priority: InferencePriority = InferencePriority.INTERACTIVE,
+        enforce_queue_limit: bool = True,
+    ) -> tuple[int, NDArray[np.float32]]:
+        """
+        読み上げテキストとカタカナモーラと音高のリストから、Style-Bert-VITS2 で音声波形を推論する
+
+        Parameters
+        ----------
+        model : TTSModel
+            ロード済みの音声合成モデル
+        inference_parameters : _InferenceParameters
+            推論パラメータ
+        text : str
+            読み上げテキスト
+        kata_tone_list : list[tuple[str, int]]
+            読み上げテキストに対応するカタカナモーラと音高 (0 or 1) のリスト
+        priority : InferencePriority, optional
+            推論スケジューラでの優先度
+        enforce_queue_limit : bool, optional
+            推論スケジューラの待ち行列の上限を適用するかどうか
+
+        Returns
+        -------
+        tuple[int, NDArray[np.float32]]
+            サンプリングレートと、-1.0 ~ 1.0 の範囲に正規化された音声波形 (float32 型)
+
+        Raises
+        ------
+        InferenceQueueFullError
+            推論スケジューラの待ち行列が上限に達している場合
+        SynthesisCancelledError
+            推論の途中で音声合成がキャンセルされた場合
+        """
+
+        # 音素と音高のリストに変換した後、さらにそれぞれ音素・音高だけのリストに変換
+        ## text が空文字列の時は、InvalidToneError を回避するために None を渡す
+        if text != "":
+            # 事前にカタカナ表記でない音素と音高のリストに変換するのが大変重要
+            ## これをやらないと InvalidToneError が発生する
+            ## Mora.consonant / Mora.vowel に入れられた子音/母音は VOICEVOX ENGINE 互換の表現で Style-Bert-VITS2 とは
+            ## 微妙に異なるため採用せず、常に Mora.text に記載のカタカナのみから音素と音高を取得する
+            ## VOICEVOX ENGINE 互換にする際に記号モーラの Mora.vowel が "pau" に統一されてしまう兼ね合いもある
+            phone_tone_list = kata_tone2phone_tone(kata_tone_list)
+            given_phone_list = [phone for phone, _ in phone_tone_list]
+            given_tone_list = [tone for _, tone in phone_tone_list]
+        else:
+            given_phone_list = None
+            given_tone_list = None
+
+        # 音声合成を実行
+        ## 出力音声は int16 型の NDArray で返される
+        # 推論スケジューラで実行枠を確保してから推論する
+        ## 同時に走る推論の数を制限し、CPU スレッドの奪い合いによるレイテンシの悪化を防ぐ
+        ## 実行枠を待っている間にキャンセルされた場合は、待ち行列から抜けて SynthesisCancelledError が送出される
+        ## 推論中の g2p と BERT 、BERT と VITS の間のキャンセルポイントは install_cancellation_points() で差し込んでいる
+        with self.inference_scheduler.acquire(priority, enforce_queue_limit):
+            logger.info("Running inference...")
+            logger.info(f"Text: {text}")
+            start_time = time.time()
+            raw_sample_rate, raw_wave = model.infer(
+                text=text,
+                given_phone=given_phone_list,
+                given_tone=given_tone_list,
+                language=Languages.JP,
+                speaker_id=inference_parameters.local_speaker_id,
+                style=inference_parameters.local_style_name,
+                style_weight=inference_parameters.style_weight,
+                sdp_ratio=inference_parameters.sdp_ratio,
+                length=inference_parameters.length,
+                pitch_scale=inference_parameters.pitch_scale,
+                # AivisSpeech Engine ではテキストの改行ごとの分割生成を行わない (エディタ側の機能と競合するため)
+                # line_split=True だと音素やアクセントの指定ができない
+                line_split=False,
+            )
         logger.info("Inference done. Elapsed time: {:.2f} sec.".format(time.time() - start_time))  # fmt: skip
 
         # VOICEVOX CORE は float32 型の音声波形を返すため、int16 から float32 に変換して VOICEVOX CORE に合わせる
         ## float32 に変換する際に -1.0 ~ 1.0 の範囲に正規化する
-        raw_wave = raw_wave.astype(np.float32) / 32768.0
+        return raw_sample_rate, raw_wave.astype(np.float32) / 32768.0
 
-        # 前後の無音区間を追加
-        pre_silence_length = int(raw_sample_rate * query.prePhonemeLength)
-        post_silence_length = int(raw_sample_rate * query.postPhonemeLength)
-        silence_wave_pre = np.zeros(pre_silence_length, dtype=np.float32)
-        silence_wave_post = np.zeros(post_silence_length, dtype=np.float32)
-        raw_wave = np.concatenate((silence_wave_pre, raw_wave, silence_wave_post))
+    def _infer_long_text(
+        self,
+        model: TTSModel,
+        inference_parameters: _InferenceParameters,
+        text: str,
+        kata_tone_list: list[tuple[str, int]],
+        priority: InferencePriority,
+    ) -> tuple[int, NDArray[np.float32]]:
+        """
+        長い読み上げテキストを文末・句の区切りで分割し、まとまりごとに推論した音声波形を連結する
+        分割した各まとまりの前後の無音区間は切り詰め、文末・句の区切りごとに一定の長さの無音区間を挟んで連結する
 
-        # 生成した音声の音量調整/サンプルレート変更/ステレオ化を行ってから返す
-        wave = raw_wave_to_output_wave(query, raw_wave, raw_sample_rate)
-        return wave
+        Parameters
+        ----------
+        model : TTSModel
+            ロード済みの音声合成モデル
+        inference_parameters : _InferenceParameters
+            推論パラメータ
+        text : str
+            読み上げテキスト
+        kata_tone_list : list[tuple[str, int]]
+            読み上げテキストに対応するカタカナモーラと音高 (0 or 1) のリスト
+        priority : InferencePriority
+            推論スケジューラでの優先度
+
+        Returns
+        -------
+        tuple[int, NDArray[np.float32]]
+            サンプリングレートと、-1.0 ~ 1.0 の範囲に正規化された音声波形 (float32 型)
+        """
+
+        chunks = _split_text_and_kata_tone_list_into_chunks(
+            text, kata_tone_list, self.long_text_chunk_moras
+        )
+        logger.info(f"Long text synthesis: {len(chunks)} chunk(s).")
+        if len(chunks) == 1:
+            return self._infer(
+                model, inference_parameters, text, kata_tone_list, priority
+            )
+
+        def infer_chunk(index: int) -> tuple[int, NDArray[np.float32]]:
+            # 各まとまりの推論の前に、クライアントとの接続が切断されていれば打ち切る
+            raise_if_cancelled()
+            chunk_text, chunk_kata_tone_list, _ = chunks[index]
+            # 2 つ目以降のまとまりは既に受け付けたリクエストの続きのため、待ち行列が埋まっていても途中で打ち切らない
+            return self._infer(
+                model,
+                inference_parameters,
+                chunk_text,
+                chunk_kata_tone_list,
+                priority,
+                enforce_queue_limit=index == 0,
+            )
+
+        if self.long_text_max_workers == 1:
+            results = [infer_chunk(index) for index in range(len(chunks))]
+        else:
+            # キャンセル要求のトークンを参照できるよう、呼び出し元のコンテキストをまとまりごとに複製して推論する
+            with ThreadPoolExecutor(
+                max_workers=min(len(chunks), self.long_text_max_workers)
+            ) as executor:
+                futures = [
+                    executor.submit(contextvars.copy_context().run, infer_chunk, index)
+                    for index in range(len(chunks))
+                ]
+                results = [future.result() for future in futures]
+
+        raw_sample_rate = results[0][0]
+        raw_waves = [
+            # 最初のまとまりの前・最後のまとまりの後の無音区間は、分割しない場合と揃えるため切り詰めない
+            trim_silence(
+                raw_wave,
+                raw_sample_rate,
+                trim_head=index > 0,
+                trim_tail=index < len(results) - 1,
+            )
+            for index, (_, raw_wave) in enumerate(results)
+        ]
+        gap_seconds = [
+            (
+                self.LONG_TEXT_SENTENCE_PAUSE_SECONDS
+                if is_sentence_end
+                else self.LONG_TEXT_CLAUSE_PAUSE_SECONDS
+            )
+            * inference_parameters.length
+            for _, _, is_sentence_end in chunks[:-1]
+        ]
+        return raw_sample_rate, concatenate_with_crossfade(
+            raw_waves, raw_sample_rate, gap_seconds
+        )
 
     def initialize_synthesis(self, style_id: StyleId, skip_reinit: bool) -> None:
         """指定されたスタイル ID に関する合成機能を初期化する。既に初期化されていた場合は引数に応じて再初期化する。"""
@@ -781,3 +1517,172 @@ def _sep_kata_with_joshi2sep_phonemes_with_joshi(
         sep_phonemes_with_joshi.append(sep_phonemes_with_joshi_element)
 
     return sep_phonemes_with_joshi
+
+
+def _accent_phrases_to_kata_tone_list(
+    accent_phrases: list[AccentPhrase],
+) -> list[tuple[str, int]]:
+    """
+    AudioQuery.accent_phrases をカタカナモーラと音高 (0 or 1) のリストに変換する
+    """
+
+    kata_tone_list: list[tuple[str, int]] = []
+    for accent_phrase in accent_phrases:
+        # モーラのうちどこがアクセント核かを示すインデックス
+        accent_index = accent_phrase.accent - 1  # 1-indexed -> 0-indexed
+        for index, mora in enumerate(accent_phrase.moras):
+            tone = 0
+            # index が 0 かつ accent_index が 0 以外の時は常に tone を 0 にする
+            if index == 0 and accent_index != 0:
+                tone = 0
+            # index <= accent_index の時は tone を 1 にする
+            elif index <= accent_index:
+                tone = 1
+            # それ以外の時は tone を 0 にする
+            else:
+                tone = 0
+            # モーラのテキストと音高をリストに追加
+            kata_tone_list.append((mora.text, tone))
+        # もし pause_mora があればそれも追加
+        ## AivisSpeech Engine から取得した AudioQuery がそのまま送られた際は pause_mora は設定されず、
+        ## 句読点や記号は通常の mora (vowel=pau) として text 内の記号表現を維持した状態で含まれる
+        ## 一方 AivisSpeech エディタ側で読みが編集されている際は AudioQuery に pause_mora が設定されていることがあるため、
+        ## 互換性のために pause_mora が設定されている場合のみ読点として追加する
+        if accent_phrase.pause_mora is not None:
+            kata_tone_list.append((',', 0))  # テキストは "," 固定 ("," は正規化後の読点の文字列表現) 、音高は 0 固定  # fmt: skip
+
+    return kata_tone_list
+
+
+def _add_silence(
+    raw_wave: NDArray[np.float32],
+    sample_rate: int,
+    pre_silence_seconds: float,
+    post_silence_seconds: float,
+) -> NDArray[np.float32]:
+    """
+    音声波形の前後に指定秒数の無音区間を追加する
+    """
+
+    pre_silence_length = int(sample_rate * pre_silence_seconds)
+    post_silence_length = int(sample_rate * post_silence_seconds)
+    silence_wave_pre = np.zeros(pre_silence_length, dtype=np.float32)
+    silence_wave_post = np.zeros(post_silence_length, dtype=np.float32)
+    return np.concatenate((silence_wave_pre, raw_wave, silence_wave_post))
+
+
+# 文の区切りとみなす記号 (normalize_text() で正規化された後の表現)
+__SENTENCE_END_PUNCTUATIONS: Final[frozenset[str]] = frozenset([".", "!", "?"])
+# 長い文をさらに分割する際に、句の区切りとみなす記号 (normalize_text() で正規化された後の表現)
+__CLAUSE_END_PUNCTUATIONS: Final[frozenset[str]] = __SENTENCE_END_PUNCTUATIONS | frozenset([","])  # fmt: skip
+
+
+def _split_into_sentence_ranges(
+    tokens: Sequence[str],
+    delimiters: frozenset[str] = __SENTENCE_END_PUNCTUATIONS,
+) -> list[tuple[int, int]]:
+    """
+    文字またはモーラのテキストの系列を、区切り記号 (既定では文末記号) の連続が終わる位置で区切った (開始位置, 終了位置) のリストを返す
+    記号のみで構成される区間は、直前の区間 (先頭の場合は直後の区間) に連結される
+    """
+
+    ranges: list[tuple[int, int]] = []
+    start = 0
+    for index, token in enumerate(tokens):
+        is_last = index == len(tokens) - 1
+        # 文末記号の連続が終わる位置で区切る
+        if token in delimiters and (is_last or tokens[index + 1] not in delimiters):
+            ranges.append((start, index + 1))
+            start = index + 1
+    if start < len(tokens):
+        ranges.append((start, len(tokens)))
+
+    # 記号のみで構成される区間を前後の区間に連結する
+    ## 例: 「こんにちは.'」の末尾の「'」だけで 1 文として推論されるのを防ぐ
+    merged_ranges: list[tuple[int, int]] = []
+    pending_start: int | None = None
+    for range_start, range_end in ranges:
+        if pending_start is not None:
+            range_start = pending_start
+            pending_start = None
+        if all(token in PUNCTUATIONS for token in tokens[range_start:range_end]):
+            if len(merged_ranges) > 0:
+                merged_ranges[-1] = (merged_ranges[-1][0], range_end)
+            else:
+                pending_start = range_start
+            continue
+        merged_ranges.append((range_start, range_end))
+    if pending_start is not None:
+        merged_ranges.append((pending_start, len(tokens)))
+
+    return merged_ranges
+
+
+def _split_text_and_kata_tone_list_into_sentences(
+    text: str,
+    kata_tone_list: list[tuple[str, int]],
+    delimiters: frozenset[str] = __SENTENCE_END_PUNCTUATIONS,
+) -> list[tuple[str, list[tuple[str, int]]]]:
+    """
+    読み上げテキストとカタカナモーラと音高のリストを、区切り記号 (既定では文末記号 。！？ など) の位置で文ごとに分割する
+    テキスト側とモーラ側で文の数が一致しない場合は、推論時に InvalidToneError が発生しないよう分割せずに 1 文として返す
+    """
+
+    # Style-Bert-VITS2 と同じ基準で正規化し、句読点を記号モーラのテキストと同じ表現に揃えてから分割する
+    normalized_text = normalize_text(text)
+    text_ranges = _split_into_sentence_ranges(normalized_text, delimiters)
+    mora_ranges = _split_into_sentence_ranges([kata for kata, _ in kata_tone_list], delimiters)  # fmt: skip
+    if len(text_ranges) <= 1 or len(text_ranges) != len(mora_ranges):
+        return [(text, kata_tone_list)]
+
+    return [
+        (normalized_text[text_start:text_end], kata_tone_list[mora_start:mora_end])
+        for (text_start, text_end), (mora_start, mora_end) in zip(
+            text_ranges, mora_ranges
+        )
+    ]
+
+
+def _split_text_and_kata_tone_list_into_chunks(
+    text: str,
+    kata_tone_list: list[tuple[str, int]],
+    max_chunk_moras: int,
+) -> list[tuple[str, list[tuple[str, int]], bool]]:
+    """
+    長い読み上げテキストとカタカナモーラと音高のリストを、モーラ数が上限以下のまとまりに分割する
+    文ごとに分割した上で、上限を超える文はさらに読点 (、) の位置で句ごとに分割し、先頭から順に上限を超えない範囲でまとめる
+    区切り記号のない句が上限を超える場合は、それだけで 1 つのまとまりになる
+
+    Returns
+    -------
+    list[tuple[str, list[tuple[str, int]], bool]]
+        まとまりごとの、読み上げテキストとカタカナモーラと音高のリストと、まとまりが文末で終わっているかどうか
+    """
+
+    segments: list[tuple[str, list[tuple[str, int]], bool]] = []
+    for sentence_text, sentence_kata_tone_list in _split_text_and_kata_tone_list_into_sentences(text, kata_tone_list):  # fmt: skip
+        if len(sentence_kata_tone_list) <= max_chunk_moras:
+            segments.append((sentence_text, sentence_kata_tone_list, True))
+            continue
+        clauses = _split_text_and_kata_tone_list_into_sentences(
+            sentence_text, sentence_kata_tone_list, __CLAUSE_END_PUNCTUATIONS
+        )
+        for index, (clause_text, clause_kata_tone_list) in enumerate(clauses):
+            segments.append((clause_text, clause_kata_tone_list, index == len(clauses) - 1))  # fmt: skip
+
+    chunk_ranges = group_segments_into_chunks(
+        [len(segment_kata_tone_list) for _, segment_kata_tone_list, _ in segments],
+        max_chunk_moras,
+    )
+    return [
+        (
+            "".join(segment_text for segment_text, _, _ in segments[start:end]),
+            [
+                kata_tone
+                for _, segment_kata_tone_list, _ in segments[start:end]
+                for kata_tone in segment_kata_tone_list
+            ],
+            segments[end - 1][2],
+        )
+        for start, end in chunk_ranges
+    ]
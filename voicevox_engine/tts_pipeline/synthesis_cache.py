@@ -0,0 +1,254 @@
+"""音声合成結果のキャッシュ"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from voicevox_engine.logging import logger
+from voicevox_engine.metas.Metas import StyleId
+from voicevox_engine.model import AudioQuery
+from voicevox_engine.utility.lru_cache import CacheStatistics, LRUCache
+
+__all__ = ["SynthesisCache"]
+
+
+class SynthesisCache:
+    """
+    音声合成結果 (エンコード済みの音声ファイルのバイト列) のキャッシュ
+    同じクエリ・スタイル・モデルのバージョンからは常に同じ音声が生成されるため、
+    定型文などの繰り返し合成されるクエリは推論を行わずにキャッシュから返せる
+    メモリ上の LRU キャッシュと、再起動後も再利用できるディスク上のキャッシュの 2 段構成になっている
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int,
+        disk_cache_dir: Path | None = None,
+        max_disk_bytes: int = 0,
+        ttl: float | None = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        max_memory_bytes : int
+            メモリ上にキャッシュする音声の合計バイト数の上限
+        disk_cache_dir : Path | None
+            ディスク上のキャッシュの保存先ディレクトリ (None ならディスク上にはキャッシュしない)
+        max_disk_bytes : int
+            ディスク上にキャッシュする音声の合計バイト数の上限 (0 ならディスク上にはキャッシュしない)
+        ttl : float | None
+            キャッシュの有効期限 (秒数、None なら無期限)
+        """
+
+        self._memory_cache: LRUCache[str, bytes] = LRUCache(
+            max_bytes=max_memory_bytes, get_size=len, ttl=ttl
+        )
+        self._disk_cache: _DiskCache | None = None
+        if disk_cache_dir is not None and max_disk_bytes > 0:
+            self._disk_cache = _DiskCache(disk_cache_dir, max_disk_bytes, ttl)
+
+    @staticmethod
+    def make_key(
+        query: AudioQuery,
+        style_id: StyleId,
+        model_version: str,
+        **options: Any,
+    ) -> str:
+        """
+        音声合成結果を一意に識別するキャッシュキーを生成する
+        Python の hash() はプロセスごとに値が変わりディスク上のキャッシュに使えないため、正規化した JSON の SHA-256 を用いる
+
+        Parameters
+        ----------
+        query : AudioQuery
+            音声合成用のクエリ
+        style_id : StyleId
+            スタイル ID
+        model_version : str
+            スタイル ID に対応する音声合成モデルのバージョン
+        **options : Any
+            出力形式など、音声合成結果に影響するその他のパラメータ
+
+        Returns
+        -------
+        key : str
+            キャッシュキー
+        """
+
+        payload = json.dumps(
+            {
+                "query": query.model_dump(mode="json"),
+                "style_id": style_id,
+                "model_version": model_version,
+                "options": options,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        """
+        キャッシュされた音声合成結果を取得する (メモリ上にない場合はディスク上のキャッシュも確認する)
+
+        Parameters
+        ----------
+        key : str
+            キャッシュキー
+
+        Returns
+        -------
+        data : bytes | None
+            キャッシュされた音声合成結果 (存在しない場合は None)
+        """
+
+        data = self._memory_cache.get(key)
+        if data is not None:
+            return data
+        if self._disk_cache is None:
+            return None
+        entry = self._disk_cache.get(key)
+        if entry is None:
+            return None
+        # ディスク上のキャッシュの残りの有効期限を引き継いでメモリ上にも載せ、期限切れの音声を返し続けないようにする
+        data, remaining_ttl = entry
+        self._memory_cache.put(key, data, ttl=remaining_ttl)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        音声合成結果をキャッシュする
+
+        Parameters
+        ----------
+        key : str
+            キャッシュキー
+        data : bytes
+            音声合成結果
+        """
+
+        self._memory_cache.put(key, data)
+        if self._disk_cache is not None:
+            self._disk_cache.put(key, data)
+
+    def statistics(self) -> dict[str, CacheStatistics]:
+        """メモリ上・ディスク上それぞれのキャッシュの統計情報を、キャッシュの名前をキーとして返す"""
+
+        statistics = {"synthesis": self._memory_cache.statistics()}
+        if self._disk_cache is not None:
+            statistics["synthesis_disk"] = self._disk_cache.statistics()
+        return statistics
+
+
+class _DiskCache:
+    """ファイルの作成日時を基準とした有効期限と、合計バイト数の上限を持つディスク上の LRU キャッシュ"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int, ttl: float | None) -> None:
+        self._cache_dir = cache_dir
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+
+        self._lock = threading.Lock()
+        # キー: キャッシュキー, 値: (バイト数, 作成日時 (UNIX 時間))
+        # 起動時は作成日時順に並べ、以降は参照されるたびに末尾に移動する
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        # 前回起動時までに作成されたキャッシュファイルを読み込む
+        cache_files: list[tuple[float, str, int]] = []
+        for cache_file_path in self._cache_dir.glob("*.bin"):
+            try:
+                stat = cache_file_path.stat()
+            except OSError:
+                continue
+            cache_files.append((stat.st_mtime, cache_file_path.stem, stat.st_size))
+        for created_at, key, size in sorted(cache_files):
+            self._entries[key] = (size, created_at)
+            self._total_bytes += size
+        with self._lock:
+            self._evict_over_limit()
+
+    def get(self, key: str) -> tuple[bytes, float | None] | None:
+        """キャッシュされた音声合成結果と、その残りの有効期限 (秒数、無期限なら None) を返す"""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry):
+                self._remove(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            try:
+                data = self._get_cache_file_path(key).read_bytes()
+            except OSError:
+                # 外部からキャッシュファイルが削除された場合など
+                self._remove(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            if self._ttl is None:
+                return data, None
+            return data, entry[1] + self._ttl - time.time()
+
+    def put(self, key: str, data: bytes) -> None:
+        cache_file_path = self._get_cache_file_path(key)
+        # 書き込み途中のキャッシュファイルを読み込まないよう、一時ファイルに書き込んでから置き換える
+        temp_cache_file_path = cache_file_path.with_suffix(
+            f".{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            temp_cache_file_path.write_bytes(data)
+            os.replace(temp_cache_file_path, cache_file_path)
+        except OSError as e:
+            logger.warning(f"{cache_file_path}: Failed to write synthesis cache. ({e})")
+            temp_cache_file_path.unlink(missing_ok=True)
+            return
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._total_bytes -= entry[0]
+            self._entries[key] = (len(data), time.time())
+            self._total_bytes += len(data)
+            self._evict_over_limit()
+
+    def statistics(self) -> CacheStatistics:
+        with self._lock:
+            return CacheStatistics(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                entries=len(self._entries),
+                total_bytes=self._total_bytes,
+            )
+
+    def _get_cache_file_path(self, key: str) -> Path:
+        return self._cache_dir / f"{key}.bin"
+
+    def _is_expired(self, entry: tuple[int, float]) -> bool:
+        return self._ttl is not None and entry[1] + self._ttl <= time.time()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[0]
+        self._get_cache_file_path(key).unlink(missing_ok=True)
+
+    def _evict_over_limit(self) -> None:
+        while len(self._entries) > 0 and self._total_bytes > self._max_bytes:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self._evictions += 1
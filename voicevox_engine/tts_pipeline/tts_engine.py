@@ -1,7 +1,7 @@
 """音声合成エンジン"""
 
-import copy
 import math
+from collections.abc import Iterator
 from typing import Final, Literal, TypeAlias
 
 import numpy as np
@@ -10,12 +10,15 @@ from numpy.typing import NDArray
 from soxr import resample
 
 from voicevox_engine.utility.core_version_utility import get_latest_version
+from voicevox_engine.utility.lru_cache import CacheStatistics
 
 from ..core.core_adapter import CoreAdapter, DeviceSupport
 from ..core.core_initializer import CoreManager
 from ..core.core_wrapper import CoreWrapper
 from ..metas.Metas import StyleId
 from ..model import AudioQuery
+from .cancellation import raise_if_cancelled
+from .inference_scheduler import InferenceSchedulerStatistics
 from .kana_converter import parse_kana
 from .model import (
     AccentPhrase,
@@ -26,6 +29,7 @@ from .model import (
     NoteId,
     Score,
 )
+from .model_warmup import ModelWarmupStatus
 from .mora_mapping import mora_kana_to_mora_phonemes, mora_phonemes_to_mora_kana
 from .phoneme import Phoneme
 from .text_analyzer import text_to_accent_phrases
@@ -81,18 +85,20 @@ def _generate_silence_mora(length: float) -> Mora:
 def _apply_interrogative_upspeak(
     accent_phrases: list[AccentPhrase], enable_interrogative_upspeak: bool
 ) -> list[AccentPhrase]:
-    """必要に応じて各アクセント句の末尾へ疑問形モーラ（同一母音・継続長 0.15秒・音高↑）を付与する"""
+    """
+    必要に応じて各アクセント句の末尾へ疑問形モーラ（同一母音・継続長 0.15秒・音高↑）を付与する
+    引数のアクセント句系列は書き換えず、疑問形モーラを付与したアクセント句のみ浅いコピーに差し替えたリストを返す
+    """
     # NOTE: 将来的にAudioQueryインスタンスを引数にする予定
     if not enable_interrogative_upspeak:
         return accent_phrases
 
+    upspoken_accent_phrases: list[AccentPhrase] = []
     for accent_phrase in accent_phrases:
         moras = accent_phrase.moras
-        if len(moras) == 0:
-            continue
         # 疑問形補正条件: 疑問形アクセント句 & 末尾有声モーラ
-        if accent_phrase.is_interrogative and moras[-1].pitch > 0:
-            last_mora = copy.deepcopy(moras[-1])
+        if len(moras) > 0 and accent_phrase.is_interrogative and moras[-1].pitch > 0:
+            last_mora = moras[-1]
             upspeak_mora = Mora(
                 text=mora_phonemes_to_mora_kana[last_mora.vowel],
                 consonant=None,
@@ -101,8 +107,11 @@ def _apply_interrogative_upspeak(
                 vowel_length=UPSPEAK_LENGTH,
                 pitch=min(last_mora.pitch + UPSPEAK_PITCH_ADD, UPSPEAK_PITCH_MAX),
             )
-            accent_phrase.moras += [upspeak_mora]
-    return accent_phrases
+            accent_phrase = accent_phrase.model_copy(
+                update={"moras": [*moras, upspeak_mora]}
+            )
+        upspoken_accent_phrases.append(accent_phrase)
+    return upspoken_accent_phrases
 
 
 def _apply_prepost_silence(moras: list[Mora], query: AudioQuery) -> list[Mora]:
@@ -233,7 +242,8 @@ def _query_to_decoder_feature(
     query: AudioQuery,
 ) -> tuple[NDArray[np.float32], NDArray[np.float32]]:
     """音声合成用のクエリからフレームごとの音素 (shape=(フレーム長, 音素数)) と音高 (shape=(フレーム長,)) を得る"""
-    moras = to_flatten_moras(query.accent_phrases)
+    # 以降の設定の適用はモーラを書き換えるため、音声合成用のクエリ全体ではなくモーラだけを浅くコピーする
+    moras = [mora.model_copy() for mora in to_flatten_moras(query.accent_phrases)]
 
     # 設定を適用する
     moras = _apply_prepost_silence(moras, query)
@@ -581,9 +591,13 @@ class TTSEngine:
     ) -> NDArray[np.float32]:
         """音声合成用のクエリ・スタイルID・疑問文語尾自動調整フラグに基づいて音声波形を生成する"""
         # モーフィング時などに同一参照のqueryで複数回呼ばれる可能性があるので、元の引数のqueryに破壊的変更を行わない
-        query = copy.deepcopy(query)
-        query.accent_phrases = _apply_interrogative_upspeak(
-            query.accent_phrases, enable_interrogative_upspeak
+        # 疑問形モーラの付与とモーラへの設定の適用はどちらもコピーに対して行われるため、query 自体はコピーしない
+        query = query.model_copy(
+            update={
+                "accent_phrases": _apply_interrogative_upspeak(
+                    query.accent_phrases, enable_interrogative_upspeak
+                )
+            }
         )
 
         phoneme, f0 = _query_to_decoder_feature(query)
@@ -591,6 +605,67 @@ class TTSEngine:
         wave = raw_wave_to_output_wave(query, raw_wave, sr_raw_wave)
         return wave
 
+    def synthesize_waves(
+        self,
+        queries: list[AudioQuery],
+        style_id: StyleId,
+        enable_interrogative_upspeak: bool = True,
+    ) -> list[NDArray[np.float32]]:
+        """
+        複数の音声合成用のクエリ・スタイルID・疑問文語尾自動調整フラグに基づいて音声波形をまとめて生成する
+        まとめて合成する仕組みを持たないエンジンでは、クエリごとに順に音声合成する
+        途中でキャンセルされた場合は、残りのクエリを音声合成せずに SynthesisCancelledError を送出する
+        """
+        waves: list[NDArray[np.float32]] = []
+        for query in queries:
+            raise_if_cancelled()
+            waves.append(
+                self.synthesize_wave(
+                    query,
+                    style_id,
+                    enable_interrogative_upspeak=enable_interrogative_upspeak,
+                )
+            )
+        return waves
+
+    def synthesize_wave_stream(
+        self,
+        query: AudioQuery,
+        style_id: StyleId,
+        enable_interrogative_upspeak: bool = True,
+    ) -> Iterator[NDArray[np.float32]]:
+        """
+        音声合成用のクエリ・スタイルID・疑問文語尾自動調整フラグに基づいて音声波形を生成し、生成できた部分から順に返す
+        分割合成に対応しないエンジンでは、音声波形全体を 1 つのチャンクとして返す
+        """
+        yield self.synthesize_wave(
+            query, style_id, enable_interrogative_upspeak=enable_interrogative_upspeak
+        )
+
+    def get_cache_statistics(self) -> dict[str, CacheStatistics]:
+        """エンジン内部のキャッシュの統計情報を、キャッシュの名前をキーとして取得する。"""
+        return {}
+
+    def get_inference_statistics(self) -> InferenceSchedulerStatistics | None:
+        """推論スケジューラの統計情報を取得する。推論スケジューラを持たないエンジンでは None を返す。"""
+        return None
+
+    def get_model_warmup_statuses(self) -> dict[str, ModelWarmupStatus]:
+        """AIVM の UUID をキーとした、音声合成モデルのウォームアップの状態を取得する。ウォームアップの仕組みを持たないエンジンでは空の辞書を返す。"""
+        return {}
+
+    def is_ready(self) -> bool:
+        """音声合成モデルのウォームアップが全て完了し、リクエストを遅延なく処理できる状態かどうかを取得する。"""
+        return True
+
+    def get_synthesis_model_version(self, style_id: StyleId) -> str:
+        """
+        指定されたスタイル ID の音声合成に使われるモデルのバージョンを表す文字列を取得する。
+        音声合成結果のキャッシュキーに含め、モデルが差し替えられた際に古いキャッシュを使わないようにするために用いる。
+        モデルが差し替わらないエンジンでは空文字列を返す。
+        """
+        return ""
+
     def initialize_synthesis(self, style_id: StyleId, skip_reinit: bool) -> None:
         """指定されたスタイル ID に関する合成機能を初期化する。既に初期化されていた場合は引数に応じて再初期化する。"""
         self._core.initialize_style_id_synthesis(style_id, skip_reinit=skip_reinit)
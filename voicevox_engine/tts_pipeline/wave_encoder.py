@@ -0,0 +1,265 @@
+"""音声波形のエンコード"""
+
+import io
+import struct
+import zipfile
+from collections.abc import Iterable, Iterator
+from typing import Final, Literal, TypeAlias
+
+import numpy as np
+import soundfile
+from numpy.typing import NDArray
+from soxr import resample
+
+# 音声合成 API で指定できる出力形式
+# ogg は Ogg コンテナに格納した Opus 、pcm はヘッダなしのリニア PCM (リトルエンディアン) を表す
+AudioFormat: TypeAlias = Literal["wav", "flac", "ogg", "mp3", "pcm"]
+
+# 音声合成 API で指定できるサンプルの形式 (float32 は非圧縮の wav / pcm でのみ指定できる)
+SampleFormat: TypeAlias = Literal["int16", "float32"]
+
+# 出力形式ごとの MIME タイプ・拡張子
+AUDIO_FORMAT_MEDIA_TYPES: Final[dict[AudioFormat, str]] = {
+    "wav": "audio/wav",
+    "flac": "audio/flac",
+    "ogg": "audio/ogg",
+    "mp3": "audio/mpeg",
+    "pcm": "audio/pcm",
+}
+AUDIO_FORMAT_EXTENSIONS: Final[dict[AudioFormat, str]] = {
+    "wav": "wav",
+    "flac": "flac",
+    "ogg": "ogg",
+    "mp3": "mp3",
+    "pcm": "pcm",
+}
+
+# Opus が対応しているサンプリングレート
+# これ以外のサンプリングレートの音声波形は、Opus の内部サンプリングレートである 48kHz にリサンプリングしてからエンコードする
+_OPUS_SAMPLING_RATES: Final = (8000, 12000, 16000, 24000, 48000)
+_OPUS_FALLBACK_SAMPLING_RATE: Final = 48000
+
+# ストリーミング出力時に WAV ヘッダへ書き込むデータサイズ
+# ストリーミング時は最終的なデータサイズが事前に分からないため、慣例に従い最大値を書き込む
+_STREAMING_WAV_DATA_SIZE = 0xFFFFFFFF
+
+
+def generate_streaming_wav_header(sampling_rate: int, channels: int) -> bytes:
+    """
+    ストリーミング出力用の WAV (16bit リニア PCM) ヘッダを生成する
+    データサイズが不定のため、RIFF チャンク・data チャンクのサイズには最大値を書き込む
+
+    Parameters
+    ----------
+    sampling_rate : int
+        サンプリングレート
+    channels : int
+        チャンネル数
+
+    Returns
+    -------
+    header : bytes
+        WAV ヘッダのバイト列
+    """
+
+    bits_per_sample = 16
+    block_align = channels * bits_per_sample // 8
+    byte_rate = sampling_rate * block_align
+    return b"".join(
+        [
+            b"RIFF",
+            struct.pack("<I", _STREAMING_WAV_DATA_SIZE),
+            b"WAVE",
+            b"fmt ",
+            struct.pack(
+                "<IHHIIHH",
+                16,  # fmt チャンクのサイズ
+                1,  # フォーマット ID (1: リニア PCM)
+                channels,
+                sampling_rate,
+                byte_rate,
+                block_align,
+                bits_per_sample,
+            ),
+            b"data",
+            struct.pack("<I", _STREAMING_WAV_DATA_SIZE),
+        ]
+    )
+
+
+def wave_to_pcm16_bytes(wave: NDArray[np.float32]) -> bytes:
+    """
+    float32 型の音声波形 (-1.0 ~ 1.0) をリトルエンディアンの 16bit リニア PCM のバイト列に変換する
+    ステレオの音声波形 (shape=(サンプル数, 2)) はチャンネルごとにインターリーブされる
+
+    Parameters
+    ----------
+    wave : NDArray[np.float32]
+        音声波形
+
+    Returns
+    -------
+    pcm : bytes
+        16bit リニア PCM のバイト列
+    """
+
+    clipped_wave = np.clip(wave, -1.0, 1.0)
+    return (clipped_wave * 32767.0).astype("<i2").tobytes()
+
+
+def wave_to_wav_bytes(wave: NDArray[np.float32], sampling_rate: int) -> bytes:
+    """
+    音声波形をメモリ上で WAV (16bit リニア PCM) ファイルにエンコードする
+    一時ファイルを介さないため、ディスク I/O の発生やクライアント切断時の一時ファイルの削除漏れがない
+
+    Parameters
+    ----------
+    wave : NDArray[np.float32]
+        音声波形
+    sampling_rate : int
+        サンプリングレート
+
+    Returns
+    -------
+    wav : bytes
+        WAV ファイルのバイト列
+    """
+
+    return encode_wave(wave, sampling_rate)
+
+
+def is_supported_sample_format(
+    audio_format: AudioFormat, sample_format: SampleFormat
+) -> bool:
+    """
+    出力形式とサンプルの形式の組み合わせに対応しているかを返す
+    FLAC は浮動小数点数のサンプルに対応しておらず、Opus・MP3 はサンプルの形式を持たない非可逆圧縮のため、float32 は wav / pcm でのみ指定できる
+    """
+
+    return sample_format == "int16" or audio_format in ("wav", "pcm")
+
+
+def encode_wave(
+    wave: NDArray[np.float32],
+    sampling_rate: int,
+    audio_format: AudioFormat = "wav",
+    sample_format: SampleFormat = "int16",
+) -> bytes:
+    """
+    音声波形をメモリ上で指定された形式の音声ファイルにエンコードする
+
+    Parameters
+    ----------
+    wave : NDArray[np.float32]
+        音声波形
+    sampling_rate : int
+        サンプリングレート
+    audio_format : AudioFormat
+        出力形式
+    sample_format : SampleFormat
+        サンプルの形式 (int16 / float32 、非可逆圧縮の出力形式では無視される)
+
+    Returns
+    -------
+    audio : bytes
+        音声ファイルのバイト列
+
+    Raises
+    ------
+    ValueError
+        出力形式とサンプルの形式の組み合わせに対応していない場合
+    """
+
+    if not is_supported_sample_format(audio_format, sample_format):
+        raise ValueError(f"{audio_format} does not support {sample_format} samples.")
+
+    subtype = "FLOAT" if sample_format == "float32" else "PCM_16"
+    endian: str | None = None
+    if audio_format == "wav":
+        file_format = "WAV"
+    elif audio_format == "pcm":
+        file_format = "RAW"
+        endian = "LITTLE"
+    elif audio_format == "flac":
+        file_format = "FLAC"
+    elif audio_format == "mp3":
+        file_format, subtype = "MP3", "MPEG_LAYER_III"
+    else:
+        file_format, subtype = "OGG", "OPUS"
+        if sampling_rate not in _OPUS_SAMPLING_RATES:
+            wave = resample(wave, sampling_rate, _OPUS_FALLBACK_SAMPLING_RATE)
+            sampling_rate = _OPUS_FALLBACK_SAMPLING_RATE
+
+    with io.BytesIO() as audio_file:
+        soundfile.write(
+            file=audio_file,
+            data=wave,
+            samplerate=sampling_rate,
+            subtype=subtype,
+            endian=endian,
+            format=file_format,
+        )
+        return audio_file.getvalue()
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """
+    ZIP ファイルのストリーミング出力用の書き込み専用バッファ
+    シーク不可能なストリームとして振る舞うため、zipfile はローカルファイルヘッダを書き戻さずデータディスクリプタを使って書き込む
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self) -> bytes:
+        """書き込まれたデータを取り出し、バッファを空にする"""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def generate_audio_zip_stream(
+    waves: Iterable[NDArray[np.float32]],
+    sampling_rate: int,
+    audio_format: AudioFormat = "wav",
+    sample_format: SampleFormat = "int16",
+) -> Iterator[bytes]:
+    """
+    複数の音声波形を指定された形式の音声ファイルにエンコードし、連番のファイル名 (001.wav, 002.wav, ... 拡張子は出力形式による) で格納した ZIP ファイルを
+    ファイル 1 つ分ずつ順にバイト列として返す
+
+    Parameters
+    ----------
+    waves : Iterable[NDArray[np.float32]]
+        音声波形のリスト
+    sampling_rate : int
+        サンプリングレート
+    audio_format : AudioFormat
+        出力形式
+    sample_format : SampleFormat
+        サンプルの形式
+
+    Returns
+    -------
+    chunks : Iterator[bytes]
+        ZIP ファイルを分割したバイト列
+    """
+
+    extension = AUDIO_FORMAT_EXTENSIONS[audio_format]
+    buffer = _ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, mode="w") as zip_file:
+        for i, wave in enumerate(waves):
+            zip_file.writestr(
+                f"{str(i + 1).zfill(3)}.{extension}",
+                encode_wave(wave, sampling_rate, audio_format, sample_format),
+            )
+            yield buffer.pop()
+    # ZIP ファイル末尾のセントラルディレクトリは、ZipFile を閉じた時点で書き込まれる
+    yield buffer.pop()
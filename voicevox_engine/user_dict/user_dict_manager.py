@@ -1,10 +1,14 @@
 "ユーザー辞書関連の処理"
 
+import atexit
+import hashlib
 import json
 import sys
 import threading
-from collections.abc import Callable
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any, TypeVar
 from uuid import UUID, uuid4
 
@@ -62,10 +66,136 @@ _COMPILED_DICT_PATH = save_dir / "user.dic"
 mutex_user_dict = threading.Lock()
 mutex_openjtalk_dict = threading.Lock()
 
+# pyopenjtalk のグローバルな辞書を差し替えるたびに増える世代番号
+# テキストの言語解析結果のキャッシュのキーに含め、辞書の更新前の解析結果を参照しないようにする
+_openjtalk_dict_generation = 0
+
+
+def get_openjtalk_dict_generation() -> int:
+    """テキスト解析に適用中の辞書の世代番号を返す。辞書が差し替えられるたびに増える。"""
+    return _openjtalk_dict_generation
+
 
 _save_format_dict_adapter = TypeAdapter(dict[str, SaveFormatUserDictWord])
 
 
+def _read_default_dict_csv(file_path: Path) -> str:
+    """デフォルト辞書ファイル (.csv または ZStandard で圧縮された .csv.zst) を読み込み、末尾が改行の CSV テキストを返す。"""
+    if file_path.suffix == ".zst":
+        # ZStandard デコーダーの初期化
+        decompressor = zstandard.ZstdDecompressor()
+        with file_path.open("rb") as f:
+            with decompressor.stream_reader(f) as reader:
+                default_dict_content = reader.read().decode("utf-8")
+    else:
+        default_dict_content = file_path.read_text(encoding="utf-8")
+    if not default_dict_content.endswith("\n"):
+        default_dict_content += "\n"
+    return default_dict_content
+
+
+def _user_dict_to_csv_text(user_dict: Mapping[str, UserDictWord]) -> str:
+    """ユーザー辞書の単語を MeCab の辞書 CSV 形式のテキストに変換する。"""
+    csv_text = ""
+    for word in user_dict.values():
+        csv_text += (
+            "{surface},{context_id},{context_id},{cost},{part_of_speech},"
+            + "{part_of_speech_detail_1},{part_of_speech_detail_2},"
+            + "{part_of_speech_detail_3},{inflectional_type},"
+            + "{inflectional_form},{stem},{yomi},{pronunciation},"
+            + "{accent_type}/{mora_count},{accent_associative_rule}\n"
+        ).format(
+            surface=word.surface,
+            context_id=word.context_id,
+            cost=priority2cost(word.context_id, word.priority),
+            part_of_speech=word.part_of_speech,
+            part_of_speech_detail_1=word.part_of_speech_detail_1,
+            part_of_speech_detail_2=word.part_of_speech_detail_2,
+            part_of_speech_detail_3=word.part_of_speech_detail_3,
+            inflectional_type=word.inflectional_type,
+            inflectional_form=word.inflectional_form,
+            stem=word.stem,
+            yomi=word.yomi,
+            pronunciation=word.pronunciation,
+            accent_type=word.accent_type,
+            mora_count=word.mora_count,
+            accent_associative_rule=word.accent_associative_rule,
+        )
+    return csv_text
+
+
+class UserDictTransaction:
+    """
+    ユーザー辞書への複数の変更をまとめて適用するトランザクション
+    UserDictionary.transaction() から取得し、with ブロックを抜けた時点で変更をまとめて保存・コンパイルする
+    """
+
+    def __init__(self, user_dict: dict[str, UserDictWord]) -> None:
+        """
+        Parameters
+        ----------
+        user_dict : dict[str, UserDictWord]
+            トランザクション開始時点のユーザー辞書 (トランザクション内で直接書き換えられる)
+        """
+        self._user_dict = user_dict
+        self._is_modified = False
+        self._is_rolled_back = False
+
+    @property
+    def words(self) -> dict[str, UserDictWord]:
+        """トランザクション内での変更を反映したユーザー辞書の単語"""
+        return self._user_dict
+
+    @property
+    def is_modified(self) -> bool:
+        """ユーザー辞書が変更されたかどうか"""
+        return self._is_modified
+
+    @property
+    def is_rolled_back(self) -> bool:
+        """トランザクションがロールバックされたかどうか"""
+        return self._is_rolled_back
+
+    def rollback(self) -> None:
+        """トランザクション内での変更をすべて破棄する (with ブロックを抜けても保存・コンパイルされない)。"""
+        self._is_rolled_back = True
+
+    def apply_word(self, word_property: WordProperty) -> str:
+        """新規単語を追加し、その単語に割り当てられた UUID を返す。"""
+        word = create_word(word_property)
+        word_uuid = str(uuid4())
+        self._user_dict[word_uuid] = word
+        self._is_modified = True
+        return word_uuid
+
+    def rewrite_word(self, word_uuid: str, word_property: WordProperty) -> None:
+        """単語 UUID で指定された単語を上書き更新する。"""
+        if word_uuid not in self._user_dict:
+            raise UserDictInputError("UUIDに該当するワードが見つかりませんでした")
+        self._user_dict[word_uuid] = create_word(word_property)
+        self._is_modified = True
+
+    def delete_word(self, word_uuid: str) -> None:
+        """単語UUIDで指定された単語を削除する。"""
+        if word_uuid not in self._user_dict:
+            raise UserDictInputError("IDに該当するワードが見つかりませんでした")
+        del self._user_dict[word_uuid]
+        self._is_modified = True
+
+    def import_words(
+        self, dict_data: dict[str, UserDictWord], override: bool = False
+    ) -> None:
+        """検証済みのユーザー辞書データを取り込む。"""
+        # 重複エントリの上書き
+        if override:
+            self._user_dict.update(dict_data)
+        # 重複エントリの保持
+        else:
+            for word_uuid, word in dict_data.items():
+                self._user_dict.setdefault(word_uuid, word)
+        self._is_modified = True
+
+
 class UserDictionary:
     """ユーザー辞書"""
 
@@ -90,8 +220,182 @@ class UserDictionary:
         self._compiled_dict_path = compiled_dict_path
         # pytest から実行されているかどうか
         self._is_pytest = "pytest" in sys.argv[0] or "py.test" in sys.argv[0]
+        # ユーザー辞書の読み出しから保存までの間に、他の変更が割り込まないようにするためのロック
+        self._transaction_lock = threading.Lock()
+
+        # メモリ上に保持するユーザー辞書の正本
+        # 読み出し時は参照をそのまま返せるよう、一度公開した辞書は書き換えず、変更時は新しい辞書に差し替える (copy-on-write)
+        self._words: dict[str, UserDictWord] = {}
+        # 最後に読み書きしたユーザー辞書ファイルの (更新日時, サイズ) で、外部からの編集の検出に使う
+        self._file_stat: tuple[int, int] | None = None
+
+        # ユーザー辞書ファイルへの遅延書き込み (write-behind)
+        # 変更は先にメモリ上の辞書に反映し、ファイルへの書き込みはバックグラウンドのスレッドで行う
+        # 書き込み待ちの間に複数回変更された場合は、最新の辞書だけを書き込む
+        self._write_condition = threading.Condition()
+        self._pending_words: dict[str, UserDictWord] | None = None
+        self._is_writing = False
+        self._writer_thread: threading.Thread | None = None
+        # 辞書のバックグラウンドでの再コンパイル
+        # 変更のたびに増えるユーザー辞書のバージョンと、テキスト解析に適用済みのバージョンを管理し、
+        # 変更を受け付けた呼び出し元を待たせずに、コンパイルと適用はバックグラウンドのスレッドで行う
+        # コンパイル中に複数回変更された場合は、最新のユーザー辞書だけをコンパイルする
+        self._compile_condition = threading.Condition()
+        self._version = 0
+        self._applied_version = 0
+        self._processed_version = 0
+        self._compiler_thread: threading.Thread | None = None
+        # 以前のバージョンが書き出していた、デフォルト辞書とユーザー辞書をまとめた 1 つの辞書ファイルを削除済みかどうか
+        self._is_legacy_compiled_dict_removed = False
+
+        # 終了時に書き込み待ちの変更が失われないようにする
+        atexit.register(self.flush)
+
+        self._load_from_file()
         self.update_dict()
 
+    @contextmanager
+    def transaction(self) -> Iterator[UserDictTransaction]:
+        """
+        ユーザー辞書への複数の変更をまとめて適用するトランザクションを開始する。
+        with ブロックを正常に抜けた時点で、変更されていればユーザー辞書を 1 回だけ保存・コンパイルする。
+        with ブロック内で例外が発生した場合やロールバックされた場合は、変更は保存されない。
+
+        Yields
+        ------
+        UserDictTransaction
+            ユーザー辞書への変更を受け付けるトランザクション
+        """
+        with self._transaction_lock:
+            transaction = UserDictTransaction(dict(self._get_words()))
+            yield transaction
+            if transaction.is_modified and not transaction.is_rolled_back:
+                # 更新された辞書データをメモリ上の辞書に反映した上で、ファイルへの書き込みと辞書のコンパイルを予約する
+                self._words = transaction.words
+                self._schedule_write(transaction.words)
+                self._schedule_compile()
+
+    @property
+    def version(self) -> int:
+        """ユーザー辞書のバージョン (ユーザー辞書が変更されるたびに増える)"""
+        return self._version
+
+    @property
+    def applied_version(self) -> int:
+        """テキスト解析に適用済みのユーザー辞書のバージョン"""
+        return self._applied_version
+
+    def flush(self) -> None:
+        """ユーザー辞書の変更が、ファイルへの書き込みとテキスト解析への適用まで完了するのを待つ。"""
+        with self._write_condition:
+            self._write_condition.wait_for(
+                lambda: self._pending_words is None and self._is_writing is False
+            )
+        with self._compile_condition:
+            self._compile_condition.wait_for(
+                lambda: self._processed_version >= self._version
+            )
+
+    def _schedule_compile(self) -> None:
+        """ユーザー辞書のバージョンを上げ、バックグラウンドでのコンパイルと適用を予約する。"""
+        with self._compile_condition:
+            self._version += 1
+            if self._compiler_thread is None:
+                self._compiler_thread = threading.Thread(
+                    target=self._compile_loop, name="UserDictCompiler", daemon=True
+                )
+                self._compiler_thread.start()
+            self._compile_condition.notify_all()
+
+    def _compile_loop(self) -> None:
+        """予約されたユーザー辞書のコンパイルと適用を、バックグラウンドで行い続ける。"""
+        while True:
+            with self._compile_condition:
+                self._compile_condition.wait_for(
+                    lambda: self._processed_version < self._version
+                )
+                version = self._version
+            try:
+                self.update_dict()
+            except Exception:
+                # エラーは update_dict() 内でログに記録済みで、次の変更時に再度コンパイルする
+                pass
+            finally:
+                with self._compile_condition:
+                    self._processed_version = max(self._processed_version, version)
+                    self._compile_condition.notify_all()
+
+    def _get_file_stat(self) -> tuple[int, int] | None:
+        """ユーザー辞書ファイルの (更新日時, サイズ) を取得する。ファイルが存在しない場合は None を返す。"""
+        try:
+            stat = self._user_dict_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @mutex_wrapper(mutex_user_dict)
+    def _load_from_file(self) -> None:
+        """ユーザー辞書ファイルを読み込み、メモリ上の辞書を差し替える。"""
+        file_stat = self._get_file_stat()
+        # 指定ユーザー辞書が存在しない場合、空辞書とする
+        if file_stat is None:
+            self._words = {}
+            self._file_stat = None
+            return
+
+        with self._user_dict_path.open(encoding="utf-8") as f:
+            save_format_dict = _save_format_dict_adapter.validate_python(json.load(f))
+            result: dict[str, UserDictWord] = {}
+            for word_uuid, word in save_format_dict.items():
+                result[str(UUID(word_uuid))] = convert_from_save_format(word)
+        self._words = result
+        self._file_stat = file_stat
+
+    def _get_words(self) -> dict[str, UserDictWord]:
+        """
+        メモリ上のユーザー辞書を取得する。
+        ユーザー辞書ファイルが外部から編集されていた場合は、読み込み直してから返す。
+        返される辞書は書き換えてはならない。
+        """
+        with self._write_condition:
+            is_write_pending = self._pending_words is not None or self._is_writing
+        # 書き込み待ちの変更がある間は、メモリ上の辞書の方が新しい
+        if not is_write_pending and self._get_file_stat() != self._file_stat:
+            logger.info("User dictionary file was modified externally. Reloading.")
+            self._load_from_file()
+            self._schedule_compile()
+        return self._words
+
+    def _schedule_write(self, user_dict: dict[str, UserDictWord]) -> None:
+        """ユーザー辞書データのファイルへの書き込みを予約する。"""
+        with self._write_condition:
+            self._pending_words = user_dict
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(
+                    target=self._write_loop, name="UserDictWriter", daemon=True
+                )
+                self._writer_thread.start()
+            self._write_condition.notify_all()
+
+    def _write_loop(self) -> None:
+        """書き込みが予約されたユーザー辞書データを、バックグラウンドでファイルへ書き込み続ける。"""
+        while True:
+            with self._write_condition:
+                self._write_condition.wait_for(lambda: self._pending_words is not None)
+                user_dict = self._pending_words
+                assert user_dict is not None
+                self._pending_words = None
+                self._is_writing = True
+            try:
+                self._write_to_json(user_dict)
+            except Exception as e:
+                logger.error("Failed to write user dictionary.", exc_info=e)
+            finally:
+                with self._write_condition:
+                    self._file_stat = self._get_file_stat()
+                    self._is_writing = False
+                    self._write_condition.notify_all()
+
     @mutex_wrapper(mutex_user_dict)
     def _write_to_json(self, user_dict: dict[str, UserDictWord]) -> None:
         """ユーザー辞書データをファイルへ書き込む。"""
@@ -100,79 +404,68 @@ class UserDictionary:
             save_format_word = convert_to_save_format(word)
             save_format_user_dict[word_uuid] = save_format_word
         user_dict_json = _save_format_dict_adapter.dump_json(save_format_user_dict)
-        self._user_dict_path.write_bytes(user_dict_json)
+        # 書き込み途中のファイルが読み込まれないよう、一時ファイルに書き込んでから置き換える
+        tmp_user_dict_path = self._user_dict_path.with_suffix(f".{uuid4()}.tmp")
+        try:
+            tmp_user_dict_path.write_bytes(user_dict_json)
+            tmp_user_dict_path.replace(self._user_dict_path)
+        finally:
+            tmp_user_dict_path.unlink(missing_ok=True)
 
-    @mutex_wrapper(mutex_openjtalk_dict)
-    def update_dict(self) -> None:
-        """辞書を更新する。"""
-        default_dict_dir_path = self._default_dict_dir_path
-        compiled_dict_path = self._compiled_dict_path
+    def _get_default_dict_files(self) -> list[Path]:
+        """デフォルト辞書ファイルのパスのリストを取得する。"""
+        # pytest から実行されている場合は毎回全辞書を追加すると時間がかかりすぎるため、デフォルト辞書のみ追加する
+        if self._is_pytest:
+            logger.info("Using only default dictionary for pytest.")
+            return [self._default_dict_dir_path / "01_default.csv"]
+        return sorted(self._default_dict_dir_path.glob("*.csv.zst"))
 
-        # pytest 実行時かつ Windows ではなぜか辞書更新時に MeCab の初期化に失敗するので、辞書更新自体を無効化する
-        if self._is_pytest and sys.platform == "win32":
-            return
+    def _compile_default_dict(self, default_dict_files: list[Path]) -> Path:
+        """
+        デフォルト辞書をコンパイルし、コンパイル済み辞書ファイルのパスを返す。
+        デフォルト辞書の内容から計算したハッシュ値をファイル名に含めてキャッシュし、
+        デフォルト辞書が変わらない限りエンジンを再起動してもコンパイルし直さない。
+        """
+        compiled_dict_path = self._compiled_dict_path
 
+        # デフォルト辞書の内容と pyopenjtalk のバージョンからキャッシュのキーを計算
+        hasher = hashlib.sha256(pyopenjtalk.__version__.encode("utf-8"))
+        for file_path in default_dict_files:
+            hasher.update(file_path.name.encode("utf-8"))
+            hasher.update(file_path.read_bytes())
+        digest = hasher.hexdigest()[:16]
+
+        cache_prefix = f"{compiled_dict_path.stem}.default-"
+        compiled_default_dict_path = compiled_dict_path.with_name(
+            f"{cache_prefix}{digest}.dic"
+        )
+        if compiled_default_dict_path.is_file():
+            return compiled_default_dict_path
+
+        logger.info("Compiling default dictionary...")
+        csv_text = "".join(
+            _read_default_dict_csv(file_path) for file_path in default_dict_files
+        )
+        self._compile_csv(csv_text, compiled_default_dict_path)
+
+        # 内容が変わる前のデフォルト辞書のキャッシュを削除
+        for stale_path in compiled_dict_path.parent.glob(f"{cache_prefix}*.dic"):
+            if stale_path != compiled_default_dict_path:
+                stale_path.unlink(missing_ok=True)
+
+        return compiled_default_dict_path
+
+    def _compile_csv(self, csv_text: str, output_path: Path) -> None:
+        """CSV 形式の辞書データを OpenJTalk 用にコンパイルし、output_path へ保存する。"""
         random_string = uuid4()
-        tmp_csv_path = compiled_dict_path.with_suffix(
+        tmp_csv_path = output_path.with_suffix(
             f".dict_csv-{random_string}.tmp"
         )  # csv形式辞書データの一時保存ファイル
-        tmp_compiled_path = compiled_dict_path.with_suffix(
+        tmp_compiled_path = output_path.with_suffix(
             f".dict_compiled-{random_string}.tmp"
         )  # コンパイル済み辞書データの一時保存ファイル
 
         try:
-            # 辞書.csvを作成
-            csv_text = ""
-
-            # デフォルト辞書データの追加
-            # pytest から実行されている場合は毎回全辞書を追加すると時間がかかりすぎるため、デフォルト辞書のみ追加する
-            if self._is_pytest:
-                default_dict_files = [default_dict_dir_path / "01_default.csv"]
-                logger.info("Using only default dictionary for pytest.")
-            else:
-                default_dict_files = sorted(default_dict_dir_path.glob("*.csv.zst"))
-            if len(default_dict_files) == 0:
-                logger.warning("Cannot find default dictionary.")
-                return
-
-            # ZStandard デコーダーの初期化
-            decompressor = zstandard.ZstdDecompressor()
-
-            for file_path in default_dict_files:
-                with file_path.open("rb") as f:
-                    with decompressor.stream_reader(f) as reader:
-                        default_dict_content = reader.read().decode("utf-8")
-                if not default_dict_content.endswith("\n"):
-                    default_dict_content += "\n"
-                csv_text += default_dict_content
-
-            # ユーザー辞書データの追加
-            user_dict = self.read_dict()
-            for word_uuid in user_dict:
-                word = user_dict[word_uuid]
-                csv_text += (
-                    "{surface},{context_id},{context_id},{cost},{part_of_speech},"
-                    + "{part_of_speech_detail_1},{part_of_speech_detail_2},"
-                    + "{part_of_speech_detail_3},{inflectional_type},"
-                    + "{inflectional_form},{stem},{yomi},{pronunciation},"
-                    + "{accent_type}/{mora_count},{accent_associative_rule}\n"
-                ).format(
-                    surface=word.surface,
-                    context_id=word.context_id,
-                    cost=priority2cost(word.context_id, word.priority),
-                    part_of_speech=word.part_of_speech,
-                    part_of_speech_detail_1=word.part_of_speech_detail_1,
-                    part_of_speech_detail_2=word.part_of_speech_detail_2,
-                    part_of_speech_detail_3=word.part_of_speech_detail_3,
-                    inflectional_type=word.inflectional_type,
-                    inflectional_form=word.inflectional_form,
-                    stem=word.stem,
-                    yomi=word.yomi,
-                    pronunciation=word.pronunciation,
-                    accent_type=word.accent_type,
-                    mora_count=word.mora_count,
-                    accent_associative_rule=word.accent_associative_rule,
-                )
             # 辞書データを辞書.csv へ一時保存
             tmp_csv_path.write_text(csv_text, encoding="utf-8")
 
@@ -180,18 +473,7 @@ class UserDictionary:
             pyopenjtalk.mecab_dict_index(str(tmp_csv_path), str(tmp_compiled_path))
             if not tmp_compiled_path.is_file():
                 raise RuntimeError("辞書のコンパイル時にエラーが発生しました。")
-
-            # コンパイル済み辞書の置き換え・読み込み
-            pyopenjtalk.unset_user_dict()
-            tmp_compiled_path.replace(compiled_dict_path)
-            if compiled_dict_path.is_file():
-                pyopenjtalk.update_global_jtalk_with_user_dict(
-                    str(compiled_dict_path.resolve(strict=True))
-                )
-
-        except Exception as e:
-            logger.error("Failed to update dictionary.", exc_info=e)
-            raise e
+            tmp_compiled_path.replace(output_path)
 
         finally:
             # 後処理
@@ -200,19 +482,95 @@ class UserDictionary:
             if tmp_compiled_path.exists():
                 tmp_compiled_path.unlink()
 
-    @mutex_wrapper(mutex_user_dict)
+    @mutex_wrapper(mutex_openjtalk_dict)
+    def update_dict(self) -> None:
+        """
+        辞書を更新する。
+        デフォルト辞書はコンパイル済みのキャッシュを再利用し、ユーザー辞書の単語だけを小さな辞書としてコンパイルする。
+        コンパイルが終わるまでは、テキスト解析には変更前の辞書が使われ続ける。
+        """
+        global _openjtalk_dict_generation
+
+        compiled_dict_path = self._compiled_dict_path
+
+        # pytest 実行時かつ Windows ではなぜか辞書更新時に MeCab の初期化に失敗するので、辞書更新自体を無効化する
+        if self._is_pytest and sys.platform == "win32":
+            return
+
+        try:
+            compiled_dict_paths: list[Path] = []
+
+            # デフォルト辞書のコンパイル (キャッシュがあれば再利用)
+            default_dict_files = self._get_default_dict_files()
+            if len(default_dict_files) == 0:
+                logger.warning("Cannot find default dictionary.")
+            else:
+                compiled_dict_paths.append(
+                    self._compile_default_dict(default_dict_files)
+                )
+
+            # ユーザー辞書の単語のみを、バージョンごとに別のファイルとしてコンパイル
+            # 適用中の辞書ファイルは MeCab に開かれたままのため、上書きせずに新しいファイルを作る
+            version = self._version
+            user_dict = self.get_words()
+            user_compiled_dict_path = compiled_dict_path.with_name(
+                f"{compiled_dict_path.stem}-{version}{compiled_dict_path.suffix}"
+            )
+            if len(user_dict) > 0:
+                self._compile_csv(
+                    _user_dict_to_csv_text(user_dict), user_compiled_dict_path
+                )
+                compiled_dict_paths.append(user_compiled_dict_path)
+
+            # コンパイル済み辞書の読み込み
+            # pyopenjtalk は新しい辞書を読み込んだインスタンスを作ってから差し替えるため、
+            # 差し替えの途中でテキスト解析が辞書のない状態や読み込み途中の状態を観測することはない
+            if len(compiled_dict_paths) > 0:
+                pyopenjtalk.update_global_jtalk_with_user_dict(
+                    [str(path.resolve(strict=True)) for path in compiled_dict_paths]
+                )
+            else:
+                pyopenjtalk.unset_user_dict()
+            _openjtalk_dict_generation += 1
+            self._applied_version = version
+            logger.info(f"User dictionary version {version} applied.")
+
+            # 差し替え前のバージョンの辞書ファイルを削除
+            for stale_path in compiled_dict_path.parent.glob(
+                f"{compiled_dict_path.stem}-*{compiled_dict_path.suffix}"
+            ):
+                if stale_path == user_compiled_dict_path:
+                    continue
+                try:
+                    stale_path.unlink()
+                except OSError:
+                    # Windows では差し替え前の辞書ファイルがまだ開かれている場合があるため、次回の更新時に削除する
+                    pass
+
+            # 以前のバージョンが書き出していた、デフォルト辞書とユーザー辞書をまとめた 1 つの辞書ファイルを削除
+            # 分割した辞書を初めて適用した時点で不要になるため、削除できた以降は確認しない
+            if self._is_legacy_compiled_dict_removed is False:
+                try:
+                    compiled_dict_path.unlink(missing_ok=True)
+                    self._is_legacy_compiled_dict_removed = True
+                except OSError:
+                    # Windows では辞書ファイルがまだ開かれている場合があるため、次回の更新時に削除する
+                    pass
+
+        except Exception as e:
+            logger.error("Failed to update dictionary.", exc_info=e)
+            raise e
+
     def read_dict(self) -> dict[str, UserDictWord]:
-        """ユーザー辞書を読み出す。"""
-        # 指定ユーザー辞書が存在しない場合、空辞書を返す
-        if not self._user_dict_path.is_file():
-            return {}
+        """ユーザー辞書を読み出す。返される辞書は呼び出し元で自由に書き換えてよい。"""
+        return dict(self._get_words())
 
-        with self._user_dict_path.open(encoding="utf-8") as f:
-            save_format_dict = _save_format_dict_adapter.validate_python(json.load(f))
-            result: dict[str, UserDictWord] = {}
-            for word_uuid, word in save_format_dict.items():
-                result[str(UUID(word_uuid))] = convert_from_save_format(word)
-        return result
+    def get_words(self) -> Mapping[str, UserDictWord]:
+        """
+        ユーザー辞書を読み取り専用のビューとして読み出す。
+        read_dict() と異なり辞書をコピーしないため、ユーザー辞書の大きさに関わらず一定時間で返る。
+        """
+        return MappingProxyType(self._get_words())
 
     def import_user_dict(
         self, dict_data: dict[str, UserDictWord], override: bool = False
@@ -252,54 +610,21 @@ class UserDictionary:
             else:
                 raise ValueError("対応していない品詞です")
 
-        # 既存辞書の読み出し
-        old_dict = self.read_dict()
-
-        # 辞書データの更新
-        # 重複エントリの上書き
-        if override:
-            new_dict = {**old_dict, **dict_data}
-        # 重複エントリの保持
-        else:
-            new_dict = {**dict_data, **old_dict}
-
-        # 更新された辞書データの保存と適用
-        self._write_to_json(new_dict)
-        self.update_dict()
+        # 辞書データの更新と、更新された辞書データの保存と適用
+        with self.transaction() as transaction:
+            transaction.import_words(dict_data, override)
 
     def apply_word(self, word_property: WordProperty) -> str:
         """新規単語を追加し、その単語に割り当てられた UUID を返す。"""
-        # 新規単語の追加による辞書データの更新
-        user_dict = self.read_dict()
-        word_uuid = str(uuid4())
-        user_dict[word_uuid] = create_word(word_property)
-
-        # 更新された辞書データの保存と適用
-        self._write_to_json(user_dict)
-        self.update_dict()
-
-        return word_uuid
+        with self.transaction() as transaction:
+            return transaction.apply_word(word_property)
 
     def rewrite_word(self, word_uuid: str, word_property: WordProperty) -> None:
         """単語 UUID で指定された単語を上書き更新する。"""
-        # 既存単語の上書きによる辞書データの更新
-        user_dict = self.read_dict()
-        if word_uuid not in user_dict:
-            raise UserDictInputError("UUIDに該当するワードが見つかりませんでした")
-        user_dict[word_uuid] = create_word(word_property)
-
-        # 更新された辞書データの保存と適用
-        self._write_to_json(user_dict)
-        self.update_dict()
+        with self.transaction() as transaction:
+            transaction.rewrite_word(word_uuid, word_property)
 
     def delete_word(self, word_uuid: str) -> None:
         """単語UUIDで指定された単語を削除する。"""
-        # 既存単語の削除による辞書データの更新
-        user_dict = self.read_dict()
-        if word_uuid not in user_dict:
-            raise UserDictInputError("IDに該当するワードが見つかりませんでした")
-        del user_dict[word_uuid]
-
-        # 更新された辞書データの保存と適用
-        self._write_to_json(user_dict)
-        self.update_dict()
+        with self.transaction() as transaction:
+            transaction.delete_word(word_uuid)
@@ -0,0 +1,234 @@
+"""LRU キャッシュに関するユーティリティ"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheStatistics:
+    """キャッシュの統計情報"""
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    entries: int
+    total_bytes: int
+
+
+class LRUCache(Generic[K, V]):
+    """
+    エントリ数・合計バイト数の上限と有効期限を持つ、スレッドセーフな LRU キャッシュ
+    上限を超えた場合は、最も長く参照されていないエントリから順に破棄する
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        get_size: Callable[[V], int] | None = None,
+        on_evict: Callable[[K, V], None] | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        max_entries : int | None
+            保持するエントリ数の上限 (None なら無制限)
+        max_bytes : int | None
+            保持するエントリの合計バイト数の上限 (None なら無制限)
+        get_size : Callable[[V], int] | None
+            エントリのバイト数を求める関数 (None ならすべて 0 バイトとして扱う)
+        on_evict : Callable[[K, V], None] | None
+            上限超過によりエントリが破棄されたときに呼ばれるコールバック
+        ttl : float | None
+            エントリの有効期限 (追加からの秒数、None なら無期限)
+        """
+
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._get_size = get_size
+        self._on_evict = on_evict
+        self._ttl = ttl
+
+        self._lock = threading.Lock()
+        # 値: (値, バイト数, 有効期限の時刻 (time.monotonic() 基準、無期限なら None))
+        self._entries: OrderedDict[K, tuple[V, int, float | None]] = OrderedDict()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: K) -> V | None:
+        """
+        キャッシュからエントリを取得する
+        取得したエントリは最も新しく参照されたものとして扱われる
+
+        Parameters
+        ----------
+        key : K
+            キー
+
+        Returns
+        -------
+        value : V | None
+            キャッシュされた値 (存在しない場合は None)
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry):
+                self._remove_entry(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def peek(self, key: K) -> V | None:
+        """
+        キャッシュからエントリを取得する (参照順序・統計情報は更新しない)
+
+        Parameters
+        ----------
+        key : K
+            キー
+
+        Returns
+        -------
+        value : V | None
+            キャッシュされた値 (存在しない場合は None)
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._is_expired(entry):
+                return None
+            return entry[0]
+
+    def put(
+        self, key: K, value: V, size: int | None = None, ttl: float | None = None
+    ) -> None:
+        """
+        キャッシュにエントリを追加する
+        上限を超えた場合は古いエントリから破棄するが、追加したエントリ自体は単体で上限を超えていても保持される
+
+        Parameters
+        ----------
+        key : K
+            キー
+        value : V
+            値
+        size : int | None
+            エントリのバイト数 (None なら get_size で求める)
+        ttl : float | None
+            このエントリの有効期限 (追加からの秒数、None ならキャッシュ全体の有効期限)
+        """
+
+        if size is None:
+            size = self._get_size(value) if self._get_size is not None else 0
+        evicted: list[tuple[K, V]] = []
+        with self._lock:
+            self._remove_entry(key)
+            if ttl is None:
+                ttl = self._ttl
+            expires_at = time.monotonic() + ttl if ttl is not None else None
+            self._entries[key] = (value, size, expires_at)
+            self._total_bytes += size
+            while len(self._entries) > 1 and self._is_over_limit():
+                evicted_key, (evicted_value, evicted_size, _) = self._entries.popitem(
+                    last=False
+                )
+                self._total_bytes -= evicted_size
+                self._evictions += 1
+                evicted.append((evicted_key, evicted_value))
+
+        # コールバックはロックの外で呼び出し、コールバック内からキャッシュを操作してもデッドロックしないようにする
+        if self._on_evict is not None:
+            for evicted_key, evicted_value in evicted:
+                self._on_evict(evicted_key, evicted_value)
+
+    def pop(self, key: K) -> V | None:
+        """
+        キャッシュからエントリを削除する (統計情報上は破棄として扱わない)
+
+        Parameters
+        ----------
+        key : K
+            キー
+
+        Returns
+        -------
+        value : V | None
+            削除された値 (存在しない場合は None)
+        """
+
+        with self._lock:
+            entry = self._remove_entry(key)
+            if entry is None or self._is_expired(entry):
+                return None
+            return entry[0]
+
+    def clear(self) -> None:
+        """キャッシュからすべてのエントリを削除する (統計情報はリセットしない)"""
+
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def keys(self) -> list[K]:
+        """キャッシュされているキーを、古く参照されたものから順に返す"""
+
+        with self._lock:
+            return list(self._entries.keys())
+
+    def statistics(self) -> CacheStatistics:
+        """キャッシュの統計情報を返す"""
+
+        with self._lock:
+            return CacheStatistics(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                entries=len(self._entries),
+                total_bytes=self._total_bytes,
+            )
+
+    def _is_expired(self, entry: tuple[V, int, float | None]) -> bool:
+        return entry[2] is not None and entry[2] <= time.monotonic()
+
+    def _remove_entry(self, key: K) -> tuple[V, int, float | None] | None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[1]
+        return entry
+
+    def _is_over_limit(self) -> bool:
+        if self._max_entries is not None and len(self._entries) > self._max_entries:
+            return True
+        if self._max_bytes is not None and self._total_bytes > self._max_bytes:
+            return True
+        return False
+
+    def __contains__(self, key: object) -> bool:
+        """キーが存在するかを返す (参照順序・統計情報は更新しない)"""
+
+        with self._lock:
+            entry = self._entries.get(key)  # type: ignore
+            return entry is not None and not self._is_expired(entry)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)